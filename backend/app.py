@@ -2,20 +2,27 @@
 """ Main Flask Application for PramanMitra
 Handles all API endpoints and web interface """
 
+import itertools
 import os
 import tempfile
+import time
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from flask import Flask, request, jsonify, redirect, session, make_response
+from flask import Flask, request, jsonify, redirect, session, make_response, Response, stream_with_context
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 from werkzeug.exceptions import RequestEntityTooLarge
+from PIL import Image
 import json
 import pandas as pd
 from io import StringIO
 
-from models import db, Institution, Certificate, User, AdminUser, VerificationLog, FraudDetectionLog, Blacklist
+from models import db, Institution, Certificate, User, AdminUser, VerificationLog, FraudDetectionLog, Blacklist, RegistryState
 from ocr_processor import OCRProcessor
+from ocr_cache import OCRResultCache
+from registry_cache import CertificateLookupCache
+from seat_index import SeatNumberIndex
+from name_index import NameTrigramIndex
 from verifier import CertificateVerifier
 from auth import JWTAuth, token_required, admin_required, verifier_or_admin_required, get_current_user
 
@@ -84,13 +91,104 @@ if not config:
 db.init_app(app)
 
 # Initialize processors
-ocr_processor = OCRProcessor()
-verifier = CertificateVerifier()
+ocr_cache = None
+if app.config.get('OCR_CACHE_ENABLED', True):
+    ocr_cache = OCRResultCache(
+        max_items=app.config.get('OCR_CACHE_MEMORY_ITEMS', 512),
+        cache_dir=app.config.get('OCR_CACHE_DIR'),
+        max_disk_bytes=app.config.get('OCR_CACHE_MAX_BYTES', 256 * 1024 * 1024)
+    )
+
+ocr_processor = OCRProcessor(
+    pool_size=app.config.get('OCR_ENGINE_POOL_SIZE', 1),
+    engine_max_uses=app.config.get('OCR_ENGINE_MAX_USES', 500),
+    tessdata_path=app.config.get('TESSDATA_PREFIX'),
+    batch_workers=app.config.get('OCR_BATCH_WORKERS') or None,
+    cache=ocr_cache,
+    preprocess_engine=app.config.get('OCR_PREPROCESS_ENGINE', 'pil'),
+    ocr_strategy=app.config.get('OCR_STRATEGY', 'full'),
+    use_layout_templates=app.config.get('OCR_LAYOUT_TEMPLATES', False),
+    pdf_dpi=app.config.get('OCR_PDF_DPI', 200),
+    pdf_max_pages=app.config.get('OCR_PDF_MAX_PAGES', 5),
+    pdf_page_workers=app.config.get('OCR_PDF_PAGE_WORKERS', 2),
+    pdf_min_text_chars=app.config.get('OCR_PDF_MIN_TEXT_CHARS', 20),
+    regex_timeout=app.config.get('OCR_REGEX_TIMEOUT'),
+    extraction_budget=app.config.get('OCR_EXTRACTION_BUDGET'),
+    use_issuer_templates=app.config.get('OCR_ISSUER_TEMPLATES', True),
+    image_target_width=app.config.get('OCR_IMAGE_TARGET_WIDTH') or None,
+    image_max_pixels=app.config.get('OCR_IMAGE_MAX_PIXELS') or None,
+    deadline=app.config.get('OCR_DEADLINE_SECONDS') or None,
+    profiles_path=app.config.get('OCR_PROFILES_PATH'),
+    default_profile=app.config.get('OCR_PROFILE', 'balanced'),
+    guided_min_similarity=app.config.get('OCR_GUIDED_MIN_SIMILARITY', 85)
+)
+
+# Seat number lookups; other workers' registry writes are seen within the check interval
+registry_cache = None
+if app.config.get('REGISTRY_CACHE_SIZE', 4096) > 0:
+    registry_cache = CertificateLookupCache(
+        RegistryState.current_generation,
+        max_items=app.config.get('REGISTRY_CACHE_SIZE', 4096),
+        check_interval=app.config.get('REGISTRY_CACHE_CHECK_SECONDS', 5.0)
+    )
+
+
+def active_seat_numbers(after_id):
+    """Active seat numbers after certificate id after_id, for the seat index"""
+    # The seat index is updated in a background thread without an app context
+    with app.app_context():
+        return CertificateVerifier.load_active_seat_numbers(after_id)
+
+
+def registry_generation():
+    """Current registry generation, also outside requests (index builds started at startup)"""
+    with app.app_context():
+        return RegistryState.current_generation()
+
+
+# Registered seats an unregistered seat number may be an OCR misread of
+seat_index = None
+if app.config.get('SEAT_RECOVERY_ENABLED', True):
+    seat_index = SeatNumberIndex(
+        active_seat_numbers,
+        registry_generation,
+        max_edits=app.config.get('SEAT_RECOVERY_MAX_EDITS', 1),
+        max_distance=app.config.get('SEAT_RECOVERY_MAX_DISTANCE', 2.0),
+        check_interval=app.config.get('REGISTRY_CACHE_CHECK_SECONDS', 5.0),
+        rebuild_interval=app.config.get('REGISTRY_INDEX_REBUILD_SECONDS', 3600.0)
+    )
+    # Built in the background as each worker starts, not by its first lookup
+    seat_index.refresh()
+
+
+def active_names(after_id):
+    """Names of the active certificates after after_id, for the name index"""
+    # Loaded in a background thread without an app context
+    with app.app_context():
+        yield from CertificateVerifier.load_active_names(after_id)
+
+
+# Registered names, for documents whose seat number could not be read
+name_index = None
+if app.config.get('NAME_INDEX_ENABLED', True):
+    name_index = NameTrigramIndex(
+        active_names,
+        registry_generation,
+        min_overlap=app.config.get('NAME_INDEX_MIN_OVERLAP', 0.4),
+        max_candidates=app.config.get('NAME_INDEX_CANDIDATES', 10),
+        check_interval=app.config.get('REGISTRY_CACHE_CHECK_SECONDS', 5.0),
+        rebuild_interval=app.config.get('REGISTRY_INDEX_REBUILD_SECONDS', 3600.0)
+    )
+    # Loading millions of names takes minutes, so it starts with the worker
+    name_index.refresh()
+verifier = CertificateVerifier(lookup_cache=registry_cache, seat_index=seat_index, name_index=name_index)
 
 # Configuration - Use /tmp for serverless environments
 UPLOAD_FOLDER = '/tmp' if os.environ.get('VERCEL') else str(BASE_DIR / 'uploads')
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'tiff', 'pdf'}
 CSV_ALLOWED_EXTENSIONS = {'csv'}
+# Fields every certificate record needs
+CERTIFICATE_FIELDS = ('seat_no', 'student_name', 'mother_name', 'sgpa', 'result_date', 'subject')
 
 # Ensure upload folder exists
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
@@ -106,6 +204,53 @@ def allowed_csv_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in CSV_ALLOWED_EXTENSIONS
 
 
+def low_confidence_fields(field_confidence, threshold, reviewed_fields=()):
+    """Certificate fields whose OCR confidence is below threshold (missing ones count as 0),
+    except those a reviewer checked"""
+    return [field for field in CERTIFICATE_FIELDS
+            if field not in reviewed_fields and float(field_confidence.get(field) or 0) < threshold]
+
+
+def auto_approvable(field_confidence):
+    """Whether every certificate field was read confidently enough to approve without review"""
+    return not low_confidence_fields(field_confidence, app.config.get('OCR_AUTO_APPROVE_CONFIDENCE', 0.9))
+
+
+def registry_row(seat_no):
+    """Expected values of an active certificate, for registry-guided extraction.
+    {} for an unregistered seat number close to registered ones (or any while
+    the seat index is loading), so every field is read for the verifier """
+    # OCR of scanned PDF pages runs in worker threads without an app context
+    with app.app_context():
+        row = verifier.registry_row(seat_no)
+        if row is None and seat_index is not None and (seat_index.candidates(seat_no) or not seat_index.ready):
+            return {}
+        return row
+
+
+def registry_written():
+    """Drop this worker's cached certificate lookups after a committed registry write"""
+    if registry_cache is not None:
+        registry_cache.clear()
+    if seat_index is not None:
+        seat_index.invalidate()
+    if name_index is not None:
+        name_index.invalidate()
+
+
+def verification_lookup():
+    """Registry lookup for verification OCR, or None to run the full pattern bank"""
+    return registry_row if app.config.get('OCR_VERIFY_EXTRACTION', 'guided') == 'guided' else None
+
+
+def requested_profile(default=None):
+    """OCR profile named by the 'profile' form field, or default; ValueError when unknown"""
+    profile = request.form.get('profile') or default
+    if profile and profile not in ocr_processor.profiles:
+        raise ValueError(f"Unknown OCR profile: {profile}. Available: {', '.join(sorted(ocr_processor.profiles))}")
+    return profile
+
+
 def get_client_info():
     """Get client IP and user agent for logging"""
     return {
@@ -214,76 +359,230 @@ def verify_certificate():
         if not allowed_file(file.filename):
             return jsonify({'error': 'File type not allowed'}), 400
 
-        # Save uploaded file temporarily
-        filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_')
-        unique_filename = timestamp + filename
-        temp_path = os.path.join(UPLOAD_FOLDER, unique_filename)
-        file.save(temp_path)
-
+        # Optional client deadline in seconds, capped by the server's
+        deadline = ocr_processor.deadline
+        if request.form.get('deadline'):
+            try:
+                client_deadline = float(request.form['deadline'])
+            except ValueError:
+                return jsonify({'error': 'deadline must be a number of seconds'}), 400
+            if client_deadline <= 0:
+                return jsonify({'error': 'deadline must be positive'}), 400
+            deadline = min(client_deadline, deadline) if deadline else client_deadline
         try:
-            # Process document with OCR
-            raw_text, extracted_data = ocr_processor.process_document(temp_path)
-
-            # Validate extraction quality
-            extraction_validation = ocr_processor.validate_extraction_quality(extracted_data)
-
-            # Perform verification
-            verification_result = verifier.verify_certificate(extracted_data)
+            profile = requested_profile()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        reread = app.config.get('OCR_DISPUTE_REREAD', False) or request.form.get('reread', '').lower() == 'true'
 
-            # Get client info for logging
-            client_info = get_client_info()
+        # Process the upload in memory, nothing is written to disk
+        filename = secure_filename(file.filename)
+        document = file.read()
+        started = time.monotonic()
 
-            # Log verification attempt
-            log_entry = verifier.log_verification(
+        def ocr_and_verify(ocr_profile, ocr_deadline):
+            ocr_result = ocr_processor.process_document_detailed(document, filename=file.filename,
+                                                                 deadline=ocr_deadline, profile=ocr_profile,
+                                                                 registry_lookup=verification_lookup())
+            # Validate extraction quality
+            extraction_validation = ocr_processor.validate_extraction_quality(
+                ocr_result['structured_data'], ocr_result.get('timed_out_fields'),
+                ocr_result.get('field_confidence'))
+            if ocr_result.get('timed_out'):
+                extraction_validation['issues'].append('OCR deadline reached, result is partial')
+            verification_result = verifier.verify_certificate(
+                ocr_result['structured_data'], field_confidence=extraction_validation['field_confidence'])
+            return ocr_result, extraction_validation, verification_result
+
+        # Process document with OCR and verify it
+        ocr_result, extraction_validation, verification_result = ocr_and_verify(profile, deadline)
+
+        # When enabled or requested, a disputed (SUSPICIOUS) OCR read is re-read once
+        # with the dispute profile in the time left; the better-scoring verification is kept
+        dispute_profile = app.config.get('OCR_DISPUTE_PROFILE')
+        remaining = deadline - (time.monotonic() - started) if deadline else None
+        if (reread and verification_result['status'] == 'SUSPICIOUS' and dispute_profile
+                and dispute_profile in ocr_processor.profiles and dispute_profile != ocr_result['profile']
+                and ocr_result['ocr_tier'] not in (None, 'text_layer')
+                and (remaining is None or remaining > 0)):
+            second_read = ocr_and_verify(dispute_profile, remaining)
+            if second_read[2]['confidence'] >= verification_result['confidence']:
+                ocr_result, extraction_validation, verification_result = second_read
+        raw_text, extracted_data = ocr_result['raw_text'], ocr_result['structured_data']
+
+        # Get client info for logging
+        client_info = get_client_info()
+
+        # Log verification attempt
+        log_entry = verifier.log_verification(
+            extracted_data=extracted_data,
+            result=verification_result,
+            filename=filename,
+            raw_text=raw_text,
+            ip_address=client_info['ip_address'],
+            user_agent=client_info['user_agent']
+        )
+        
+        # Log fraud cases for admin review
+        if verification_result['status'] in ['FAKE', 'SUSPICIOUS']:
+            verifier.log_fraud_detection(
                 extracted_data=extracted_data,
                 result=verification_result,
                 filename=filename,
                 raw_text=raw_text,
+                verification_log_id=log_entry.id,
                 ip_address=client_info['ip_address'],
                 user_agent=client_info['user_agent']
             )
-            
-            # Log fraud cases for admin review
-            if verification_result['status'] in ['FAKE', 'SUSPICIOUS']:
-                verifier.log_fraud_detection(
+
+        # Prepare response
+        response = {
+            'verification_id': log_entry.id,
+            'status': verification_result['status'],
+            'confidence': round(verification_result['confidence'], 3),
+            'details': {
+                'extracted_data': extracted_data,
+                'matched_certificate': verification_result.get('matched_certificate'),
+                'anomalies': verification_result['anomalies'],
+                'institution_verified': verification_result['institution_verified'],
+                'extraction_confidence': round(extraction_validation['overall_confidence'], 3),
+                'field_confidence': extraction_validation['field_confidence'],
+                'extraction_issues': extraction_validation['issues'],
+                'ocr_tier': ocr_result['ocr_tier'],
+                'issuer': ocr_result.get('issuer'),
+                'ocr_profile': ocr_result.get('profile'),
+                'registry_match': ocr_result.get('registry_match'),
+                'recovered_seat_no': verification_result.get('recovered_seat_no'),
+                'identified_by_name': verification_result.get('identified_by_name'),
+                'index_warming': verification_result.get('index_warming', False),
+                'timed_out': ocr_result.get('timed_out', False)
+            },
+            'timestamp': log_entry.created_at.isoformat(),
+            'recommendations': generate_recommendations(verification_result)
+        }
+        return jsonify(response), 200
+
+    except RequestEntityTooLarge:
+        return jsonify({'error': 'File too large. Maximum size is 16MB.'}), 413
+    except Image.DecompressionBombError as e:
+        return jsonify({'error': f'Image too large: {str(e)}'}), 413
+    except Exception as e:
+        app.logger.error(f"Verification error: {str(e)}")
+        return jsonify({'error': f'Verification failed: {str(e)}'}), 500
+
+
+@app.route('/api/verify/batch-pdf', methods=['POST'])
+@token_required
+@verifier_or_admin_required
+def verify_batch_pdf():
+    """ Verify every certificate of a multi-certificate PDF
+    Streams one NDJSON line per certificate as soon as it is verified,
+    followed by a summary line """
+    if 'file' not in request.files:
+        return jsonify({'error': 'No file uploaded'}), 400
+
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({'error': 'No file selected'}), 400
+    if not file.filename.lower().endswith('.pdf'):
+        return jsonify({'error': 'Only PDF files can be split into certificates'}), 400
+
+    # 'certificate' groups continuation pages, 'page' treats every page as a certificate
+    split = request.form.get('split', 'certificate')
+    if split not in ('certificate', 'page'):
+        return jsonify({'error': "split must be 'certificate' or 'page'"}), 400
+
+    try:
+        profile = requested_profile()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    filename = secure_filename(file.filename)
+    document = file.read()
+    client_info = get_client_info()
+
+    def verified_lines(items):
+        """NDJSON lines of OCR items verified together (one registry query and scoring pass)"""
+        extraction_validations = [ocr_processor.validate_extraction_quality(
+            item['structured_data'], item.get('timed_out_fields'), item.get('field_confidence')) for item in items]
+        verification_results = verifier.verify_certificates(
+            [item['structured_data'] for item in items],
+            [extraction_validation['field_confidence'] for extraction_validation in extraction_validations])
+        for item, extraction_validation, verification_result in zip(items, extraction_validations,
+                                                                    verification_results):
+            pages = item['pages']
+            page_label = f"{filename}#pages={pages[0]}-{pages[-1]}"
+            try:
+                extracted_data = item['structured_data']
+                log_entry = verifier.log_verification(
                     extracted_data=extracted_data,
                     result=verification_result,
-                    filename=filename,
-                    raw_text=raw_text,
-                    verification_log_id=log_entry.id,
+                    filename=page_label,
+                    raw_text=item['raw_text'],
                     ip_address=client_info['ip_address'],
                     user_agent=client_info['user_agent']
                 )
-
-            # Prepare response
-            response = {
-                'verification_id': log_entry.id,
-                'status': verification_result['status'],
-                'confidence': round(verification_result['confidence'], 3),
-                'details': {
+                if verification_result['status'] in ['FAKE', 'SUSPICIOUS']:
+                    verifier.log_fraud_detection(
+                        extracted_data=extracted_data,
+                        result=verification_result,
+                        filename=page_label,
+                        raw_text=item['raw_text'],
+                        verification_log_id=log_entry.id,
+                        ip_address=client_info['ip_address'],
+                        user_agent=client_info['user_agent']
+                    )
+
+                yield {
+                    'index': item['index'],
+                    'pages': pages,
+                    'verification_id': log_entry.id,
+                    'status': verification_result['status'],
+                    'confidence': round(verification_result['confidence'], 3),
                     'extracted_data': extracted_data,
                     'matched_certificate': verification_result.get('matched_certificate'),
                     'anomalies': verification_result['anomalies'],
-                    'institution_verified': verification_result['institution_verified'],
                     'extraction_confidence': round(extraction_validation['overall_confidence'], 3),
-                    'extraction_issues': extraction_validation['issues']
-                },
-                'timestamp': log_entry.created_at.isoformat(),
-                'recommendations': generate_recommendations(verification_result)
-            }
-            return jsonify(response), 200
-
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-
-    except RequestEntityTooLarge:
-        return jsonify({'error': 'File too large. Maximum size is 16MB.'}), 413
-    except Exception as e:
-        app.logger.error(f"Verification error: {str(e)}")
-        return jsonify({'error': f'Verification failed: {str(e)}'}), 500
+                    'field_confidence': extraction_validation['field_confidence'],
+                    'extraction_issues': extraction_validation['issues'],
+                    'ocr_tier': item['ocr_tier'],
+                    'issuer': item.get('issuer'),
+                    'recovered_seat_no': verification_result.get('recovered_seat_no'),
+                    'identified_by_name': verification_result.get('identified_by_name'),
+                    'index_warming': verification_result.get('index_warming', False),
+                    'timed_out': item.get('timed_out', False)
+                }
+            except Exception as e:
+                db.session.rollback()
+                app.logger.error(f"Batch verification error on {page_label}: {str(e)}")
+                yield {'index': item['index'], 'pages': pages, 'status': 'ERROR',
+                       'error': f'Verification failed: {str(e)}'}
+
+    def generate():
+        summary = {'total': 0, 'AUTHENTIC': 0, 'SUSPICIOUS': 0, 'FAKE': 0, 'ERROR': 0}
+        batch_size = max(1, app.config.get('BATCH_VERIFY_MAX_RECORDS', 100))
+        batch_wait = app.config.get('BATCH_VERIFY_MAX_WAIT', 0.5)
+        items = ocr_processor.process_pdf_documents(document, split=split, profile=profile,
+                                                    registry_lookup=verification_lookup())
+        pending = []
+        flushed_at = time.monotonic()
+        for item in itertools.chain(items, [None]):
+            if item is not None:
+                pending.append(item)
+            # Text layer certificates arrive in quick succession and are verified
+            # together; one that took longer to OCR than batch_wait is sent at once
+            if pending and (item is None or len(pending) >= batch_size
+                            or time.monotonic() - flushed_at >= batch_wait):
+                for line in verified_lines(pending):
+                    summary['total'] += 1
+                    summary[line['status']] = summary.get(line['status'], 0) + 1
+                    yield json.dumps(line, default=str) + '\n'
+                pending = []
+                flushed_at = time.monotonic()
+
+        yield json.dumps({'summary': summary}) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
 
 
 def generate_recommendations(verification_result):
@@ -393,33 +692,44 @@ def ocr_extract():
         if not allowed_file(file.filename):
             return jsonify({'error': 'File type not allowed'}), 400
 
-        # Save uploaded file temporarily
-        filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_')
-        unique_filename = timestamp + filename
-        temp_path = os.path.join(UPLOAD_FOLDER, unique_filename)
-        file.save(temp_path)
-
+        # Bulk uploads default to the fast profile
+        bulk = request.form.get('bulk', 'false').lower() == 'true'
         try:
-            # Process document with OCR
-            raw_text, extracted_data = ocr_processor.process_document(temp_path)
-            
-            # Validate extraction quality
-            extraction_validation = ocr_processor.validate_extraction_quality(extracted_data)
-            
-            return jsonify({
-                'success': True,
-                'extracted_data': extracted_data,
-                'raw_text': raw_text,
-                'extraction_confidence': round(extraction_validation['overall_confidence'], 3),
-                'extraction_issues': extraction_validation['issues']
-            }), 200
-            
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-                
+            profile = requested_profile(app.config.get('OCR_BULK_PROFILE') if bulk else None)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        # Process the upload in memory, nothing is written to disk
+        document = file.read()
+
+        # Process document with OCR
+        ocr_result = ocr_processor.process_document_detailed(document, filename=file.filename,
+                                                             profile=profile)
+        raw_text, extracted_data = ocr_result['raw_text'], ocr_result['structured_data']
+        
+        # Validate extraction quality
+        extraction_validation = ocr_processor.validate_extraction_quality(
+            extracted_data, ocr_result.get('timed_out_fields'), ocr_result.get('field_confidence'))
+        if ocr_result.get('timed_out'):
+            extraction_validation['issues'].append('OCR deadline reached, result is partial')
+        
+        return jsonify({
+            'success': True,
+            'extracted_data': extracted_data,
+            'raw_text': raw_text,
+            'extraction_confidence': round(extraction_validation['overall_confidence'], 3),
+            'field_confidence': extraction_validation['field_confidence'],
+            'field_boxes': ocr_result.get('field_boxes', {}),
+            'auto_approvable': auto_approvable(extraction_validation['field_confidence']),
+            'extraction_issues': extraction_validation['issues'],
+            'ocr_tier': ocr_result['ocr_tier'],
+            'issuer': ocr_result.get('issuer'),
+            'ocr_profile': ocr_result.get('profile'),
+            'timed_out': ocr_result.get('timed_out', False)
+        }), 200
+
+    except Image.DecompressionBombError as e:
+        return jsonify({'error': f'Image too large: {str(e)}'}), 413
     except Exception as e:
         app.logger.error(f"OCR extraction error: {str(e)}")
         return jsonify({'error': f'OCR extraction failed: {str(e)}'}), 500
@@ -452,7 +762,9 @@ def add_certificate():
             is_active=True
         )
         db.session.add(certificate)
+        RegistryState.bump()
         db.session.commit()
+        registry_written()
         return jsonify({'message': 'Certificate added successfully', 'id': certificate.id}), 201
 
     except Exception as e:
@@ -643,7 +955,9 @@ def bulk_upload_certificates():
             
             # Bulk insert all certificates
             db.session.bulk_save_objects(certificate_objects)
+            RegistryState.bump()
             db.session.commit()
+            registry_written()
             success_count = len(certificate_objects)
             
             current_user = get_current_user()
@@ -1216,6 +1530,16 @@ def bulk_approve_certificates():
                     if confidence < 0.5:
                         validation_errors.append(f'{filename}: Low OCR confidence ({confidence:.1%})')
                         continue
+                    # Per-field OCR confidences from /api/ocr-extract; fields the reviewer
+                    # checked or corrected (reviewed_fields) are trusted whatever OCR read
+                    field_confidence = item.get('field_confidence')
+                    if field_confidence:
+                        low_fields = low_confidence_fields(
+                            field_confidence, app.config.get('OCR_BULK_MIN_FIELD_CONFIDENCE', 0.5),
+                            set(item.get('reviewed_fields') or ()))
+                        if low_fields:
+                            validation_errors.append(f'{filename}: Low OCR confidence for {", ".join(low_fields)}')
+                            continue
                 else:
                     validation_errors.append(f'{filename}: Unknown source type: {source}')
                     continue
@@ -1326,7 +1650,9 @@ def bulk_approve_certificates():
             
             # Bulk insert
             db.session.bulk_save_objects(certificate_objects)
+            RegistryState.bump()
             db.session.commit()
+            registry_written()
             success_count = len(certificate_objects)
             
             current_user = get_current_user()
@@ -1396,7 +1722,11 @@ def health_check():
         return jsonify({
             'status': 'healthy',
             'timestamp': datetime.now(timezone.utc).isoformat(),
-            'version': '1.0.0'
+            'version': '1.0.0',
+            'ocr_cache': ocr_cache.get_stats() if ocr_cache else None,
+            'registry_cache': registry_cache.get_stats() if registry_cache else None,
+            'seat_index': seat_index.get_stats() if seat_index else None,
+            'name_index': name_index.get_stats() if name_index else None
         }), 200
     except Exception as e:
         return jsonify({
@@ -4,6 +4,7 @@ Supports both SQLite (development) and Neon PostgreSQL (production)
 """
 
 import os
+import tempfile
 from datetime import timedelta
 from dotenv import load_dotenv
 
@@ -56,6 +57,84 @@ class Config:
     
     # Tesseract OCR
     TESSERACT_CMD = os.getenv('TESSERACT_CMD', 'tesseract')
+    # Warm engine pool per worker (needs tesserocr, falls back to pytesseract)
+    OCR_ENGINE_POOL_SIZE = int(os.getenv('OCR_ENGINE_POOL_SIZE', '2'))
+    OCR_ENGINE_MAX_USES = int(os.getenv('OCR_ENGINE_MAX_USES', '500'))
+    TESSDATA_PREFIX = os.getenv('TESSDATA_PREFIX')
+    # Process count for batch OCR (0 = one per CPU)
+    OCR_BATCH_WORKERS = int(os.getenv('OCR_BATCH_WORKERS', '0'))
+    # Image preprocessing: 'numpy' (single buffer, same output) or 'pil'
+    OCR_PREPROCESS_ENGINE = os.getenv('OCR_PREPROCESS_ENGINE', 'numpy')
+    # 'tiered' tries a light OCR pass first and escalates only for missing fields
+    OCR_STRATEGY = os.getenv('OCR_STRATEGY', 'tiered')
+    # Read known result sheet layouts (layout_templates.py) region by region first
+    OCR_LAYOUT_TEMPLATES = os.getenv('OCR_LAYOUT_TEMPLATES', 'false').lower() == 'true'
+    # Scanned PDFs: OCR pages without a text layer (renders with PyMuPDF when installed)
+    OCR_PDF_DPI = int(os.getenv('OCR_PDF_DPI', '200'))
+    OCR_PDF_MAX_PAGES = int(os.getenv('OCR_PDF_MAX_PAGES', '5'))
+    OCR_PDF_PAGE_WORKERS = int(os.getenv('OCR_PDF_PAGE_WORKERS', '2'))
+    OCR_PDF_MIN_TEXT_CHARS = int(os.getenv('OCR_PDF_MIN_TEXT_CHARS', '20'))
+    # Field regex limits in seconds, per pattern and per document text (needs the regex package)
+    OCR_REGEX_TIMEOUT = float(os.getenv('OCR_REGEX_TIMEOUT', '0.05'))
+    OCR_EXTRACTION_BUDGET = float(os.getenv('OCR_EXTRACTION_BUDGET', '0.5'))
+    # Seconds OCR may spend on one uploaded document before returning partial
+    # results (0 = unbounded); /api/verify clients may ask for less
+    OCR_DEADLINE_SECONDS = float(os.getenv('OCR_DEADLINE_SECONDS', '20'))
+    # Uploaded images: decode reduced towards this width (0 = native size) and
+    # refuse images above this many pixels after JPEG draft scaling (0 = no limit)
+    OCR_IMAGE_TARGET_WIDTH = int(os.getenv('OCR_IMAGE_TARGET_WIDTH', '2480'))
+    OCR_IMAGE_MAX_PIXELS = int(os.getenv('OCR_IMAGE_MAX_PIXELS', '40000000'))
+    # Bulk OCR items: approvable without review when every field's OCR confidence
+    # reaches OCR_AUTO_APPROVE_CONFIDENCE, refused when any the reviewer did not
+    # mark as checked is below the minimum
+    OCR_AUTO_APPROVE_CONFIDENCE = float(os.getenv('OCR_AUTO_APPROVE_CONFIDENCE', '0.9'))
+    OCR_BULK_MIN_FIELD_CONFIDENCE = float(os.getenv('OCR_BULK_MIN_FIELD_CONFIDENCE', '0.5'))
+    # Preprocessing profiles (ocr_profiles.py), optionally tuned by
+    # scripts/tune_ocr_profiles.py: the default, the one bulk OCR uses and the
+    # one SUSPICIOUS image results are re-read with. /api/verify re-reads only
+    # when OCR_DISPUTE_REREAD is on or the client sends reread=true
+    OCR_PROFILES_PATH = os.getenv('OCR_PROFILES_PATH') or None
+    OCR_PROFILE = os.getenv('OCR_PROFILE', 'balanced')
+    OCR_BULK_PROFILE = os.getenv('OCR_BULK_PROFILE', 'fast')
+    OCR_DISPUTE_PROFILE = os.getenv('OCR_DISPUTE_PROFILE', 'accurate')
+    OCR_DISPUTE_REREAD = os.getenv('OCR_DISPUTE_REREAD', 'false').lower() == 'true'
+    # Verification extraction: 'guided' resolves the seat number first and
+    # searches the registry row's values in the text, 'patterns' runs the full bank
+    OCR_VERIFY_EXTRACTION = os.getenv('OCR_VERIFY_EXTRACTION', 'guided')
+    OCR_GUIDED_MIN_SIMILARITY = int(os.getenv('OCR_GUIDED_MIN_SIMILARITY', '85'))
+    # Classify documents by issuer and try its narrowed patterns (issuer_templates.py) first
+    OCR_ISSUER_TEMPLATES = os.getenv('OCR_ISSUER_TEMPLATES', 'true').lower() == 'true'
+    # Content-addressed OCR result cache (memory LRU + shared disk directory, created
+    # private to the server's user since entries hold certificate text)
+    OCR_CACHE_ENABLED = os.getenv('OCR_CACHE_ENABLED', 'true').lower() == 'true'
+    OCR_CACHE_MEMORY_ITEMS = int(os.getenv('OCR_CACHE_MEMORY_ITEMS', '512'))
+    OCR_CACHE_DIR = os.getenv('OCR_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'pramanmitra_ocr_cache'))
+    OCR_CACHE_MAX_BYTES = int(os.getenv('OCR_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+    
+    # Per-worker cache of certificate lookups by seat number (0 = off); writes
+    # bump a registry generation that workers check every few seconds
+    REGISTRY_CACHE_SIZE = int(os.getenv('REGISTRY_CACHE_SIZE', '4096'))
+    REGISTRY_CACHE_CHECK_SECONDS = float(os.getenv('REGISTRY_CACHE_CHECK_SECONDS', '5'))
+    # In-memory registry indexes append new certificates on each write and are
+    # rebuilt (dropping deactivated ones) at most this often
+    REGISTRY_INDEX_REBUILD_SECONDS = float(os.getenv('REGISTRY_INDEX_REBUILD_SECONDS', '3600'))
+    # Unregistered seat numbers are matched to registered ones OCR may have
+    # misread (S/5, 0/O, 1/I, 8/B ...), accepted only when the student name matches
+    SEAT_RECOVERY_ENABLED = os.getenv('SEAT_RECOVERY_ENABLED', 'true').lower() == 'true'
+    SEAT_RECOVERY_MAX_EDITS = int(os.getenv('SEAT_RECOVERY_MAX_EDITS', '1'))
+    SEAT_RECOVERY_MAX_DISTANCE = float(os.getenv('SEAT_RECOVERY_MAX_DISTANCE', '2'))
+
+    # Documents whose seat number could not be read are matched to registered
+    # certificates by student and mother name (in-memory trigram index, loaded in
+    # the background as each worker starts), confirmed with the name, SGPA and
+    # subject checks; AUTHENTIC only when every field matches exactly
+    NAME_INDEX_ENABLED = os.getenv('NAME_INDEX_ENABLED', 'true').lower() == 'true'
+    NAME_INDEX_CANDIDATES = int(os.getenv('NAME_INDEX_CANDIDATES', '10'))
+    NAME_INDEX_MIN_OVERLAP = float(os.getenv('NAME_INDEX_MIN_OVERLAP', '0.4'))
+    # /api/verify/batch-pdf verifies certificates that arrive within
+    # BATCH_VERIFY_MAX_WAIT seconds of each other together, up to this many
+    BATCH_VERIFY_MAX_RECORDS = int(os.getenv('BATCH_VERIFY_MAX_RECORDS', '100'))
+    BATCH_VERIFY_MAX_WAIT = float(os.getenv('BATCH_VERIFY_MAX_WAIT', '0.5'))
     
     # Pagination
     ITEMS_PER_PAGE = int(os.getenv('ITEMS_PER_PAGE', '20'))
@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+Field Extraction Engine for PramanMitra
+Compiles the OCR pattern bank once per process and runs each pattern
+only on the parts of the document that can match it
+"""
+
+import re
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+
+try:
+    import regex as regex_module
+except ImportError:  # Optional: patterns run on the re module, without timeouts
+    regex_module = None
+
+# Compiled pattern banks shared by every OCRProcessor in the process
+_compiled_banks = {}
+
+# Characters that IGNORECASE matches against ASCII letters but str.lower() does not fold
+_UNSAFE_FOLD_CHARS = ('\u017f', '\u212a', '\u0130', '\u0131')
+
+# Characters the regex package matches differently from re (both with IGNORECASE):
+# re counts the information separators as \s and folds dotted/dotless I onto ASCII
+_RE_DIVERGENT_CHARS = '\x1c\x1d\x1e\x1f\u0130\u0131'
+
+# Common OCR confusions, folded (after lower-casing) when locating anchor keywords
+_CONFUSION_FOLD = str.maketrans({'5': 's', '$': 's', '0': 'o', '1': 'l', '|': 'l', 'i': 'l', '8': 'b'})
+
+# Characters kept after a confusable anchor when it is rewritten for matching
+ANCHOR_WINDOW_CHARS = 240
+
+# Shortest leading literal worth indexing as an anchor
+_MIN_ANCHOR_LENGTH = 3
+
+
+def _dedup_key(pattern: str) -> str:
+    """Patterns that only differ in letter case are identical under IGNORECASE"""
+    if re.search(r'\\[A-Z]', pattern):
+        # Upper-case escapes (\S, \D, \W, ...) change meaning when lowered
+        return pattern
+    return pattern.lower()
+
+
+def required_literal(pattern: str) -> str:
+    """Longest lower-cased run of plain characters that every match must contain.
+
+    Only the top level of the pattern is considered; groups, classes and
+    escapes end a run, and a top-level alternation means there is no literal.
+    """
+    best, run = '', ''
+    depth = 0
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            best, run = max(best, run, key=len), ''
+            i += 2
+            continue
+        if char == '[':
+            # Skip the character class, a leading ']' or '^]' is part of it
+            i += 1
+            if i < len(pattern) and pattern[i] == '^':
+                i += 1
+            if i < len(pattern) and pattern[i] == ']':
+                i += 1
+            while i < len(pattern) and pattern[i] != ']':
+                i += 2 if pattern[i] == '\\' else 1
+            best, run = max(best, run, key=len), ''
+        elif char in '?*{':
+            # The quantified character is optional
+            best, run = max(best, run[:-1], key=len), ''
+            if char == '{':
+                i = pattern.find('}', i)
+                if i == -1:
+                    return ''
+        elif char == '|' and depth == 0:
+            return ''
+        elif char in '()':
+            depth += 1 if char == '(' else -1
+            best, run = max(best, run, key=len), ''
+        elif char in '+.^$|' or char.isspace():
+            # Whitespace is collapsed differently in the full text and the lines
+            best, run = max(best, run, key=len), ''
+        elif depth == 0:
+            run += char
+        i += 1
+    best = max(best, run, key=len)
+    return best.lower() if len(best) > 1 else ''
+
+
+def leading_literal(pattern: str) -> str:
+    """Lower-cased plain characters every match starts with, used as the pattern's anchor"""
+    run = ''
+    for i, char in enumerate(pattern):
+        if char in '\\[](){}?*+.^$|' or char.isspace():
+            if char in '?*{':
+                # The quantified character is optional
+                run = run[:-1]
+            break
+        run += char
+    return run.lower() if len(run) >= _MIN_ANCHOR_LENGTH else ''
+
+
+def timeouts_available() -> bool:
+    """Check whether the regex package is installed to interrupt runaway patterns"""
+    return regex_module is not None
+
+
+@lru_cache(maxsize=None)
+def _re_compatible_atom(atom: str) -> str:
+    """atom (a character, escape or class) made to match _RE_DIVERGENT_CHARS like re does"""
+    expected = re.compile(atom, re.IGNORECASE)
+    actual = regex_module.compile(atom, regex_module.IGNORECASE | regex_module.VERSION0)
+    extra = ''.join(f"\\u{ord(char):04x}" for char in _RE_DIVERGENT_CHARS
+                    if expected.fullmatch(char) and not actual.fullmatch(char))
+    excess = ''.join(f"\\u{ord(char):04x}" for char in _RE_DIVERGENT_CHARS
+                     if actual.fullmatch(char) and not expected.fullmatch(char))
+    negated = atom.startswith('[^')
+    if atom.startswith('[') and not (excess if not negated else extra):
+        # Widen (or, negated, narrow) the class itself, ahead of any trailing '-'
+        start = 2 if negated else 1
+        if atom[start] == ']':
+            start += 1
+        return f"{atom[:start]}{excess if negated else extra}{atom[start:]}"
+    if atom != '.' and not excess:
+        return f"[{atom}{extra}]" if extra else atom
+    if excess:
+        atom = f"(?:(?![{excess}]){atom})"
+    if extra:
+        atom = f"(?:{atom}|[{extra}])"
+    return atom
+
+
+def _re_compatible(pattern: str) -> str:
+    """pattern for the regex package, matching exactly what re matches.
+
+    VERSION0 keeps re's syntax, but \s and case folding still differ on
+    _RE_DIVERGENT_CHARS (re reads "İKK" as [A-Z]+, regex as "KK"), so every
+    atom that treats one of them differently is widened or narrowed.
+    """
+    parts = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            atom, i = pattern[i:i + 2], i + 2
+        elif char == '[':
+            # A leading ']' or '^]' is part of the class
+            end = i + 1
+            if end < len(pattern) and pattern[end] == '^':
+                end += 1
+            if end < len(pattern) and pattern[end] == ']':
+                end += 1
+            while end < len(pattern) and pattern[end] != ']':
+                end += 2 if pattern[end] == '\\' else 1
+            atom, i = pattern[i:end + 1], end + 1
+        elif char == '(' and pattern.startswith('(?', i):
+            # Group prefixes ((?:, (?P<name>, (?<=, (?i) ...) are syntax, not atoms
+            end = i + 2
+            while end < len(pattern) and pattern[end] not in ':=!>)':
+                end += 1
+            parts.append(pattern[i:end + 1])
+            i = end + 1
+            continue
+        elif char == '{':
+            # Quantifier bounds
+            end = pattern.find('}', i)
+            end = len(pattern) - 1 if end < 0 else end
+            parts.append(pattern[i:end + 1])
+            i = end + 1
+            continue
+        else:
+            atom, i = char, i + 1
+        parts.append(atom if atom in '()|*+?^$' else _re_compatible_atom(atom))
+    return ''.join(parts)
+
+
+def _compile(pattern: str):
+    if regex_module is not None:
+        return regex_module.compile(_re_compatible(pattern), regex_module.IGNORECASE | regex_module.VERSION0)
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def compile_pattern_bank(patterns: Dict[str, List[str]]) -> Dict[str, List[Tuple[re.Pattern, str, str]]]:
+    """Compile (once per process) an ordered (regex, required literal, anchor) list for each field"""
+    key = tuple((field, tuple(field_patterns)) for field, field_patterns in patterns.items())
+    bank = _compiled_banks.get(key)
+    if bank is None:
+        bank = {}
+        for field, field_patterns in patterns.items():
+            compiled = []
+            seen = set()
+            for pattern in field_patterns:
+                # A repeated pattern can never match where its earlier copy failed
+                dedup_key = _dedup_key(pattern)
+                if dedup_key in seen:
+                    continue
+                seen.add(dedup_key)
+                compiled.append((_compile(pattern), required_literal(pattern), leading_literal(pattern)))
+            bank[field] = compiled
+        _compiled_banks[key] = bank
+    return bank
+
+
+def fold_confusions(text_lower: str) -> str:
+    """Lower-cased text with common OCR confusions folded, offsets unchanged"""
+    return text_lower.translate(_CONFUSION_FOLD)
+
+
+def find_all(text: str, keyword: str) -> List[int]:
+    """Start offsets, in order, of every (possibly overlapping) occurrence"""
+    found = []
+    position = text.find(keyword)
+    while position != -1:
+        found.append(position)
+        position = text.find(keyword, position + 1)
+    return found
+
+
+class _Deadline:
+    """Time left for one pattern: its own timeout, capped by the document budget"""
+
+    def __init__(self, pattern_timeout: Optional[float], budget_end: Optional[float]):
+        ends = [end for end in (None if pattern_timeout is None else time.perf_counter() + pattern_timeout,
+                                budget_end) if end is not None]
+        self.end = min(ends) if ends else None
+
+    def kwargs(self) -> Dict[str, float]:
+        if self.end is None:
+            return {}
+        left = self.end - time.perf_counter()
+        if left <= 0:
+            raise TimeoutError('regex timed out')
+        return {'timeout': left}
+
+
+class FieldExtractor:
+    """Resolves every field of the pattern bank against one document text.
+
+    Patterns are tried in the original priority order (collapsed text, then
+    each line, before moving to the next pattern), but the document is
+    lower-cased only once. A pattern that starts with a keyword (its anchor)
+    is only matched at the keyword's occurrences, which are located once per
+    document; other patterns are only run on the lines that contain their
+    required literal, and skipped outright when the literal does not occur
+    anywhere in the document.
+
+    Keywords are located with OCR confusions folded. A confused occurrence
+    is rewritten to the keyword and matched on a window of at most
+    ANCHOR_WINDOW_CHARS (the rest of the line in the line pass), so '5eat
+    No' resolves like 'Seat No' while clean text gives the same results as
+    running each pattern on the whole text.
+
+    With the regex package installed, each pattern gets at most
+    pattern_timeout seconds and the whole document document_budget seconds.
+    A pattern that runs out of time is skipped; once the budget is spent the
+    remaining fields are left unresolved. Both are reported as timed out.
+    """
+
+    def __init__(self, patterns: Dict[str, List[str]], pattern_timeout: Optional[float] = None,
+                 document_budget: Optional[float] = None):
+        self.bank = compile_pattern_bank(patterns)
+        limited = regex_module is not None
+        self.pattern_timeout = pattern_timeout if limited else None
+        self.document_budget = document_budget if limited else None
+
+    @staticmethod
+    def _value(match) -> Optional[str]:
+        """Value of a match, or None when it is empty or a single character"""
+        if not match:
+            return None
+        value = match.group(1) if match.re.groups else match.group(0)
+        value = value.strip() if value else None
+        return value if value and len(value) > 1 else None
+
+    @classmethod
+    def _first_value(cls, regex, text: str, deadline: _Deadline) -> Optional[str]:
+        return cls._value(regex.search(text, **deadline.kwargs()))
+
+    @classmethod
+    def _first_anchored_value(cls, regex, text: str, anchor: str, positions: List[int],
+                              text_lower: str, window: int, deadline: _Deadline) -> Optional[str]:
+        """Value of the first match starting at one of the anchor's occurrences"""
+        for position in positions:
+            if text_lower.startswith(anchor, position):
+                match = regex.match(text, position, **deadline.kwargs())
+            else:
+                # OCR-confused keyword: match the keyword itself in its place
+                end = position + len(anchor)
+                match = regex.match(anchor + text[end:end + window], **deadline.kwargs())
+            if match:
+                # Like search(), only the leftmost match counts
+                return cls._value(match)
+        return None
+
+    def extract(self, text: str, fields: Optional[List[str]] = None) -> Dict[str, Optional[str]]:
+        """Raw value of every field, or only of the given fields"""
+        return self.extract_detailed(text, fields)[0]
+
+    def extract_detailed(self, text: str,
+                         fields: Optional[List[str]] = None) -> Tuple[Dict[str, Optional[str]], Set[str]]:
+        """Raw field values and the unresolved fields whose patterns ran out of time"""
+        document = _Document(text)
+        budget_end = None
+        if self.document_budget is not None:
+            budget_end = time.perf_counter() + self.document_budget
+        results = {}
+        timed_out = set()
+
+        for field, compiled in self.bank.items():
+            if fields is not None and field not in fields:
+                continue
+            results[field] = None
+            if budget_end is not None and time.perf_counter() >= budget_end:
+                timed_out.add(field)
+                continue
+
+            for regex, literal, anchor in compiled:
+                deadline = _Deadline(self.pattern_timeout, budget_end)
+                try:
+                    if anchor and document.anchors_located:
+                        value = self._anchored_value(regex, anchor, document, deadline)
+                    else:
+                        value = self._scanned_value(regex, literal, document, deadline)
+                except TimeoutError:
+                    timed_out.add(field)
+                    continue
+                if value:
+                    results[field] = value
+                    timed_out.discard(field)
+                    break
+
+        return results, timed_out
+
+    def _scanned_value(self, regex, literal: str, document: '_Document',
+                       deadline: _Deadline) -> Optional[str]:
+        if not document.may_contain(literal):
+            return None
+
+        # Try on the full text first, then on individual lines
+        value = self._first_value(regex, document.text_clean, deadline)
+        if not value:
+            for line in document.lines_with(literal):
+                value = self._first_value(regex, line, deadline)
+                if value:
+                    break
+        return value
+
+    def _anchored_value(self, regex, anchor: str, document: '_Document',
+                        deadline: _Deadline) -> Optional[str]:
+        positions = document.clean_anchors(anchor)
+        if not positions:
+            return None
+
+        value = self._first_anchored_value(regex, document.text_clean, anchor, positions,
+                                           document.text_clean_lower, ANCHOR_WINDOW_CHARS, deadline)
+        if not value:
+            for line, line_lower, columns in document.line_anchors(anchor):
+                value = self._first_anchored_value(regex, line, anchor, columns,
+                                                   line_lower, len(line), deadline)
+                if value:
+                    break
+        return value
+
+
+def collapse_whitespace(text: str) -> str:
+    """Same result as re.sub(r'\\s+', ' ', text), at str.split() speed"""
+    body = ' '.join(text.split())
+    if not body:
+        return ' ' if text else ''
+    return (' ' if text[0].isspace() else '') + body + (' ' if text[-1].isspace() else '')
+
+
+class _Document:
+    """Per-document views shared by every pattern of the bank.
+
+    Only the collapsed and lower-cased texts are built up front; lines are
+    cut out of the text around literal and anchor occurrences on demand, so
+    long documents cost little more than the searches they need.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.text_clean = collapse_whitespace(text)
+        self._all_lines = None
+
+        # Literal pre-filtering and anchors rely on str.lower() folding like
+        # IGNORECASE does and keeping offsets intact
+        if any(char in text for char in _UNSAFE_FOLD_CHARS):
+            self.text_lower = None
+        else:
+            self.text_lower = text.lower()
+        self._line_cache = {}
+
+        self.anchors_located = self.text_lower is not None
+        self._clean_anchors = {}
+        self._raw_anchors = {}
+        self._text_clean_lower = None
+        self._folded_clean = None
+        self._folded_text = None
+
+    @property
+    def text_clean_lower(self) -> str:
+        if self._text_clean_lower is None:
+            self._text_clean_lower = self.text_clean.lower()
+        return self._text_clean_lower
+
+    def clean_anchors(self, anchor: str) -> List[int]:
+        """Offsets of an anchor, OCR confusions allowed, in the collapsed text"""
+        positions = self._clean_anchors.get(anchor)
+        if positions is None:
+            if self._folded_clean is None:
+                self._folded_clean = fold_confusions(self.text_clean_lower)
+            positions = self._clean_anchors[anchor] = find_all(self._folded_clean, fold_confusions(anchor))
+        return positions
+
+    def _line_bounds(self, position: int) -> Tuple[int, int]:
+        start = self.text.rfind('\n', 0, position) + 1
+        end = self.text.find('\n', position)
+        return start, (len(self.text) if end == -1 else end)
+
+    def line_anchors(self, anchor: str) -> List[Tuple[str, str, List[int]]]:
+        """(stripped line, its lower-cased copy, anchor offsets in it) for each line with the anchor"""
+        positions = self._raw_anchors.get(anchor)
+        if positions is None:
+            if self._folded_text is None:
+                self._folded_text = fold_confusions(self.text_lower)
+            positions = self._raw_anchors[anchor] = find_all(self._folded_text, fold_confusions(anchor))
+
+        located = []
+        line_end = -1
+        for position in positions:
+            if position > line_end:
+                line_start, line_end = self._line_bounds(position)
+                raw_line = self.text[line_start:line_end]
+                indent = len(raw_line) - len(raw_line.lstrip())
+                line = raw_line.strip()
+                located.append((line, self.text_lower[line_start + indent:line_start + indent + len(line)], []))
+            located[-1][2].append(position - line_start - indent)
+        return located
+
+    def may_contain(self, literal: str) -> bool:
+        return not literal or self.text_lower is None or literal in self.text_lower
+
+    def lines_with(self, literal: str) -> List[str]:
+        """Non-empty lines, in order, that can match a pattern requiring literal"""
+        lines = self._line_cache.get(literal)
+        if lines is not None:
+            return lines
+
+        if not literal or self.text_lower is None:
+            if self._all_lines is None:
+                self._all_lines = [line.strip() for line in self.text.split('\n') if line.strip()]
+            lines = self._all_lines
+        else:
+            lines = []
+            position = self.text_lower.find(literal)
+            while position != -1:
+                line_start, line_end = self._line_bounds(position)
+                lines.append(self.text[line_start:line_end].strip())
+                # Continue after the end of this line
+                position = self.text_lower.find(literal, line_end + 1)
+
+        self._line_cache[literal] = lines
+        return lines
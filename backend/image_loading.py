@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Bounded-Memory Image Loading for PramanMitra
+Decodes uploads straight into grayscale near the OCR resolution, using the
+JPEG decoder's DCT scaling, and refuses images too large to decode safely
+"""
+
+from typing import BinaryIO, Optional
+
+from PIL import Image
+
+# Scale denominators the JPEG decoder can apply while decoding
+JPEG_DRAFT_FACTORS = (8, 4, 2)
+
+
+def draft_factor(size, target_width: Optional[int], max_pixels: Optional[int]) -> int:
+    """Largest JPEG reduction that keeps the width at or above target_width.
+
+    A larger reduction is used when needed to bring the pixel count under
+    max_pixels; 1 means decode at full size.
+    """
+    width, height = size
+    for factor in JPEG_DRAFT_FACTORS:
+        if target_width and width // factor >= target_width:
+            return factor
+    factor = 1
+    if max_pixels:
+        while factor < JPEG_DRAFT_FACTORS[0] and (width // factor) * (height // factor) > max_pixels:
+            factor *= 2
+    return factor
+
+
+def load_grayscale(stream: BinaryIO, target_width: Optional[int] = None,
+                   max_pixels: Optional[int] = None) -> Image.Image:
+    """Decode an image as grayscale, reduced towards target_width pixels wide.
+
+    Only the header is read before the size is checked. JPEGs are decoded
+    at 1/2, 1/4 or 1/8 scale directly into luminance; other formats are
+    decoded in full and then reduced by whole factors, so they are refused
+    when larger than max_pixels. Images are never reduced below target_width
+    and never enlarged. Raises Image.DecompressionBombError for images over
+    the limit.
+    """
+    with Image.open(stream) as image:
+        if image.format == 'JPEG':
+            factor = draft_factor(image.size, target_width, max_pixels)
+            if factor > 1 or image.mode != 'L':
+                width, height = image.size
+                image.draft('L', (max(1, width // factor), max(1, height // factor)))
+
+        width, height = image.size
+        if max_pixels and width * height > max_pixels:
+            raise Image.DecompressionBombError(
+                f"Image size ({width}x{height}) exceeds the limit of {max_pixels} pixels")
+        grayscale = image.convert('L')
+
+    if target_width and grayscale.width >= 2 * target_width:
+        grayscale = grayscale.reduce(grayscale.width // target_width)
+    return grayscale
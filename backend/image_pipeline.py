@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Vectorized Image Preprocessing for PramanMitra
+NumPy version of the OCRProcessor enhancer chain that works on a single
+grayscale buffer and produces the same pixels as the PIL implementation
+"""
+
+from typing import Optional
+from PIL import Image
+
+try:
+    import numpy as np
+except ImportError:  # Optional: OCRProcessor falls back to the PIL chain
+    np = None
+
+# Rows filtered per band; bounds the scratch memory of the neighbourhood filters
+BAND_ROWS = 128
+
+# Devillard's 19 compare-exchange network for the median of 9 values
+_MEDIAN9_NETWORK = (
+    (1, 2), (4, 5), (7, 8), (0, 1), (3, 4), (6, 7), (1, 2), (4, 5), (7, 8),
+    (0, 3), (5, 8), (4, 7), (3, 6), (1, 4), (2, 5), (4, 7), (4, 2), (6, 4), (4, 2)
+)
+
+
+def vectorized_preprocessing_available() -> bool:
+    return np is not None
+
+
+def enhance_lut(mean: int, contrast: float, brightness: float) -> 'np.ndarray':
+    """Contrast and brightness enhancers fused into one 256-entry lookup table.
+
+    The table is computed with PIL's own blend on a 256-pixel ramp, so the
+    rounding is exactly that of ImageEnhance.Contrast and Brightness.
+    """
+    ramp = Image.frombytes('L', (256, 1), bytes(range(256)))
+    contrasted = Image.blend(Image.new('L', (256, 1), mean), ramp, contrast)
+    brightened = Image.blend(Image.new('L', (256, 1), 0), contrasted, brightness)
+    return np.frombuffer(brightened.tobytes(), dtype=np.uint8)
+
+
+def _with_copied_border(rows, interior, top: bool, bottom: bool):
+    """3x3 kernel output: PIL keeps the outermost pixels of the image unchanged"""
+    out = rows[1:-1].copy()
+    out[:, 1:-1] = interior
+    if top:
+        out = np.concatenate([rows[:1], out])
+    if bottom:
+        out = np.concatenate([out, rows[-1:]])
+    return out
+
+
+def _sharpen(rows, top: bool, bottom: bool, factor: float):
+    """ImageEnhance.Sharpness: blend of the image with its SMOOTH-filtered copy"""
+    r = rows.astype(np.int16)
+    total = (r[:-2, :-2] + r[:-2, 1:-1] + r[:-2, 2:]
+             + r[1:-1, :-2] + 5 * r[1:-1, 1:-1] + r[1:-1, 2:]
+             + r[2:, :-2] + r[2:, 1:-1] + r[2:, 2:])
+    # SMOOTH divides by 13 and rounds; the quotient is never exactly half-way
+    smooth = (total + 6) // 13
+    center = r[1:-1, 1:-1]
+    if factor == 2.0:
+        sharp = 2 * center - smooth
+    else:
+        # Same single-precision arithmetic as PIL's blend
+        smooth = smooth.astype(np.float32)
+        sharp = smooth + np.float32(factor) * (center.astype(np.float32) - smooth)
+    np.clip(sharp, 0, 255, out=sharp)
+    return _with_copied_border(rows, sharp.astype(np.uint8), top, bottom)
+
+
+def _edge_enhance_more(rows, top: bool, bottom: bool):
+    """ImageFilter.EDGE_ENHANCE_MORE: 9 * center minus the 8 neighbours"""
+    r = rows.astype(np.int16)
+    edge = (10 * r[1:-1, 1:-1]
+            - r[:-2, :-2] - r[:-2, 1:-1] - r[:-2, 2:]
+            - r[1:-1, :-2] - r[1:-1, 1:-1] - r[1:-1, 2:]
+            - r[2:, :-2] - r[2:, 1:-1] - r[2:, 2:])
+    np.clip(edge, 0, 255, out=edge)
+    return _with_copied_border(rows, edge.astype(np.uint8), top, bottom)
+
+
+def _median(rows, top: bool, bottom: bool, size: int):
+    """ImageFilter.MedianFilter: the image is extended by repeating its edge pixels"""
+    radius = size // 2
+    padded = np.pad(rows, ((radius if top else 0, radius if bottom else 0), (radius, radius)), mode='edge')
+    height = padded.shape[0] - 2 * radius
+    width = rows.shape[1]
+
+    if size == 3:
+        p = [padded[dy:dy + height, dx:dx + width].copy() for dy in range(3) for dx in range(3)]
+        for i, j in _MEDIAN9_NETWORK:
+            low = np.minimum(p[i], p[j])
+            np.maximum(p[i], p[j], out=p[j])
+            p[i] = low
+        return p[4]
+
+    windows = np.lib.stride_tricks.sliding_window_view(padded, (size, size))
+    windows = windows.reshape(height, width, size * size)
+    middle = size * size // 2
+    return np.partition(windows, middle, axis=-1)[..., middle]
+
+
+def enhance_and_filter(image: Image.Image, contrast: float = 2.5, brightness: float = 1.2,
+                       sharpness: float = 2.0, median_size: int = 3) -> Optional[Image.Image]:
+    """Contrast, brightness, sharpness, median and edge enhancement of an 'L' image.
+
+    Returns None when the image is too small for the 3x3 filters, in which
+    case the caller should use the PIL chain.
+    """
+    buf = np.array(image, dtype=np.uint8)
+    height, width = buf.shape
+    median_radius = median_size // 2
+    if height < 3 or width < 3 or height <= 2 * median_radius or width <= 2 * median_radius:
+        return None
+
+    # Contrast and brightness as one in-place table lookup. The histogram is
+    # built per band because bincount widens its input to 64-bit integers.
+    histogram = np.zeros(256, dtype=np.int64)
+    for start in range(0, height, BAND_ROWS):
+        histogram += np.bincount(buf[start:start + BAND_ROWS].ravel(), minlength=256)
+    mean = int(int(histogram @ np.arange(256)) / buf.size + 0.5)
+    lut = enhance_lut(mean, contrast, brightness)
+    for start in range(0, height, BAND_ROWS):
+        buf[start:start + BAND_ROWS] = lut[buf[start:start + BAND_ROWS]]
+
+    # Neighbourhood filters band by band, written back into the same buffer.
+    # Each stage consumes `halo` rows at band edges that are not image edges.
+    halo = 1 + median_radius + 1
+    saved = buf[:0].copy()  # Unfiltered rows just above the current band
+    for start in range(0, height, BAND_ROWS):
+        stop = min(start + BAND_ROWS, height)
+        low = max(0, start - halo)
+        high = min(height, stop + halo)
+        top, bottom = low == 0, high == height
+
+        block = np.concatenate([saved, buf[start:high]])
+        saved = block[max(low, stop - halo) - low:stop - low].copy()
+
+        rows = _sharpen(block, top, bottom, sharpness)
+        rows = _median(rows, top, bottom, median_size)
+        rows = _edge_enhance_more(rows, top, bottom)
+
+        first = low if top else low + halo
+        buf[start:stop] = rows[start - first:stop - first]
+
+    return Image.fromarray(buf, 'L')
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Issuer Templates for PramanMitra
+Classifies OCR text by document family from its header keywords and gives
+each family a narrowed, ordered pattern set with field post-processors
+"""
+
+import hashlib
+import json
+import re
+from typing import Callable, Dict, Optional
+
+# Characters of the text searched for header keywords
+HEADER_CHARS = 800
+
+
+def _seat_number(value: str) -> Optional[str]:
+    """University seat numbers are a series letter followed by 8 to 11 digits"""
+    return value if re.fullmatch(r'[SB][0-9]{8,11}', value) else None
+
+
+def _grade_point(value: float) -> Optional[float]:
+    return value if 0 < value <= 10 else None
+
+
+# Patterns use the same conventions as OCRProcessor.patterns (group 1 is the
+# value). Post-processors run on the cleaned value and return None to reject
+# it. Fields in strict_fields are not looked up with the generic patterns
+# when the template does not find them, because the generic fallbacks (e.g.
+# any standalone decimal for SGPA) are known to pick the wrong value there.
+ISSUER_TEMPLATES = {
+    'sppu': {
+        'keywords': ('savitribai phule', 'pune university', 'university of pune', 'sppu'),
+        'patterns': {
+            'seat_no': [
+                r'SEAT\s*NO[\s.:]*([S$B][0-9]{8,11})',
+                r'(?:^|\s)([S$][0-9]{9,10})(?:\s|$)'
+            ],
+            'student_name': [
+                r'STUDENT\s*NAME[\s.:]*([A-Za-z\s]+?)(?=MOTHER|$)',
+                r'NAME[\s.:]*([A-Za-z\s]+?)(?=MOTHER|DATE|$)'
+            ],
+            'mother_name': [
+                r'MOTHER\s*NAME[\s.:]*([A-Za-z\s]+?)(?=COLLEGE|FATHER|$)',
+                r"MOTHER(?:'S)?\s*NAME[\s.:]*([A-Za-z\s]+?)(?=COLLEGE|FATHER|$)"
+            ],
+            'sgpa': [
+                r'(?:FIRST|SECOND|THIRD|FOURTH|FIFTH|SIXTH|SEVENTH|EIGHTH)\s*SEMESTER\s*SGPA[\s.:]*([0-9]{1,2}\.[0-9]{1,2})',
+                r'SGPA[\s.:]*([0-9]{1,2}\.[0-9]{1,2})'
+            ],
+            'result_date': [
+                r'RESULT\s*DATE[\s.:]*([0-9]{1,2}\s*[A-Za-z]+\s*[0-9]{4})'
+            ],
+            'subject': [
+                r'[S$]UB\s*:\s*([A-Za-z\s&.]+?)(?=\n|GRADE|RESULT|SGPA|GPA|SEMESTER|$)',
+                r'[S$]UB[\s.]*([A-Za-z\s&.]{3,50})(?=\n|GRADE|RESULT|SGPA|GPA|SEMESTER|$)'
+            ]
+        },
+        'postprocessors': {
+            'seat_no': _seat_number,
+            'sgpa': _grade_point
+        },
+        'strict_fields': ('sgpa',)
+    },
+    'autonomous': {
+        'keywords': ('autonomous', 'grade card', 'statement of grades'),
+        'patterns': {
+            'seat_no': [
+                r'Seat\s*No[\s.:]*([A-Z0-9$]+)',
+                r'PRN[\s.:]*([A-Z0-9]+)',
+                r'Enrol(?:l)?ment\s*(?:No|Number)[\s.:]*([A-Z0-9]+)',
+                r'Roll\s*(?:No|Number)[\s.:]*([A-Z0-9]+)'
+            ],
+            'student_name': [
+                r'Name\s*of\s*(?:the\s*)?Student[\s.:]*([A-Za-z\s]+?)(?=\b(?:Mother|Father|PRN|Seat|Roll)\b|$)',
+                r'Student\s*Name[\s.:]*([A-Za-z\s]+?)(?=\b(?:Mother|Father|PRN|Seat|Roll)\b|$)',
+                r'Candidate\s*Name[\s.:]*([A-Za-z\s]+?)(?=\b(?:Mother|Father|PRN|Seat|Roll)\b|$)'
+            ],
+            'mother_name': [
+                r"Mother(?:'s)?\s*Name[\s.:]*([A-Za-z\s]+?)(?=\b(?:Father|College|PRN|Seat|Roll)\b|$)"
+            ],
+            'sgpa': [
+                r'SGPA[\s.:]*([0-9]{1,2}\.[0-9]{1,2})',
+                r'Semester\s*Grade\s*Point\s*Average[\s.:]*([0-9]{1,2}\.[0-9]{1,2})'
+            ],
+            'result_date': [
+                r'(?:Result\s*)?Date[\s.:]*([0-9]{1,2}\s*[A-Za-z]+\s*[0-9]{4})',
+                r'(?:Result\s*)?Date[\s.:]*([0-9]{2}[/-][0-9]{2}[/-][0-9]{4})'
+            ],
+            'subject': [
+                r'(?:Programme|Program|Branch|Course)[\s.:]*([A-Za-z\s&.]+?)(?=\n|\b(?:Semester|Sem|Year)\b|$)'
+            ]
+        },
+        'postprocessors': {
+            'sgpa': _grade_point
+        },
+        'strict_fields': ('sgpa',)
+    }
+}
+
+
+def classify_issuer(text: str) -> Optional[str]:
+    """Template id whose keywords occur most often in the header of the text, or None"""
+    header = ' '.join(text[:HEADER_CHARS].split()).lower()
+    best, best_hits = None, 0
+    for template_id, template in ISSUER_TEMPLATES.items():
+        hits = sum(1 for keyword in template['keywords'] if keyword in header)
+        if hits > best_hits:
+            best, best_hits = template_id, hits
+    return best
+
+
+def issuer_templates_fingerprint() -> str:
+    """Short hash of the registry, part of the OCR cache key"""
+    registry = {
+        template_id: dict(template, postprocessors={
+            field: postprocess.__name__ for field, postprocess in template.get('postprocessors', {}).items()
+        })
+        for template_id, template in ISSUER_TEMPLATES.items()
+    }
+    encoded = json.dumps(registry, sort_keys=True).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()[:12]
+
+
+def postprocess_fields(template_id: str, extracted_data: Dict[str, any]) -> Dict[str, any]:
+    """Apply a template's post-processors to cleaned field values, in place"""
+    postprocessors: Dict[str, Callable] = ISSUER_TEMPLATES[template_id].get('postprocessors', {})
+    for field, postprocess in postprocessors.items():
+        if extracted_data.get(field) is not None:
+            extracted_data[field] = postprocess(extracted_data[field])
+    return extracted_data
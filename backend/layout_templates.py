@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Layout Templates for PramanMitra
+Registry of known result sheet layouts with normalized field regions, so a
+matching upload is read by OCRing a few small crops instead of the whole page
+"""
+
+import hashlib
+import json
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+# Characters Tesseract may emit for each kind of field
+UPPERCASE_ALNUM = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+
+# Crops shorter than this are upscaled; Tesseract is most accurate on ~30px text
+MIN_REGION_HEIGHT = 48
+REGION_PADDING = 10
+
+# Boxes are (left, top, right, bottom) as fractions of the page width/height.
+# 'pattern' pulls the value out of the region text (group 1 when present).
+LAYOUT_TEMPLATES = {
+    'sppu_result_sheet': {
+        'aspect_ratio': (1.25, 1.55),  # Portrait A4/Letter scans, height / width
+        'header_box': (0.0, 0.0, 1.0, 0.15),
+        'header_keywords': ('savitribai phule', 'pune university', 'university of pune'),
+        'fields': {
+            'seat_no': {
+                'box': (0.05, 0.17, 0.50, 0.22),
+                'psm': 7,
+                'variables': {'tessedit_char_whitelist': UPPERCASE_ALNUM},
+                'pattern': r'([A-Z$][0-9]{7,12})'
+            },
+            'student_name': {
+                'box': (0.05, 0.22, 0.95, 0.27),
+                'psm': 7,
+                'variables': {'tessedit_char_whitelist': LETTERS},
+                'pattern': r'([A-Za-z][A-Za-z\s]+)'
+            },
+            'mother_name': {
+                'box': (0.05, 0.27, 0.95, 0.32),
+                'psm': 7,
+                'variables': {'tessedit_char_whitelist': LETTERS},
+                'pattern': r'([A-Za-z][A-Za-z\s]+)'
+            },
+            'subject': {
+                'box': (0.05, 0.32, 0.95, 0.37),
+                'psm': 7,
+                'variables': {'tessedit_char_whitelist': LETTERS + '&.:'},
+                'pattern': r'([A-Za-z][A-Za-z\s&.:]+)'
+            },
+            'sgpa': {
+                'box': (0.55, 0.80, 0.95, 0.86),
+                'psm': 7,
+                'variables': {'tessedit_char_whitelist': '0123456789.'},
+                'pattern': r'([0-9]{1,2}\.[0-9]{1,2})'
+            }
+        }
+    }
+}
+
+# Field patterns compiled once per process
+_compiled_patterns = {}
+
+
+def register_template(name: str, template: Dict[str, any]):
+    """Add or replace a layout template"""
+    for field, region in template['fields'].items():
+        if len(region['box']) != 4 or not all(0.0 <= v <= 1.0 for v in region['box']):
+            raise ValueError(f"Template {name}: box of {field} must be 4 fractions")
+    LAYOUT_TEMPLATES[name] = template
+
+
+def templates_fingerprint() -> str:
+    """Short hash of the registry, part of the OCR cache key"""
+    encoded = json.dumps(LAYOUT_TEMPLATES, sort_keys=True).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()[:12]
+
+
+def field_pattern(pattern: str) -> re.Pattern:
+    compiled = _compiled_patterns.get(pattern)
+    if compiled is None:
+        compiled = _compiled_patterns[pattern] = re.compile(pattern)
+    return compiled
+
+
+def crop_region(image: Image.Image, box: Tuple[float, float, float, float]) -> Image.Image:
+    """Crop a normalized box, upscaled and padded so Tesseract sees a clean line"""
+    width, height = image.size
+    left, top, right, bottom = box
+    crop = image.crop((int(left * width), int(top * height),
+                       max(int(right * width), int(left * width) + 1),
+                       max(int(bottom * height), int(top * height) + 1)))
+    if crop.height < MIN_REGION_HEIGHT:
+        ratio = MIN_REGION_HEIGHT / crop.height
+        crop = crop.resize((max(1, int(crop.width * ratio)), MIN_REGION_HEIGHT),
+                           Image.Resampling.LANCZOS)
+    return ImageOps.expand(crop, border=REGION_PADDING, fill=255)
+
+
+def match_template(image: Image.Image,
+                   read_text: Callable[[Image.Image], str]) -> Optional[Tuple[str, Dict[str, any]]]:
+    """Find the template for a page by aspect ratio, then by keywords in its header strip.
+
+    read_text OCRs a cropped image; each distinct header box is read at most once.
+    """
+    width, height = image.size
+    if not width or not height:
+        return None
+    aspect = height / width
+
+    headers = {}
+    for name, template in LAYOUT_TEMPLATES.items():
+        low, high = template['aspect_ratio']
+        if not low <= aspect <= high:
+            continue
+        box = tuple(template['header_box'])
+        if box not in headers:
+            headers[box] = re.sub(r'\s+', ' ', read_text(crop_region(image, box))).lower()
+        if any(keyword in headers[box] for keyword in template['header_keywords']):
+            return name, template
+    return None
+
+
+def read_template_fields(image: Image.Image, template: Dict[str, any],
+                         read_region: Callable[[Image.Image, int, Dict[str, str]], Tuple[str, List[Dict[str, any]]]]
+                         ) -> Tuple[Dict[str, Optional[str]], str, Dict[str, float]]:
+    """OCR each field region with its own settings.
+
+    read_region returns the region text and its words with confidences.
+    Returns the raw values (None where the region text does not match the
+    field pattern), the region texts as 'field: text' lines and the OCR
+    confidence of each value, that of its weakest word.
+    """
+    values = {}
+    lines = []
+    confidences = {}
+    for field, region in template['fields'].items():
+        text, words = read_region(crop_region(image, region['box']), region.get('psm', 7),
+                                  region.get('variables') or {})
+        text = text.strip()
+        lines.append(f"{field}: {text}")
+
+        match = field_pattern(region['pattern']).search(text)
+        value = None
+        if match:
+            value = (match.group(1) if match.re.groups else match.group(0)).strip()
+        values[field] = value if value and len(value) > 1 else None
+        if values[field] and words:
+            confidences[field] = min(word['conf'] for word in words)
+    return values, '\n'.join(lines), confidences
@@ -238,3 +238,31 @@ class Blacklist(db.Model):
             'fraud_log': self.fraud_log.to_dict() if self.fraud_log else None,
             'blacklisted_by_username': self.blacklisted_by_user.username if self.blacklisted_by_user else None
         }
+
+class RegistryState(db.Model):
+    """Single-row generation counter of the certificate registry.
+
+    Every write to Certificate bumps it in the same transaction, so each
+    worker's certificate lookup cache can tell when it has gone stale.
+    """
+    __tablename__ = 'registry_state'
+
+    id = db.Column(db.Integer, primary_key=True)
+    generation = db.Column(db.BigInteger, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    @staticmethod
+    def current_generation() -> int:
+        # A column query always reads the database, never the session's identity map
+        generation = db.session.query(RegistryState.generation).filter_by(id=1).scalar()
+        return generation or 0
+
+    @staticmethod
+    def bump():
+        """Increment the generation as part of the current transaction"""
+        updated = RegistryState.query.filter_by(id=1).update({
+            RegistryState.generation: RegistryState.generation + 1,
+            RegistryState.updated_at: datetime.utcnow()
+        })
+        if not updated:
+            db.session.add(RegistryState(id=1, generation=1))
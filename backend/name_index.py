@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Name Index for PramanMitra
+In-memory inverted trigram index over the registry's student and mother
+names, for finding the certificate of a document whose seat number could
+not be read
+"""
+
+import contextlib
+import math
+import os
+import threading
+import time
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from name_similarity import normalize_name
+
+# Rows turned into postings at a time, bounding the memory of one batch's trigrams
+INDEX_BATCH = 10000
+
+# Unmemoized normalization, so loading millions of names leaves the cache to lookups
+_normalize = normalize_name.__wrapped__
+
+
+def name_trigrams(name: str) -> set:
+    """Trigrams of every word of the normalized name, padded with a space on both sides (" ka", "du " ...)"""
+    return {padded[index:index + 3] for padded in [f" {word} " for word in _normalize(name or '').split()]
+            for index in range(len(padded) - 2)}
+
+
+class _FieldPostings:
+    """Sorted document ids of every trigram of one name field, and each document's trigram count"""
+
+    def __init__(self):
+        self.codes = {}
+        self.postings = []
+        self.sizes = array('H')
+
+    def add(self, first_document: int, trigram_sets: List[set]):
+        """Index trigram_sets as documents first_document, first_document + 1 ..."""
+        if not trigram_sets:
+            return
+        codes = self.codes
+        flat = np.array([codes.setdefault(trigram, len(codes)) for trigrams in trigram_sets for trigram in trigrams],
+                        dtype=np.int64)
+        self.postings.extend(array('I') for _ in range(len(codes) - len(self.postings)))
+        sizes = np.array([len(trigrams) for trigrams in trigram_sets], dtype=np.int64)
+        documents = np.repeat(np.arange(first_document, first_document + len(trigram_sets), dtype=np.uint32), sizes)
+        if len(flat):
+            # A stable sort by trigram keeps every trigram's documents ascending
+            order = np.argsort(flat, kind='stable')
+            flat, documents = flat[order], documents[order]
+            starts = np.flatnonzero(np.diff(flat)) + 1
+            for code, chunk in zip(flat[np.concatenate(([0], starts))].tolist(), np.split(documents, starts)):
+                self.postings[code].frombytes(chunk.tobytes())
+        self.sizes.extend(np.minimum(sizes, 65535).tolist())
+
+    def shared(self, trigrams: set, count: int) -> np.ndarray:
+        """How many of trigrams each of the first count documents has"""
+        lists = [np.frombuffer(self.postings[self.codes[trigram]], dtype=np.uint32)
+                 for trigram in trigrams if trigram in self.codes]
+        if not lists:
+            return np.zeros(count, dtype=np.int64)
+        # Copied out of the arrays, which cannot grow while a view of them exists
+        return np.bincount(np.concatenate(lists), minlength=count)[:count]
+
+
+class NameTrigramIndex:
+    """Inverted trigram index of active certificates' student and mother names.
+
+    Every trigram has a sorted array of the documents (certificates) that
+    contain it. A lookup counts, in one bincount over the query trigrams'
+    arrays, how many query trigrams each document shares; documents sharing
+    at least min_overlap of them are ranked by the Dice similarity of their
+    trigram sets, with the mother name (when given) weighted in at
+    mother_weight. Work grows with the matching postings, not with names
+    compared, and the lock is held for one lookup's array copies only.
+
+    Rows come from row_loader(after_id) as (certificate id, student name,
+    mother name) in ascending id order. The first build runs in a
+    background thread when refresh() is called at startup; until it
+    finishes, ready is False and lookups find nothing rather than wait for
+    it. Afterwards, whenever the registry generation (generation_loader,
+    checked at most every check_interval seconds, outside the lock)
+    changes, only rows after the highest indexed id are loaded and
+    appended to the live index. Rows committed out of id order and
+    deactivated certificates are picked up by a full rebuild, run when the
+    registry changed and rebuild_interval seconds have passed since the
+    last one, or on the next change after rebuild() is called; it builds
+    new postings while the current index keeps answering and swaps them in
+    whole. Candidates are certificate ids for the caller to confirm
+    against the registry, which also drops deactivated ones.
+    """
+
+    def __init__(self, row_loader: Callable[[int], Iterable[Tuple[int, str, str]]],
+                 generation_loader: Callable[[], int], min_overlap: float = 0.4,
+                 mother_weight: float = 0.25, max_candidates: int = 10, check_interval: float = 5.0,
+                 rebuild_interval: float = 3600.0):
+        self.row_loader = row_loader
+        self.generation_loader = generation_loader
+        self.min_overlap = min_overlap
+        self.mother_weight = mother_weight
+        self.max_candidates = max_candidates
+        self.check_interval = check_interval
+        self.rebuild_interval = rebuild_interval
+        self.stats = {'builds': 0, 'build_seconds': 0.0, 'appends': 0, 'append_seconds': 0.0, 'lookups': 0}
+        self._reset()
+        # A forked worker (e.g. gunicorn --preload) does not inherit the build thread
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        # (student postings, mother postings, certificate ids) of the built index, None before the first build
+        self._index = None
+        self._last_id = 0
+        self._lock = threading.Lock()
+        self._generation = None
+        # Generation and time of the last full build, and whether the next change rebuilds anyway
+        self._built_generation = None
+        self._built_at = None
+        self._rebuild_requested = False
+        self._updating = False
+        self._checked_at = None
+        self._ready = threading.Event()
+
+    @property
+    def ready(self) -> bool:
+        """Whether the first build has finished"""
+        return self._ready.is_set()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Wait up to timeout seconds (forever when None) for the first build, returning ready"""
+        return self._ready.wait(timeout)
+
+    def refresh(self):
+        """Update the index in a background thread when the registry generation changed.
+        Every lookup calls it; calling it at startup starts the first build."""
+        now = time.monotonic()
+        with self._lock:
+            if self._updating or (self._checked_at is not None and now - self._checked_at < self.check_interval):
+                return
+            self._checked_at = now
+            self._updating = True
+        try:
+            generation = self.generation_loader()
+        except Exception as e:
+            print(f"Error reading registry generation for the name index: {str(e)}")
+            generation = None
+        with self._lock:
+            if self.ready and generation is not None and generation == self._generation:
+                self._updating = False
+                return
+            full = (not self.ready or generation is None or self._rebuild_requested
+                    or (generation != self._built_generation and now - self._built_at >= self.rebuild_interval))
+        threading.Thread(target=self._update, args=(generation, full), daemon=True).start()
+
+    def rebuild(self):
+        """Rebuild the index from scratch on the next registry change, e.g. after certificates were deactivated"""
+        with self._lock:
+            self._rebuild_requested = True
+            self._checked_at = None
+
+    def _update(self, generation: Optional[int], full: bool):
+        started = time.perf_counter()
+        try:
+            if full:
+                # Built aside while the current index keeps answering
+                index, last_id = (_FieldPostings(), _FieldPostings(), array('q')), 0
+                with self._lock:
+                    self._rebuild_requested = False
+            else:
+                index, last_id = self._index, self._last_id
+            lock = contextlib.nullcontext() if full else self._lock
+            batch = []
+            for row in self.row_loader(last_id):
+                batch.append(row)
+                if len(batch) >= INDEX_BATCH:
+                    last_id = self._add(index, batch, lock)
+                    batch = []
+            last_id = self._add(index, batch, lock) or last_id
+            seconds = round(time.perf_counter() - started, 3)
+            with self._lock:
+                self._index, self._last_id = index, last_id
+                self._generation = generation
+                if full:
+                    self._built_generation, self._built_at = generation, time.monotonic()
+                    self.stats['builds'] += 1
+                    self.stats['build_seconds'] = seconds
+                else:
+                    self.stats['appends'] += 1
+                    self.stats['append_seconds'] = seconds
+            self._ready.set()
+        except Exception as e:
+            print(f"Error {'building' if full else 'updating'} the name index: {str(e)}")
+            if full:
+                with self._lock:
+                    self._rebuild_requested = True
+        finally:
+            with self._lock:
+                self._updating = False
+
+    @staticmethod
+    def _add(index: Tuple[_FieldPostings, _FieldPostings, array], rows: List[Tuple[int, str, str]],
+             lock) -> Optional[int]:
+        """Append rows to index, holding lock while it changes; the last row's id, None without rows"""
+        if not rows:
+            return None
+        # Trigrams outside the lock, once per distinct name (mother names repeat a lot)
+        trigrams = {}
+        for _, student_name, mother_name in rows:
+            for name in (student_name, mother_name):
+                if name not in trigrams:
+                    trigrams[name] = name_trigrams(name)
+        student_trigrams = [trigrams[student_name] for _, student_name, _ in rows]
+        mother_trigrams = [trigrams[mother_name] for _, _, mother_name in rows]
+        students, mothers, certificate_ids = index
+        with lock:
+            first_document = len(certificate_ids)
+            students.add(first_document, student_trigrams)
+            mothers.add(first_document, mother_trigrams)
+            certificate_ids.extend(certificate_id for certificate_id, _, _ in rows)
+        return rows[-1][0]
+
+    def invalidate(self):
+        """Check the registry generation on next use, e.g. after this process wrote to the registry"""
+        with self._lock:
+            self._checked_at = None
+
+    def candidates(self, student_name: str, mother_name: str = None,
+                   limit: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Up to limit (default max_candidates) certificate ids whose names are most like these,
+        as (id, trigram similarity 0-1), best first; empty before the first build finishes (see ready)"""
+        query = name_trigrams(student_name)
+        if not query:
+            return []
+        self.refresh()
+        mother_query = name_trigrams(mother_name)
+        with self._lock:
+            self.stats['lookups'] += 1
+            if self._index is None:
+                return []
+            # Under the lock, as appends grow the arrays of the live index
+            certificate_ids, scores = self._rank(self._index, query, mother_query, limit or self.max_candidates)
+        ranked = sorted(zip(certificate_ids.tolist(), scores.tolist()), key=lambda item: (-item[1], item[0]))
+        return [(certificate_id, round(score, 4)) for certificate_id, score in ranked]
+
+    def _rank(self, index: Tuple[_FieldPostings, _FieldPostings, array], query: set, mother_query: set,
+              limit: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Best certificate ids of index and their scores; called with the lock held"""
+        students, mothers, certificate_ids = index
+        count = len(certificate_ids)
+        required = max(1, math.ceil(self.min_overlap * len(query)))
+        shared = students.shared(query, count)
+        documents = np.flatnonzero(shared >= required)
+        sizes = np.frombuffer(students.sizes, dtype=np.uint16)[documents]
+        scores = 2.0 * shared[documents] / (len(query) + sizes)
+        if mother_query and len(documents):
+            mother_shared = mothers.shared(mother_query, count)[documents]
+            mother_sizes = np.frombuffer(mothers.sizes, dtype=np.uint16)[documents]
+            scores = ((1 - self.mother_weight) * scores
+                      + self.mother_weight * 2.0 * mother_shared / (len(mother_query) + mother_sizes))
+        if len(documents) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            documents, scores = documents[top], scores[top]
+        return np.frombuffer(certificate_ids, dtype=np.int64)[documents], scores
+
+    def get_stats(self) -> Dict[str, any]:
+        with self._lock:
+            stats = dict(self.stats)
+            students, _, certificate_ids = self._index or (_FieldPostings(), None, ())
+            stats['certificates'] = len(certificate_ids)
+            stats['trigrams'] = len(students.codes)
+            stats['generation'] = self._generation
+            stats['ready'] = self.ready
+            stats['updating'] = self._updating
+        return stats
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Name Similarity for PramanMitra
+The multi-strategy name matcher of CertificateVerifier, scored with C-backed
+rapidfuzz wherever that gives the same numbers as before.
+
+Scores are the fuzzywuzzy (difflib) scores the verifier always produced;
+scripts/check_name_similarity.py checks them against a golden set.
+rapidfuzz's Indel similarity is never below difflib's ratio for the same
+strings, so each strategy is first bounded in C and only strategies whose
+bound can still beat the best score are scored exactly. Subject matching
+uses the same scheme, and the *_similarities functions score many record
+pairs at once for bulk verification.
+
+fuzzywuzzy is kept on purpose for those exact scores. difflib counts the
+characters of greedily chosen matching blocks, which can be fewer than
+the longest common subsequence rapidfuzz counts, so the two only
+provably agree at 100 (identical strings, or a substring for the
+partial ratio; see _exact_best). Replacing it would change the scores
+and therefore the verdicts near every threshold; this module keeps them
+and pays for pure-Python difflib only when a bound is below 100 and still
+beats the best score.
+"""
+
+import re
+from functools import lru_cache
+from typing import List, Optional
+
+import numpy as np
+from fuzzywuzzy import fuzz as legacy_fuzz
+from fuzzywuzzy import utils as legacy_utils
+from rapidfuzz import fuzz, process
+from rapidfuzz.distance import LCSseq
+
+# Similarities from here up all get the highest name confidence score
+TOP_BAND = 95
+
+# Subject similarities from here up all get the highest subject score
+SUBJECT_TOP_BAND = 90
+
+# Common OCR character confusions, applied in this order
+OCR_REPLACEMENTS = (
+    ('0', 'o'),   # Zero to O
+    ('1', 'i'),   # One to I
+    ('5', 's'),   # Five to S (sometimes)
+    ('8', 'b'),   # Eight to B (sometimes)
+    ('rn', 'm'),  # rn often misread as m
+    ('ii', 'u'),  # ii sometimes misread as u
+    ('cl', 'd'),  # cl sometimes misread as d
+)
+
+_PUNCTUATION = re.compile(r'[^a-zA-Z0-9\s]')
+_SPACES = re.compile(r'\s+')
+
+# fuzzywuzzy rounds difflib's ratio, so its score can exceed a bound by 0.5
+_ROUNDING = 0.5 - 1e-6
+
+# difflib drops popular characters (autojunk) of strings this long, below it a bound of 100 is exact
+_AUTOJUNK_LENGTH = 200
+
+
+def _legacy_process(text: str) -> str:
+    return legacy_utils.full_process(text, force_ascii=True)
+
+
+# fuzzywuzzy's token scorers process their input; bounds must see the same strings
+_BOUND_PROCESSORS = {fuzz.token_sort_ratio: _legacy_process, fuzz.token_set_ratio: _legacy_process}
+
+
+@lru_cache(maxsize=65536)
+def normalize_name(name: str) -> str:
+    """Lowercased name without punctuation and with OCR confusions undone"""
+    if not name:
+        return ""
+    name = name.strip().lower()
+    name = _PUNCTUATION.sub(' ', name)
+    name = _SPACES.sub(' ', name)
+    for old, new in OCR_REPLACEMENTS:
+        name = name.replace(old, new)
+    return name.strip()
+
+
+def lcs_similarity(s1: str, s2: str) -> int:
+    """Similarity (0-100) from the longest common subsequence, for badly damaged OCR"""
+    if not s1 or not s2:
+        return 0
+    return int((2.0 * LCSseq.similarity(s1, s2)) / (len(s1) + len(s2)) * 100)
+
+
+def _exact_best(best: int, candidates: list, stop_at: Optional[int]) -> int:
+    """best raised by the exact scorer of every (bound, scorer, first, second) that can still beat it"""
+    # Most promising first, so later bounds are more often already beaten
+    candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+    for bound, exact_scorer, first, second in candidates:
+        if bound < best + _ROUNDING or (stop_at is not None and best >= stop_at):
+            break
+        if bound >= 100 and max(len(first), len(second)) < _AUTOJUNK_LENGTH:
+            # The strings (token sets, or a substring for partial_ratio) are equal, which difflib finds too
+            return 100
+        best = max(best, exact_scorer(first, second))
+    return best
+
+
+def _bounded(strategies: list) -> list:
+    return [(bound_scorer(first, second, processor=_BOUND_PROCESSORS.get(bound_scorer)), exact_scorer, first, second)
+            for bound_scorer, exact_scorer, first, second in strategies]
+
+
+def _name_strategies(norm_extracted: str, norm_db: str) -> list:
+    """(C upper bound, exact scorer, first, second) of every fuzzy name strategy"""
+    strategies = [
+        (fuzz.ratio, legacy_fuzz.ratio, norm_extracted, norm_db),
+        (fuzz.partial_ratio, legacy_fuzz.partial_ratio, norm_extracted, norm_db),
+        (fuzz.token_sort_ratio, legacy_fuzz.token_sort_ratio, norm_extracted, norm_db),
+        (fuzz.token_set_ratio, legacy_fuzz.token_set_ratio, norm_extracted, norm_db),
+    ]
+
+    # Reversed order (first/last name swap)
+    extracted_parts = norm_extracted.split()
+    db_parts = norm_db.split()
+    if len(extracted_parts) >= 2 and len(db_parts) >= 2:
+        reversed_extracted = ' '.join(reversed(extracted_parts))
+        strategies.append((fuzz.ratio, legacy_fuzz.ratio, reversed_extracted, norm_db))
+        strategies.append((fuzz.token_sort_ratio, legacy_fuzz.token_sort_ratio, reversed_extracted, norm_db))
+
+    # Initials (for cases like "M. SMITH" vs "MARY SMITH")
+    if extracted_parts and db_parts:
+        extracted_initials = ''.join(part[0] for part in extracted_parts)
+        db_initials = ''.join(part[0] for part in db_parts)
+        strategies.append((fuzz.ratio, legacy_fuzz.ratio, extracted_initials, db_initials))
+    return strategies
+
+
+def _subject_strategies(extracted_subject: str, db_subject: str) -> list:
+    first, second = extracted_subject.lower(), db_subject.lower()
+    return [
+        (fuzz.ratio, legacy_fuzz.ratio, first, second),
+        (fuzz.partial_ratio, legacy_fuzz.partial_ratio, first, second),
+        (fuzz.token_sort_ratio, legacy_fuzz.token_sort_ratio, first, second),
+    ]
+
+
+def name_similarity(extracted_name: str, db_name: str, stop_at: Optional[int] = TOP_BAND) -> int:
+    """Best similarity (0-100) of two names over all matching strategies.
+
+    Scoring stops as soon as a strategy reaches stop_at, so a similarity of
+    stop_at or more is only known to be at least stop_at; below it the
+    result is exact. stop_at=None always returns the exact best similarity.
+    """
+    if not extracted_name or not db_name:
+        return 0
+    norm_extracted = normalize_name(extracted_name)
+    norm_db = normalize_name(db_name)
+
+    best = lcs_similarity(norm_extracted, norm_db)
+    if stop_at is not None and best >= stop_at:
+        return best
+    return _exact_best(best, _bounded(_name_strategies(norm_extracted, norm_db)), stop_at)
+
+
+def subject_similarity(extracted_subject: str, db_subject: str, stop_at: Optional[int] = SUBJECT_TOP_BAND) -> int:
+    """Best of ratio, partial_ratio and token_sort_ratio of two lowercased subjects (stop_at as for names)"""
+    if not extracted_subject or not db_subject:
+        return 0
+    return _exact_best(0, _bounded(_subject_strategies(extracted_subject, db_subject)), stop_at)
+
+
+def _paired_best(best: np.ndarray, strategies: List[list], stop_at: Optional[int]) -> np.ndarray:
+    """_exact_best of every pair, with all bounds computed in C first.
+
+    strategies holds the strategy list of every pair, empty for pairs whose
+    best is already final. Pairs may have different strategies (a one-word
+    name has no reversed order), so bounds are computed per column and
+    bound scorer, one cpdist call each.
+    """
+    width = max((len(row) for row in strategies), default=0)
+    bounds = np.full((len(strategies), width), -1.0)
+    for column in range(width):
+        groups = {}
+        for index, row in enumerate(strategies):
+            if len(row) > column:
+                groups.setdefault(row[column][0], []).append(index)
+        for bound_scorer, rows in groups.items():
+            bounds[rows, column] = process.cpdist(
+                [strategies[index][column][2] for index in rows], [strategies[index][column][3] for index in rows],
+                scorer=bound_scorer, processor=_BOUND_PROCESSORS.get(bound_scorer), workers=-1)
+
+    open_rows = (bounds >= best[:, None] + _ROUNDING).any(axis=1)
+    if stop_at is not None:
+        open_rows &= best < stop_at
+    for index in np.flatnonzero(open_rows):
+        candidates = [(bounds[index, column], exact_scorer, first, second)
+                      for column, (_, exact_scorer, first, second) in enumerate(strategies[index])]
+        best[index] = _exact_best(int(best[index]), candidates, stop_at)
+    return best
+
+
+def _unique_pairs(firsts: List[str], seconds: List[str]):
+    """Distinct pairs, and the position of every input pair among them"""
+    positions = {}
+    indexes = [positions.setdefault(pair, len(positions)) for pair in zip(firsts, seconds)]
+    return list(positions), np.array(indexes, dtype=np.int64)
+
+
+def name_similarities(extracted_names: List[str], db_names: List[str],
+                      stop_at: Optional[int] = TOP_BAND) -> np.ndarray:
+    """name_similarity of every (extracted_names[i], db_names[i]) pair, as an integer array.
+
+    Repeated pairs are scored once, and every pair's LCS and strategy
+    bounds come from rapidfuzz's element-wise cpdist in one call each.
+    """
+    pairs, indexes = _unique_pairs(extracted_names, db_names)
+    if not pairs:
+        return np.zeros(0, dtype=np.int64)
+    present = np.array([bool(first) and bool(second) for first, second in pairs])
+    normalized = [(normalize_name(first), normalize_name(second)) if both else ('', '')
+                  for (first, second), both in zip(pairs, present)]
+
+    lcs = process.cpdist([first for first, _ in normalized], [second for _, second in normalized],
+                         scorer=LCSseq.similarity, workers=-1)
+    lengths = np.array([len(first) + len(second) for first, second in normalized], dtype=np.float64)
+    scored = present & np.array([bool(first) and bool(second) for first, second in normalized])
+    best = np.zeros(len(pairs), dtype=np.int64)
+    best[scored] = ((2.0 * lcs[scored]) / lengths[scored] * 100).astype(np.int64)
+
+    final = ~present
+    if stop_at is not None:
+        final |= best >= stop_at
+    strategies = [[] if done else _name_strategies(first, second)
+                  for (first, second), done in zip(normalized, final)]
+    return _paired_best(best, strategies, stop_at)[indexes]
+
+
+def subject_similarities(extracted_subjects: List[str], db_subjects: List[str],
+                         stop_at: Optional[int] = SUBJECT_TOP_BAND) -> np.ndarray:
+    """subject_similarity of every (extracted_subjects[i], db_subjects[i]) pair, as an integer array"""
+    pairs, indexes = _unique_pairs(extracted_subjects, db_subjects)
+    if not pairs:
+        return np.zeros(0, dtype=np.int64)
+    strategies = [_subject_strategies(first, second) if first and second else [] for first, second in pairs]
+    return _paired_best(np.zeros(len(pairs), dtype=np.int64), strategies, stop_at)[indexes]
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+OCR Result Cache for PramanMitra
+Content-addressed (SHA-256 of the upload) cache of OCR results, kept in an
+in-memory LRU and on disk with size-based eviction
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class OCRResultCache:
+    """Two-level cache of OCR result dicts (raw_text, structured_data, ...) keyed by file content.
+
+    The memory level is a per-process LRU. The disk level can be shared by
+    every worker on a node; when it grows past max_disk_bytes the least
+    recently used entries are removed until it is back under 90% of it.
+    Entries hold the OCR text of certificates (names, seat numbers), so
+    the directory is private to the server's user (mode 0700) and the
+    disk level is turned off when it belongs to another user.
+    """
+
+    def __init__(self, max_items: int = 512, cache_dir: Optional[str] = None,
+                 max_disk_bytes: int = 256 * 1024 * 1024):
+        self.max_items = max_items
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = None  # Measured on first write
+        self.stats = {'hits': 0, 'memory_hits': 0, 'disk_hits': 0, 'misses': 0,
+                      'stores': 0, 'disk_evictions': 0}
+
+        if cache_dir and not self._private_dir(cache_dir):
+            self.cache_dir = None
+
+    @staticmethod
+    def _private_dir(path: str) -> bool:
+        """Create path readable by this user only, or make it so; False when that is not possible"""
+        try:
+            os.makedirs(path, mode=0o700, exist_ok=True)
+            if hasattr(os, 'getuid') and os.stat(path).st_uid != os.getuid():
+                print(f"OCR cache directory {path} belongs to another user, disk cache disabled")
+                return False
+            os.chmod(path, 0o700)
+            return True
+        except OSError as e:
+            print(f"Error preparing OCR cache directory {path}, disk cache disabled: {str(e)}")
+            return False
+
+    @staticmethod
+    def make_key(data: bytes, version: str) -> str:
+        """Cache key for file bytes processed by a given OCR pipeline version"""
+        digest = hashlib.sha256()
+        digest.update(version.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(data)
+        return digest.hexdigest()
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f'{key}.json')
+
+    def get(self, key: str) -> Optional[Dict[str, any]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.stats['hits'] += 1
+                self.stats['memory_hits'] += 1
+                return copy.deepcopy(entry)
+
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self.stats['hits'] += 1
+            self.stats['disk_hits'] += 1
+            self._remember(key, entry)
+        return copy.deepcopy(entry)
+
+    def put(self, key: str, result: Dict[str, any]):
+        entry = copy.deepcopy(result)
+        with self._lock:
+            self._remember(key, entry)
+            self.stats['stores'] += 1
+        self._write_disk(key, entry)
+
+    def _remember(self, key: str, entry: Dict[str, any]):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, any]]:
+        if not self.cache_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                entry = json.load(file)
+            # Refresh mtime so eviction is least-recently-used
+            os.utime(path, None)
+            return entry
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error reading OCR cache entry {key}: {str(e)}")
+            return None
+
+    def _write_disk(self, key: str, entry: Dict[str, any]):
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+            with open(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w',
+                      encoding='utf-8') as file:
+                json.dump(entry, file)
+            size = os.path.getsize(temp_path)
+            os.replace(temp_path, path)
+        except Exception as e:
+            print(f"Error writing OCR cache entry {key}: {str(e)}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._measure_disk()
+            else:
+                self._disk_bytes += size
+            over_limit = self._disk_bytes > self.max_disk_bytes
+        if over_limit:
+            self._evict_disk()
+
+    def _disk_entries(self):
+        for shard in os.scandir(self.cache_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith('.json'):
+                    yield entry
+
+    def _measure_disk(self) -> int:
+        return sum(entry.stat().st_size for entry in self._disk_entries())
+
+    def _evict_disk(self):
+        """Remove least recently used files until the cache is under 90% of its limit"""
+        # Rescan: other workers write to the same directory
+        entries = []
+        for entry in self._disk_entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_disk_bytes * 0.9)
+        evicted = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                evicted += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+
+        with self._lock:
+            self._disk_bytes = total
+            self.stats['disk_evictions'] += evicted
+
+    def get_stats(self) -> Dict[str, any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['memory_items'] = len(self._memory)
+            stats['disk_bytes'] = self._disk_bytes
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        return stats
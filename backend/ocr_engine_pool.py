@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Tesseract Engine Pool for PramanMitra
+Keeps warm, preloaded Tesseract engines per worker process so an image
+no longer pays for a tesseract subprocess and a traineddata load
+"""
+
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+try:
+    import tesserocr
+except ImportError:  # Optional: OCRProcessor falls back to pytesseract
+    tesserocr = None
+
+
+def engine_pool_available() -> bool:
+    """Check whether the tesserocr bindings are installed"""
+    return tesserocr is not None
+
+
+class TesseractEnginePool:
+    """Fixed-size pool of tesserocr engines, recycled after max_uses images.
+
+    Engines are created eagerly so the traineddata is loaded before the
+    first request. A pool belongs to the process that created it; callers
+    that may fork (gunicorn preload) should create it lazily per worker.
+    """
+
+    def __init__(self, size: int = 2, max_uses: int = 500, lang: str = 'eng',
+                 tessdata_path: Optional[str] = None, oem: int = 3, psm: int = 6):
+        if tesserocr is None:
+            raise RuntimeError('tesserocr is not installed')
+        if size < 1:
+            raise ValueError('Engine pool size must be at least 1')
+
+        self.size = size
+        self.max_uses = max_uses
+        self.lang = lang
+        self.tessdata_path = tessdata_path
+        self.oem = oem
+        self.psm = psm
+        self.pid = os.getpid()
+
+        # LIFO keeps the most recently used (hottest) engine in rotation
+        self._idle = queue.LifoQueue()
+        self._stats_lock = threading.Lock()
+        self.stats = {'images': 0, 'engines_created': 0, 'engines_recycled': 0}
+
+        for _ in range(size):
+            self._idle.put((self._create_engine(), 0))
+
+    def _create_engine(self):
+        kwargs = {'lang': self.lang, 'oem': self.oem, 'psm': self.psm}
+        if self.tessdata_path:
+            kwargs['path'] = self.tessdata_path
+        api = tesserocr.PyTessBaseAPI(**kwargs)
+        with self._stats_lock:
+            self.stats['engines_created'] += 1
+        return api
+
+    @contextmanager
+    def engine(self):
+        """Check out an engine; it is replaced once it hits max_uses or fails"""
+        api, uses = self._idle.get()
+        if api is None:
+            # A previous recreation failed, retry now
+            try:
+                api = self._create_engine()
+            except Exception:
+                self._idle.put((None, 0))
+                raise
+
+        healthy = False
+        try:
+            yield api
+            healthy = True
+        finally:
+            uses += 1
+            if not healthy or (self.max_uses and uses >= self.max_uses):
+                try:
+                    api.End()
+                except Exception:
+                    pass
+                with self._stats_lock:
+                    self.stats['engines_recycled'] += 1
+                try:
+                    api, uses = self._create_engine(), 0
+                except Exception as e:
+                    print(f"Error recreating Tesseract engine: {str(e)}")
+                    api, uses = None, 0
+            self._idle.put((api, uses))
+
+    def recognize(self, image: Image.Image, psm: Optional[int] = None,
+                  variables: Optional[Dict[str, str]] = None) -> str:
+        """OCR a PIL image with an optional page segmentation mode and Tesseract variables"""
+        return self._recognize(image, psm, variables, with_words=False)[0]
+
+    def recognize_words(self, image: Image.Image, psm: Optional[int] = None,
+                        variables: Optional[Dict[str, str]] = None,
+                        timeout: Optional[float] = None) -> Tuple[str, List[Dict[str, any]]]:
+        """Text plus every word with its confidence (0-1) and [left, top, width, height] box.
+
+        Recognition is cancelled with TimeoutError after timeout seconds.
+        """
+        return self._recognize(image, psm, variables, with_words=True, timeout=timeout)
+
+    def _recognize(self, image: Image.Image, psm: Optional[int], variables: Optional[Dict[str, str]],
+                   with_words: bool, timeout: Optional[float] = None) -> Tuple[str, List[Dict[str, any]]]:
+        words = []
+        with self.engine() as api:
+            previous = {}
+            try:
+                api.SetPageSegMode(psm if psm is not None else self.psm)
+                for name, value in (variables or {}).items():
+                    previous[name] = api.GetVariableAsString(name)
+                    api.SetVariable(name, str(value))
+                api.SetImage(image)
+                # Recognize takes milliseconds and returns False once cancelled
+                if timeout is not None and not api.Recognize(max(1, int(timeout * 1000))):
+                    raise TimeoutError('Tesseract recognition timeout')
+                text = api.GetUTF8Text()
+                if with_words:
+                    # Reads the results of the recognition GetUTF8Text ran
+                    level = tesserocr.RIL.WORD
+                    for word in tesserocr.iterate_level(api.GetIterator(), level):
+                        word_text = (word.GetUTF8Text(level) or '').strip()
+                        if not word_text:
+                            continue
+                        left, top, right, bottom = word.BoundingBox(level)
+                        words.append({'text': word_text, 'conf': max(0.0, word.Confidence(level)) / 100,
+                                      'box': [left, top, right - left, bottom - top]})
+            finally:
+                # Engines are shared, so per-call settings must not leak
+                for name, value in previous.items():
+                    api.SetVariable(name, value or '')
+                api.Clear()
+
+        with self._stats_lock:
+            self.stats['images'] += 1
+        return text, words
+
+    def close(self):
+        while True:
+            try:
+                api, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if api is not None:
+                api.End()
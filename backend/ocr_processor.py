@@ -4,18 +4,110 @@ Simplified OCR Processor for PramanMitra
 Extracts minimal required fields from result PDF or image
 """
 
+import io
 import os
 import re
+import threading
+import time
 import pytesseract
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from PIL import Image, ImageEnhance, ImageFilter
-from typing import Dict, Tuple
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from field_extractor import FieldExtractor
+from ocr_engine_pool import TesseractEnginePool, engine_pool_available
+from ocr_cache import OCRResultCache
+from ocr_profiles import load_profiles, profile_fingerprint
+from image_loading import load_grayscale
+from image_pipeline import enhance_and_filter, vectorized_preprocessing_available
+from issuer_templates import ISSUER_TEMPLATES, classify_issuer, issuer_templates_fingerprint, postprocess_fields
+from layout_templates import match_template, read_template_fields, templates_fingerprint
+from ocr_words import field_confidences, words_from_tesseract_data
+from pdf_pages import render_page
+from registry_guided import DEFAULT_MIN_SIMILARITY, RegistryLookup, confirm_expected_values
+
+# Bump whenever preprocessing, OCR settings or extraction change the output,
+# so cached results from older pipelines are not reused
+OCR_PIPELINE_VERSION = '3'
+
+SUPPORTED_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.gif', '.pdf']
+
+# A file path, the document bytes, or a binary file-like object
+DocumentSource = Union[str, bytes, bytearray, memoryview, BinaryIO]
+
+# Page segmentation modes tried, in order, after the full preprocessing pass
+ESCALATION_PSM_MODES = (4, 11)
+
+# Extracted fields whose OCR confidence is below this are reported as issues
+LOW_FIELD_CONFIDENCE = 0.6
 
 
 class OCRProcessor:
-    def __init__(self, tesseract_path: str = None):
+    def __init__(self, tesseract_path: str = None, pool_size: int = 1,
+                 engine_max_uses: int = 500, tessdata_path: str = None,
+                 batch_workers: int = None, cache: OCRResultCache = None,
+                 preprocess_engine: str = 'pil', ocr_strategy: str = 'full',
+                 use_layout_templates: bool = False, pdf_dpi: int = 200,
+                 pdf_max_pages: int = 5, pdf_page_workers: int = 2,
+                 pdf_min_text_chars: int = 20, regex_timeout: float = None,
+                 extraction_budget: float = None, use_issuer_templates: bool = True,
+                 image_target_width: int = None, image_max_pixels: int = None,
+                 deadline: float = None, profiles_path: str = None,
+                 default_profile: str = 'balanced',
+                 guided_min_similarity: int = DEFAULT_MIN_SIMILARITY):
+        self.tesseract_path = tesseract_path
+        # 'full' always preprocesses; 'tiered' starts with a light pass and
+        # escalates only while required fields are missing
+        if ocr_strategy not in ('full', 'tiered'):
+            raise ValueError(f"Unknown OCR strategy: {ocr_strategy}")
+        self.ocr_strategy = ocr_strategy
+        # Read known result sheet layouts region by region before page OCR
+        self.use_layout_templates = use_layout_templates
+        # 'pil' enhancer chain or the pixel-identical 'numpy' pipeline
+        if preprocess_engine not in ('pil', 'numpy'):
+            raise ValueError(f"Unknown preprocessing engine: {preprocess_engine}")
+        self.preprocess_engine = preprocess_engine
+        # Optional content-addressed result cache for process_document
+        self.cache = cache
         if tesseract_path:
             pytesseract.pytesseract.tesseract_cmd = tesseract_path
 
+        # Scanned PDF fallback: pages with fewer text layer characters than
+        # pdf_min_text_chars are rendered at pdf_dpi and OCRed in parallel
+        self.pdf_dpi = pdf_dpi
+        self.pdf_max_pages = pdf_max_pages
+        self.pdf_page_workers = max(1, pdf_page_workers)
+        self.pdf_min_text_chars = pdf_min_text_chars
+
+        # Uploaded images are decoded in grayscale and reduced towards
+        # image_target_width; larger than image_max_pixels after JPEG
+        # draft scaling is refused before decoding
+        self.image_target_width = image_target_width
+        self.image_max_pixels = image_max_pixels
+
+        # Default seconds process_document may spend on one document before
+        # it stops OCR and returns the fields found so far (None = unbounded)
+        self.deadline = deadline
+
+        # Named preprocessing / PSM / traineddata profiles (see ocr_profiles);
+        # callers pick one per document, default_profile otherwise
+        self.profiles_path = profiles_path
+        self.profiles = load_profiles(profiles_path)
+        if default_profile not in self.profiles:
+            raise ValueError(f"Unknown OCR profile: {default_profile}")
+        self.default_profile = default_profile
+
+        # Process count for process_documents (defaults to one per CPU)
+        self.batch_workers = batch_workers or os.cpu_count() or 1
+
+        # Warm engine pool (tesserocr), created lazily in each worker process
+        self.pool_size = pool_size
+        self.engine_max_uses = engine_max_uses
+        self.tessdata_path = tessdata_path
+        # One pool per traineddata directory used by a profile
+        self._engine_pools = {}
+        self._engine_pool_failed = False
+        self._engine_pool_lock = threading.Lock()
+
         self.patterns = {
             'seat_no': [
                 r'Seat\s*No[\s.:]*([A-Z0-9$]+)',  # Added $ to handle OCR error
@@ -95,107 +187,627 @@ class OCRProcessor:
                 r'(?:Subject|SUBJECT|Branch|BRANCH|Course|COURSE|Programme|PROGRAMME)[\s:.-]*([A-Za-z\s&.]{3,50})'
             ]
         }
+
+        # Pattern bank is compiled once per process and shared between instances.
+        # Runaway patterns are cut off after regex_timeout seconds each and
+        # extraction_budget seconds per text (needs the regex package).
+        self.regex_timeout = regex_timeout
+        self.extraction_budget = extraction_budget
+        self.field_extractor = FieldExtractor(self.patterns, pattern_timeout=regex_timeout,
+                                              document_budget=extraction_budget)
+
+        # Documents classified as a known issuer are read with that issuer's
+        # narrowed patterns first; self.patterns stays the generic fallback
+        self.use_issuer_templates = use_issuer_templates
+        self.issuer_extractors = {}
+        if use_issuer_templates:
+            self.issuer_extractors = {
+                template_id: FieldExtractor(template['patterns'], pattern_timeout=regex_timeout,
+                                            document_budget=extraction_budget)
+                for template_id, template in ISSUER_TEMPLATES.items()
+            }
+
+        # Registry-guided extraction: similarity (0-100) a window of the text
+        # needs to confirm an expected registry value
+        self.guided_min_similarity = guided_min_similarity
+
+        # Fields the tiered strategy keeps escalating for
+        self.required_fields = ('seat_no', 'student_name', 'mother_name', 'sgpa', 'subject')
     
-    def preprocess_image(self, image: Image.Image) -> Image.Image:
+    def get_profile(self, profile: str = None) -> Dict[str, any]:
+        """Settings of a named profile (default_profile when None); raises ValueError when unknown"""
+        name = profile or self.default_profile
+        if name not in self.profiles:
+            raise ValueError(f"Unknown OCR profile: {name}")
+        return self.profiles[name]
+
+    def preprocess_image(self, image: Image.Image, profile: str = None) -> Image.Image:
+        settings = self.get_profile(profile)
         # Convert to grayscale if not already
         if image.mode != 'L':
             image = image.convert('L')
         
         # Resize image if too small (helps with OCR accuracy)
         width, height = image.size
-        if width < 1000:
-            ratio = 1500 / width
+        if width < settings['min_width']:
+            ratio = settings['upscale_width'] / width
             new_size = (int(width * ratio), int(height * ratio))
             image = image.resize(new_size, Image.Resampling.LANCZOS)
+
+        if self.preprocess_engine == 'numpy' and vectorized_preprocessing_available():
+            processed = enhance_and_filter(image, contrast=settings['contrast'],
+                                           brightness=settings['brightness'],
+                                           sharpness=settings['sharpness'],
+                                           median_size=settings['median_size'])
+            if processed is not None:
+                return processed
         
         # Enhance contrast
         enhancer = ImageEnhance.Contrast(image)
-        image = enhancer.enhance(2.5)
+        image = enhancer.enhance(settings['contrast'])
         
         # Enhance brightness
         enhancer = ImageEnhance.Brightness(image)
-        image = enhancer.enhance(1.2)
+        image = enhancer.enhance(settings['brightness'])
         
         # Enhance sharpness
         enhancer = ImageEnhance.Sharpness(image)
-        image = enhancer.enhance(2.0)
+        image = enhancer.enhance(settings['sharpness'])
         
         # Apply denoising
-        image = image.filter(ImageFilter.MedianFilter(size=3))
+        if settings['median_size'] > 1:
+            image = image.filter(ImageFilter.MedianFilter(size=settings['median_size']))
         
         # Apply edge enhancement
         image = image.filter(ImageFilter.EDGE_ENHANCE_MORE)
         
         return image
     
+    def get_engine_pool(self, tessdata_path: str = None) -> Optional[TesseractEnginePool]:
+        """Engine pool of the current worker process for a traineddata directory
+        (default tessdata_path), or None to use pytesseract"""
+        if self.pool_size < 1 or self._engine_pool_failed or not engine_pool_available():
+            return None
+
+        tessdata_path = tessdata_path or self.tessdata_path
+        pool = self._engine_pools.get(tessdata_path)
+        if pool is not None and pool.pid == os.getpid():
+            return pool
+
+        with self._engine_pool_lock:
+            # Engines must not be shared with a forked parent
+            pool = self._engine_pools.get(tessdata_path)
+            if pool is None or pool.pid != os.getpid():
+                try:
+                    pool = TesseractEnginePool(
+                        size=self.pool_size,
+                        max_uses=self.engine_max_uses,
+                        tessdata_path=tessdata_path
+                    )
+                except Exception as e:
+                    print(f"Error starting Tesseract engine pool, using pytesseract: {str(e)}")
+                    self._engine_pool_failed = True
+                    return None
+                self._engine_pools[tessdata_path] = pool
+            return pool
+
+    def ocr_image(self, image: Image.Image, psm: int = 6, variables: Dict[str, str] = None,
+                  tessdata_path: str = None) -> str:
+        pool = self.get_engine_pool(tessdata_path)
+        if pool is not None:
+            return pool.recognize(image, psm=psm, variables=variables)
+        return pytesseract.image_to_string(image, config=self._tesseract_config(psm, variables, tessdata_path))
+
+    def ocr_image_words(self, image: Image.Image, psm: int = 6, variables: Dict[str, str] = None,
+                        timeout: float = None, tessdata_path: str = None) -> Tuple[str, List[Dict[str, any]]]:
+        """Text of one OCR pass plus its words with confidences (0-1) and boxes.
+
+        tessdata_path selects the traineddata directory (e.g. tessdata_fast
+        or tessdata_best), the processor's by default. Raises TimeoutError
+        when recognition takes longer than timeout seconds; the tesseract
+        subprocess (or engine recognition) is cancelled.
+        """
+        pool = self.get_engine_pool(tessdata_path)
+        if pool is not None:
+            return pool.recognize_words(image, psm=psm, variables=variables, timeout=timeout)
+        try:
+            # pytesseract treats a timeout of 0 as none, so use a tiny positive one
+            data = pytesseract.image_to_data(image, config=self._tesseract_config(psm, variables, tessdata_path),
+                                             output_type=pytesseract.Output.DICT,
+                                             timeout=max(timeout, 0.001) if timeout is not None else 0)
+        except RuntimeError as e:
+            if 'timeout' in str(e).lower():
+                raise TimeoutError(str(e))
+            raise
+        return words_from_tesseract_data(data)
+
+    @staticmethod
+    def _tesseract_config(psm: int, variables: Dict[str, str] = None, tessdata_path: str = None) -> str:
+        config = f'--oem 3 --psm {psm}'
+        if tessdata_path:
+            config += f' --tessdata-dir "{tessdata_path}"'
+        for name, value in (variables or {}).items():
+            config += f' -c {name}={value}'
+        return config
+
     def extract_text_from_image(self, image_path: str) -> str:
         try:
-            with Image.open(image_path) as img:
-                processed_img = self.preprocess_image(img)
-                custom_config = r'--oem 3 --psm 6'
-                text = pytesseract.image_to_string(processed_img, config=custom_config)
-                return text.strip()
+            with open(image_path, 'rb') as file:
+                img = load_grayscale(file, self.image_target_width, self.image_max_pixels)
+            processed_img = self.preprocess_image(img)
+            text = self.ocr_image(processed_img)
+            return text.strip()
         except Exception as e:
             print(f"Error extracting text from image: {str(e)}")
             return ""
     
-    def extract_text_from_pdf(self, pdf_path: str) -> str:
+    def missing_required_fields(self, extracted_data: Dict[str, any]) -> list:
+        return [field for field in self.required_fields if not extracted_data.get(field)]
+
+    def _fill_missing(self, structured_data: Dict[str, any], values: Dict[str, any]) -> List[str]:
+        """Copy values into fields that are still empty, returning the fields filled"""
+        filled = []
+        for field, value in values.items():
+            if value and not structured_data.get(field):
+                structured_data[field] = value
+                filled.append(field)
+        return filled
+
+    def _complete_confidence(self, structured_data: Dict[str, any],
+                             confidences: Dict[str, float]) -> Dict[str, float]:
+        """Confidence of every field: 0 when missing, 1 for found values without OCR confidence"""
+        return {field: round(confidences.get(field, 1.0), 3) if structured_data.get(field) else 0.0
+                for field in self.patterns}
+
+    def extract_template_fields(self, image: Image.Image) -> Optional[Dict[str, any]]:
+        """Read the field regions of a known layout, or None when no template matches"""
+        matched = match_template(image, lambda header: self.ocr_image(header, psm=6))
+        if matched is None:
+            return None
+        name, template = matched
+        values, raw_text, confidences = read_template_fields(image, template, self.ocr_image_words)
+        return {
+            'template': name,
+            'raw_text': raw_text,
+            'structured_data': self.clean_extracted_data(values),
+            'field_confidence': confidences
+        }
+
+    def extract_image(self, image_source: DocumentSource, strategy: str = None,
+                      deadline_at: float = None, profile: str = None,
+                      registry_lookup: RegistryLookup = None) -> Dict[str, any]:
+        """OCR an image file; raises Image.DecompressionBombError when it is over the pixel limit"""
+        try:
+            grayscale = load_grayscale(as_stream(image_source), self.image_target_width,
+                                       self.image_max_pixels)
+        except Image.DecompressionBombError:
+            raise
+        except Exception as e:
+            print(f"Error extracting text from image: {str(e)}")
+            return self._empty_result()
+        return self.extract_page_image(grayscale, strategy, deadline_at, profile, registry_lookup)
+
+    def _empty_result(self) -> Dict[str, any]:
+        return {
+            'raw_text': '',
+            'structured_data': dict.fromkeys(self.patterns),
+            'ocr_tier': None,
+            'tiers_run': [],
+            'template': None,
+            'issuer': None,
+            'timed_out_fields': [],
+            'field_confidence': dict.fromkeys(self.patterns, 0.0),
+            'field_boxes': {},
+            'timed_out': False,
+            'registry_match': None
+        }
+
+    def extract_page_image(self, grayscale: Image.Image, strategy: str = None,
+                           deadline_at: float = None, profile: str = None,
+                           registry_lookup: RegistryLookup = None) -> Dict[str, any]:
+        """OCR a grayscale page, stopping as soon as every required field is found.
+
+        A matching layout template is read region by region first. Fields it
+        does not resolve come from page OCR: with the 'tiered' strategy the
+        tiers are 'light' (grayscale at native resolution), 'full'
+        (preprocess_image) and then the full image with each escalation PSM;
+        'full' runs the preprocessed page only. The profile sets the
+        preprocessing, the PSM of the first two tiers and the traineddata.
+        Later stages only fill in
+        fields the earlier ones missed, and each field keeps the OCR
+        confidence and bounding box of the stage that read it.
+
+        deadline_at is a time.monotonic() value: OCR running at that moment is
+        cancelled, no further stage starts and the result has timed_out set.
+        With a registry_lookup fields are extracted registry-guided, and OCR
+        stops as soon as a seat number is read that is not in the registry.
+        """
+        strategy = strategy or self.ocr_strategy
+        settings = self.get_profile(profile)
+        structured_data = dict.fromkeys(self.patterns)
+        texts = []
+        tiers_run = []
+        template = None
+        issuer = None
+        timed_out = set()
+        confidences = {}
+        field_boxes = {}
+        deadline_reached = False
+        registry_match = None
+        try:
+            if self.use_layout_templates and seconds_left(deadline_at) != 0:
+                template_result = self.extract_template_fields(grayscale)
+                if template_result is not None:
+                    template = template_result['template']
+                    tiers_run.append('template')
+                    texts.append(template_result['raw_text'])
+                    for field in self._fill_missing(structured_data, template_result['structured_data']):
+                        if field in template_result['field_confidence']:
+                            confidences[field] = template_result['field_confidence'][field]
+
+            if strategy == 'tiered':
+                tiers = ([('light', settings['psm']), ('full', settings['psm'])]
+                         + [(f'psm{psm}', psm) for psm in ESCALATION_PSM_MODES if psm != settings['psm']])
+            else:
+                tiers = [('full', settings['psm'])]
+
+            processed = None
+            for tier, psm in tiers:
+                if not self.missing_required_fields(structured_data):
+                    break
+                if seconds_left(deadline_at) == 0:
+                    deadline_reached = True
+                    break
+                if tier == 'light':
+                    image = grayscale
+                else:
+                    if processed is None:
+                        processed = self.preprocess_image(grayscale, profile)
+                    image = processed
+
+                try:
+                    text, words = self.ocr_image_words(image, psm=psm, timeout=seconds_left(deadline_at),
+                                                       tessdata_path=settings['tessdata_path'])
+                except TimeoutError:
+                    deadline_reached = True
+                    break
+                text = text.strip()
+                tiers_run.append(tier)
+                texts.append(text)
+                extraction = self.extract_structured_data_detailed(text, registry_lookup)
+                tier_confidences, tier_boxes = field_confidences(extraction['raw_values'], words)
+                for field in self._fill_missing(structured_data, extraction['structured_data']):
+                    if field in tier_confidences:
+                        confidences[field] = tier_confidences[field]
+                    if field in tier_boxes:
+                        field_boxes[field] = tier_boxes[field]
+                timed_out.update(extraction['timed_out_fields'])
+                issuer = issuer or extraction['issuer']
+                if extraction['registry_match'] is not None:
+                    registry_match = extraction['registry_match']
+                if registry_match is False:
+                    # Unknown seat number: nothing more to read
+                    break
+        except Exception as e:
+            print(f"Error extracting text from image: {str(e)}")
+
+        return {
+            'raw_text': '\n'.join(text for text in texts if text),
+            'structured_data': structured_data,
+            'ocr_tier': tiers_run[-1] if tiers_run else None,
+            'tiers_run': tiers_run,
+            'template': template,
+            'issuer': issuer,
+            'timed_out_fields': sorted(field for field in timed_out if not structured_data.get(field)),
+            'field_confidence': self._complete_confidence(structured_data, confidences),
+            'field_boxes': field_boxes,
+            'timed_out': deadline_reached,
+            'registry_match': registry_match
+        }
+
+    def read_pdf_pages(self, pdf_source: DocumentSource,
+                       deadline_at: float = None) -> Tuple[Optional[bytes], List[Optional[str]]]:
+        """PDF bytes and the text layer of every page (None for pages not read before deadline_at)"""
+        data = None
+        page_texts = []
+        try:
+            from PyPDF2 import PdfReader
+            data = read_source(pdf_source)
+            pdf_reader = PdfReader(io.BytesIO(data))
+            for page in pdf_reader.pages:
+                if seconds_left(deadline_at) == 0:
+                    page_texts.append(None)
+                    continue
+                page_texts.append(page.extract_text() or "")
+        except Exception as e:
+            print(f"Error extracting text from PDF: {str(e)}")
+        return data, page_texts
+
+    def extract_pdf(self, pdf_source: DocumentSource, strategy: str = None,
+                    deadline_at: float = None, profile: str = None,
+                    registry_lookup: RegistryLookup = None) -> Dict[str, any]:
+        """Text layer of a PDF, plus OCR of its scanned pages while required fields are missing"""
+        data, page_texts = self.read_pdf_pages(pdf_source, deadline_at)
+        return self.extract_pdf_pages(data, page_texts, range(len(page_texts)),
+                                      strategy, self.pdf_page_workers, deadline_at, profile, registry_lookup)
+
+    def extract_pdf_pages(self, data: bytes, page_texts: List[Optional[str]], page_indexes: Iterable[int],
+                          strategy: str = None, page_workers: int = 1,
+                          deadline_at: float = None, profile: str = None,
+                          registry_lookup: RegistryLookup = None) -> Dict[str, any]:
+        """Extract one document made of the given pages of a PDF.
+
+        Pages with (nearly) no text layer are rendered and OCRed through the
+        image pipeline, at most pdf_max_pages of them and page_workers at a
+        time. Page results are merged in page order and the remaining pages
+        are cancelled once every required field is found or deadline_at
+        passes. Text layer fields have confidence 1; field boxes are not
+        reported for PDFs.
+        """
+        strategy = strategy or self.ocr_strategy
+        page_indexes = list(page_indexes)
+        raw_text = "\n".join(page_texts[index] or "" for index in page_indexes).strip()
+        extraction = self.extract_structured_data_detailed(raw_text, registry_lookup)
+        structured_data = extraction['structured_data']
+        confidences = {}
+        result = {
+            'raw_text': raw_text,
+            'structured_data': structured_data,
+            'ocr_tier': 'text_layer',
+            'tiers_run': ['text_layer'],
+            'template': None,
+            'issuer': extraction['issuer'],
+            'timed_out_fields': extraction['timed_out_fields'],
+            'field_confidence': self._complete_confidence(structured_data, confidences),
+            'field_boxes': {},
+            'timed_out': any(page_texts[index] is None for index in page_indexes),
+            'registry_match': extraction['registry_match'],
+            'pages_ocred': []
+        }
+
+        scanned_pages = [index for index in page_indexes if page_texts[index] is not None
+                         and len(page_texts[index].strip()) < self.pdf_min_text_chars][:max(0, self.pdf_max_pages)]
+        if (not scanned_pages or not self.missing_required_fields(structured_data)
+                or result['registry_match'] is False):
+            return result
+        if seconds_left(deadline_at) == 0:
+            result['timed_out'] = True
+            return result
+
+        timed_out = set(extraction['timed_out_fields'])
+        texts = [raw_text] if raw_text else []
+        executor = ThreadPoolExecutor(max_workers=max(1, min(page_workers, len(scanned_pages))))
+        try:
+            futures = [executor.submit(self._ocr_pdf_page, data, index, strategy, deadline_at,
+                                       profile, registry_lookup)
+                       for index in scanned_pages]
+            for index, future in zip(scanned_pages, futures):
+                try:
+                    page_result = future.result(timeout=seconds_left(deadline_at))
+                except TimeoutError:
+                    result['timed_out'] = True
+                    break
+                if page_result is None:
+                    continue
+                result['timed_out'] = result['timed_out'] or page_result['timed_out']
+                result['pages_ocred'].append(index + 1)
+                texts.append(page_result['raw_text'])
+                for tier in page_result['tiers_run']:
+                    if tier not in result['tiers_run']:
+                        result['tiers_run'].append(tier)
+                for field in self._fill_missing(structured_data, page_result['structured_data']):
+                    confidences[field] = page_result['field_confidence'][field]
+                timed_out.update(page_result['timed_out_fields'])
+                result['issuer'] = result['issuer'] or page_result['issuer']
+                if page_result['registry_match'] is not None:
+                    result['registry_match'] = page_result['registry_match']
+                if not self.missing_required_fields(structured_data) or result['registry_match'] is False:
+                    break
+        finally:
+            # Do not wait for pages that are no longer needed
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        result['timed_out_fields'] = sorted(field for field in timed_out if not structured_data.get(field))
+        result['field_confidence'] = self._complete_confidence(structured_data, confidences)
+        if result['pages_ocred']:
+            result['raw_text'] = "\n".join(text for text in texts if text)
+            result['ocr_tier'] = 'scanned_pdf'
+        return result
+
+    def split_pdf_pages(self, page_texts: List[str], split: str = 'certificate') -> List[List[int]]:
+        """Group the pages of a multi-certificate PDF into one page list per certificate.
+
+        With split='page' every page is its own certificate. With
+        'certificate' a page whose text layer has a seat number starts a new
+        certificate and pages without one continue the previous certificate;
+        pages without a text layer cannot be inspected and stand alone.
+        """
+        if split not in ('page', 'certificate'):
+            raise ValueError(f"Unknown PDF split mode: {split}")
+
+        groups = []
+        continuable = False
+        for index, text in enumerate(page_texts):
+            scanned = len(text.strip()) < self.pdf_min_text_chars
+            starts_certificate = (split == 'page' or scanned or not continuable
+                                  or self.field_extractor.extract(text, fields=['seat_no'])['seat_no'])
+            if starts_certificate:
+                groups.append([index])
+            else:
+                groups[-1].append(index)
+            continuable = split == 'certificate' and not scanned
+        return groups
+
+    def process_pdf_documents(self, pdf_source: DocumentSource, strategy: str = None,
+                              split: str = 'certificate', max_workers: int = None,
+                              ordered: bool = False, profile: str = None,
+                              registry_lookup: RegistryLookup = None) -> Iterator[Dict[str, any]]:
+        """Extract every certificate of a multi-certificate PDF as its own document.
+
+        Certificates are extracted by a thread pool of max_workers (default
+        pdf_page_workers) and yielded as soon as each one completes, or in
+        page order when ordered is True. Each result has the keys of
+        process_document_detailed plus 'index' and the 1-based 'pages'.
+        """
+        data, page_texts = self.read_pdf_pages(pdf_source)
+        groups = self.split_pdf_pages(page_texts, split)
+        if not groups:
+            return
+
+        def extract_group(index, pages):
+            try:
+                result = self.extract_pdf_pages(data, page_texts, pages, strategy, profile=profile,
+                                                registry_lookup=registry_lookup)
+            except Exception as e:
+                print(f"Error processing PDF pages {pages[0] + 1}-{pages[-1] + 1}: {str(e)}")
+                result = self._empty_result()
+                result['pages_ocred'] = []
+            result['index'] = index
+            result['pages'] = [page + 1 for page in pages]
+            return result
+
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers or self.pdf_page_workers, len(groups))))
+        try:
+            futures = [executor.submit(extract_group, index, pages) for index, pages in enumerate(groups)]
+            for future in (futures if ordered else as_completed(futures)):
+                yield future.result()
+        finally:
+            # Consumer stopped early (e.g. client disconnected): drop the rest
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _ocr_pdf_page(self, data: bytes, page_index: int, strategy: str,
+                      deadline_at: float = None, profile: str = None,
+                      registry_lookup: RegistryLookup = None) -> Optional[Dict[str, any]]:
+        try:
+            image = render_page(data, page_index, self.pdf_dpi, self.image_max_pixels)
+        except Exception as e:
+            print(f"Error rendering PDF page {page_index + 1}: {str(e)}")
+            return None
+        if image is None:
+            return None
+        return self.extract_page_image(image, strategy, deadline_at, profile, registry_lookup)
+
+    def extract_text_from_pdf(self, pdf_source: DocumentSource) -> str:
         try:
             from PyPDF2 import PdfReader
             text = ""
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
+            pdf_reader = PdfReader(as_stream(pdf_source))
+            for page in pdf_reader.pages:
+                text += page.extract_text() + "\n"
             return text.strip()
         except Exception as e:
             print(f"Error extracting text from PDF: {str(e)}")
             return ""
     
     def extract_structured_data(self, text: str) -> Dict[str, any]:
-        extracted_data = {}
-        text_clean = re.sub(r'\s+', ' ', text)
-        
-        # Try to match lines separately for better accuracy
-        lines = text.split('\n')
-        combined_text = text_clean + ' ' + '\n'.join(lines)
+        return self.extract_structured_data_detailed(text)['structured_data']
 
-        for field, patterns in self.patterns.items():
-            extracted_data[field] = None
-            
-            # Try patterns on both the full text and individual lines
-            for pattern in patterns:
-                # Try on full text first
-                matches = re.findall(pattern, text_clean, re.IGNORECASE)
-                if matches:
-                    # Handle both grouped and non-grouped patterns
-                    if isinstance(matches[0], tuple):
-                        value = matches[0][0].strip() if matches[0][0] else None
-                    else:
-                        value = matches[0].strip()
-                    
-                    if value and len(value) > 1:  # Ensure meaningful extraction
-                        extracted_data[field] = value
-                        break
-                
-                # If not found, try on individual lines
-                if not extracted_data[field]:
-                    for line in lines:
-                        line_matches = re.findall(pattern, line.strip(), re.IGNORECASE)
-                        if line_matches:
-                            # Handle both grouped and non-grouped patterns
-                            if isinstance(line_matches[0], tuple):
-                                value = line_matches[0][0].strip() if line_matches[0][0] else None
-                            else:
-                                value = line_matches[0].strip()
-                            
-                            if value and len(value) > 1:
-                                extracted_data[field] = value
-                                break
-                    if extracted_data[field]:
-                        break
-
-        # Clean up and format extracted data
+    def extract_structured_data_detailed(self, text: str,
+                                         registry_lookup: RegistryLookup = None) -> Dict[str, any]:
+        """Extract fields from text.
+
+        Returns structured_data, the raw_values the found fields were cleaned
+        from, the timed_out_fields whose patterns ran out of time, the
+        issuer template id and registry_match. When the text is classified as
+        a known issuer its template patterns run first and only the fields
+        they miss (other than the template's strict fields) are looked up
+        with the generic patterns. With a registry_lookup the extraction is
+        registry-guided (see extract_registry_guided).
+        """
+        issuer = classify_issuer(text) if self.issuer_extractors else None
+        if registry_lookup is not None:
+            return self.extract_registry_guided(text, registry_lookup, issuer)
+
+        extracted_data, raw_data, timed_out = self._extract_fields(text, issuer)
+        return self._extraction_result(extracted_data, raw_data, timed_out, issuer)
+
+    def extract_registry_guided(self, text: str, registry_lookup: RegistryLookup,
+                                issuer: str = None) -> Dict[str, any]:
+        """Resolve the seat number first, then confirm the registry's values in the text.
+
+        The student name, mother name, subject and SGPA of the registry row
+        are searched for directly in the text; only the fields not found
+        that way go through the pattern bank, so values that differ from the
+        registry are still read and reported as mismatches. A seat number
+        that is not in the registry ends the extraction (registry_match
+        False, the document cannot verify); without a seat number, or when
+        the lookup returns {} (not registered but close to a registered
+        seat), the full pattern bank runs.
+        """
+        extracted_data, raw_data, timed_out = self._extract_fields(text, issuer, ['seat_no'])
+        seat_no = extracted_data['seat_no']
+        if not seat_no:
+            extracted_data, raw_data, timed_out = self._extract_fields(text, issuer)
+            return self._extraction_result(extracted_data, raw_data, timed_out, issuer)
+
+        expected = registry_lookup(seat_no)
+        if expected is None:
+            result = self._extraction_result(extracted_data, raw_data, timed_out, issuer)
+            result['registry_match'] = False
+            return result
+        if not expected:
+            # Not registered, but possibly a misread registered seat: read
+            # every field so the verifier can confirm a candidate by name
+            extracted_data, raw_data, timed_out = self._extract_fields(text, issuer)
+            return self._extraction_result(extracted_data, raw_data, timed_out, issuer)
+
+        confirmed = confirm_expected_values(text, expected, self.guided_min_similarity)
+        if 'sgpa' in confirmed:
+            # Decimal commas and stray spaces are read as the number they are
+            confirmed_data = {'sgpa': re.sub(r'\s', '', confirmed['sgpa']).replace(',', '.')}
+        else:
+            confirmed_data = {}
+        confirmed_data.update({field: value for field, value in confirmed.items() if field != 'sgpa'})
+        extracted_data.update(self.clean_extracted_data(confirmed_data))
+        raw_data.update(confirmed)
+
+        remaining = [field for field in self.patterns if not extracted_data.get(field)]
+        if remaining:
+            fallback_data, fallback_raw, fallback_timed_out = self._extract_fields(text, issuer, remaining)
+            for field in self._fill_missing(extracted_data, fallback_data):
+                raw_data[field] = fallback_raw[field]
+            timed_out |= fallback_timed_out
+        result = self._extraction_result(extracted_data, raw_data, timed_out, issuer)
+        result['registry_match'] = True
+        result['guided_fields'] = sorted(field for field in confirmed if result['structured_data'].get(field))
+        return result
+
+    def _extract_fields(self, text: str, issuer: Optional[str],
+                        fields: List[str] = None) -> Tuple[Dict[str, any], Dict[str, any], set]:
+        """Cleaned values, raw values and timed out fields of a pattern extraction of fields (default all)"""
+        fields = list(fields or self.patterns)
+        if issuer is None:
+            raw_data, timed_out = self.field_extractor.extract_detailed(text, fields=fields)
+            extracted_data = self.clean_extracted_data(dict(raw_data))
+        else:
+            raw_data, timed_out = self.issuer_extractors[issuer].extract_detailed(text, fields=fields)
+            extracted_data = postprocess_fields(issuer, self.clean_extracted_data(dict(raw_data)))
+            strict_fields = ISSUER_TEMPLATES[issuer].get('strict_fields', ())
+            missing = [field for field in fields
+                       if not extracted_data.get(field) and field not in strict_fields]
+            if missing:
+                fallback_data, fallback_timed_out = self.field_extractor.extract_detailed(text, fields=missing)
+                for field in self._fill_missing(extracted_data, self.clean_extracted_data(dict(fallback_data))):
+                    raw_data[field] = fallback_data[field]
+                timed_out = (set(timed_out) - set(missing)) | set(fallback_timed_out)
+        return {field: extracted_data.get(field) for field in fields}, raw_data, set(timed_out)
+
+    def _extraction_result(self, extracted_data: Dict[str, any], raw_data: Dict[str, any],
+                           timed_out: set, issuer: Optional[str]) -> Dict[str, any]:
+        extracted_data = {field: extracted_data.get(field) for field in self.patterns}
+        print(extracted_data)
+        if timed_out:
+            print(f"Field extraction timed out for: {', '.join(sorted(timed_out))}")
+        return {
+            'structured_data': extracted_data,
+            'raw_values': {field: raw_data.get(field) for field in self.patterns if extracted_data.get(field)},
+            'timed_out_fields': sorted(timed_out),
+            'issuer': issuer,
+            'registry_match': None
+        }
+
+    def clean_extracted_data(self, extracted_data: Dict[str, any]) -> Dict[str, any]:
+        """Clean up and format raw field values, in place"""
         if extracted_data.get('student_name'):
             name = re.sub(r'[^A-Za-z\s]', '', extracted_data['student_name']).strip()
             # Normalize name: handle both CAPS and mixed case properly
@@ -270,30 +882,258 @@ class OCRProcessor:
                     extracted_data['sgpa'] = None
             except (ValueError, TypeError):
                 extracted_data['sgpa'] = None
-        print(extracted_data)
         return extracted_data
     
-    def validate_extraction_quality(self, extracted_data: Dict[str, any]) -> Dict[str, any]:
-        extracted_fields = sum(1 for v in extracted_data.values() if v)
-        total_fields = len(self.patterns)
-        confidence = extracted_fields / total_fields
+    def validate_extraction_quality(self, extracted_data: Dict[str, any],
+                                    timed_out_fields: List[str] = None,
+                                    field_confidence: Dict[str, float] = None) -> Dict[str, any]:
+        """Per-field and overall extraction confidence (0-1).
+
+        field_confidence holds the OCR confidences of the document result;
+        without it every found field counts as 1 and every missing one as 0.
+        """
+        field_confidence = field_confidence or {}
+        confidences = {k: round(float(field_confidence.get(k, 1.0)), 3) if v else 0.0
+                       for k, v in extracted_data.items()}
+        confidence = sum(confidences.values()) / len(self.patterns)
 
-        issues = [f"{k} not found" for k, v in extracted_data.items() if not v]
+        timed_out_fields = timed_out_fields or []
+        issues = [f"{k} extraction timed out" if k in timed_out_fields else f"{k} not found"
+                  for k, v in extracted_data.items() if not v]
+        issues += [f"{k} low OCR confidence ({c:.0%})" for k, c in confidences.items()
+                   if extracted_data.get(k) and c < LOW_FIELD_CONFIDENCE]
 
         return {
             'overall_confidence': round(confidence, 2),
-            'field_confidence': {k: bool(v) for k, v in extracted_data.items()},
+            'field_confidence': confidences,
             'issues': issues
         }
     
-    def process_document(self, file_path: str) -> Tuple[str, Dict[str, any]]:
-        file_ext = os.path.splitext(file_path)[1].lower()
-        if file_ext in ['.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.gif']:
-            raw_text = self.extract_text_from_image(file_path)
-        elif file_ext == '.pdf':
-            raw_text = self.extract_text_from_pdf(file_path)
+    def cache_version(self, file_ext: str, strategy: str = None, profile: str = None) -> str:
+        """Identifies everything besides the file bytes that affects the result"""
+        version = f"{OCR_PIPELINE_VERSION}:{file_ext}:{strategy or self.ocr_strategy}"
+        version += f":{profile or self.default_profile}-{profile_fingerprint(self.get_profile(profile))}"
+        if file_ext == '.pdf':
+            version += f":{self.pdf_dpi}:{self.pdf_max_pages}:{self.pdf_min_text_chars}"
+        else:
+            version += f":{self.image_target_width or 0}:{self.image_max_pixels or 0}"
+        if self.use_layout_templates:
+            version += f":{templates_fingerprint()}"
+        if self.use_issuer_templates:
+            version += f":issuer-{issuer_templates_fingerprint()}"
+        return version
+
+    def document_type(self, data: bytes, filename: str = None) -> str:
+        """File extension the document is processed as.
+
+        The name's extension must be supported; the content decides between
+        PDF and image so a mislabelled upload is still read correctly.
+        """
+        file_ext = None
+        if filename:
+            file_ext = os.path.splitext(filename)[1].lower()
+            if file_ext not in SUPPORTED_EXTENSIONS:
+                raise ValueError(f"Unsupported file type: {file_ext}")
+        if data is not None:
+            # Readers accept junk before the header within the first 1KB
+            if b'%PDF' in bytes(data[:1024]):
+                return '.pdf'
+            if file_ext == '.pdf' or file_ext is None:
+                return '.image'
+        return file_ext
+
+    def process_document_detailed(self, source: DocumentSource, strategy: str = None,
+                                  filename: str = None, deadline: float = None,
+                                  profile: str = None, registry_lookup: RegistryLookup = None) -> Dict[str, any]:
+        """Process a document, returning raw_text, structured_data and the OCR tier used.
+
+        source is a file path, the document bytes (bytes, bytearray or
+        memoryview) or a binary file-like object; uploads can be processed
+        without writing them to disk. filename is only used for its
+        extension and defaults to the path. After deadline seconds (default
+        self.deadline) OCR is cancelled and the fields found so far are
+        returned with timed_out set. profile names the OCR profile
+        (default_profile when None). With a registry_lookup extraction is
+        registry-guided. The cache holds what OCR read, whichever way it was
+        extracted; fields are extracted again from the cached text when the
+        caller's mode or the registry may differ (see _from_cache).
+        """
+        deadline = deadline if deadline is not None else self.deadline
+        deadline_at = time.monotonic() + deadline if deadline is not None else None
+        strategy = strategy or self.ocr_strategy
+        if strategy not in ('full', 'tiered'):
+            raise ValueError(f"Unknown OCR strategy: {strategy}")
+        self.get_profile(profile)
+
+        if isinstance(source, str):
+            filename = filename or source
+            data = None
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            data = source
         else:
-            raise ValueError(f"Unsupported file type: {file_ext}")
+            data = source.read()
+        file_ext = self.document_type(data, filename)
+        if file_ext is None:
+            raise ValueError("Unsupported file type: unknown")
+
+        # Re-uploads of the same file skip OCR entirely
+        cache_key = None
+        if self.cache is not None:
+            if data is None:
+                with open(source, 'rb') as file:
+                    data = file.read()
+            cache_key = self.cache.make_key(data, self.cache_version(file_ext, strategy, profile))
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                result = self._from_cache(cached, registry_lookup)
+                if result is not None:
+                    result['cached'] = True
+                    return result
+
+        document = source if data is None else data
+        if file_ext == '.pdf':
+            result = self.extract_pdf(document, strategy, deadline_at, profile, registry_lookup)
+        else:
+            result = self.extract_image(document, strategy, deadline_at, profile, registry_lookup)
+        result['profile'] = profile or self.default_profile
+        result['registry_guided'] = registry_lookup is not None
+
+        # Failed, partial or timed out extractions are not cached so a retry can
+        # succeed, nor reads stopped at an unregistered seat number
+        if (cache_key is not None and result['raw_text'] and not result['timed_out']
+                and not result['timed_out_fields'] and result['registry_match'] is not False):
+            self.cache.put(cache_key, result)
+        result['cached'] = False
+        return result
+
+    def _from_cache(self, cached: Dict[str, any], registry_lookup: RegistryLookup) -> Optional[Dict[str, any]]:
+        """A cached result for this caller, or None when the document must be read again.
+
+        A pattern extraction is served as it was cached. Otherwise the cached
+        text is extracted again, registry-guided with registry_lookup when
+        given, so guided results always reflect the current registry. OCR
+        stops once every required field is found, so when the new extraction
+        misses a required field the cached one had, more OCR could find it
+        and None is returned. Fields keep their cached OCR confidence.
+        """
+        if registry_lookup is None and not cached.get('registry_guided'):
+            return cached
+        extraction = self.extract_structured_data_detailed(cached['raw_text'], registry_lookup)
+        structured_data = extraction['structured_data']
+        if (extraction['registry_match'] is not False and self.missing_required_fields(structured_data)
+                and not self.missing_required_fields(cached['structured_data'])):
+            return None
+        confidences = {field: confidence for field, confidence in cached['field_confidence'].items()
+                       if cached['structured_data'].get(field)}
+        cached.update({
+            'structured_data': structured_data,
+            'issuer': extraction['issuer'],
+            'timed_out_fields': extraction['timed_out_fields'],
+            'field_confidence': self._complete_confidence(structured_data, confidences),
+            'field_boxes': {field: box for field, box in cached['field_boxes'].items()
+                            if structured_data.get(field) == cached['structured_data'].get(field)},
+            'registry_match': extraction['registry_match'],
+            'registry_guided': registry_lookup is not None
+        })
+        return cached
+
+    def process_document(self, source: DocumentSource, strategy: str = None,
+                         filename: str = None) -> Tuple[str, Dict[str, any]]:
+        result = self.process_document_detailed(source, strategy, filename)
+        return result['raw_text'], result['structured_data']
+
+    def process_documents(self, file_paths: Iterable[str], ordered: bool = True,
+                          max_workers: int = None,
+                          tesseract_threads: int = 1) -> Iterator[Tuple[str, str, Optional[Dict[str, any]]]]:
+        """Process many documents across a process pool, yielding (path, raw_text, structured).
+
+        Results are yielded in input order when ordered is True, otherwise as
+        soon as each document completes. Each worker limits Tesseract to
+        tesseract_threads OpenMP threads so processes do not oversubscribe the
+        CPU. A document that fails yields an empty text and structured=None.
+        """
+        file_paths = list(file_paths)
+        if not file_paths:
+            return
+
+        worker_kwargs = {
+            'tesseract_path': self.tesseract_path,
+            # Workers are single-threaded, one warm engine each is enough
+            'pool_size': min(self.pool_size, 1),
+            'engine_max_uses': self.engine_max_uses,
+            'tessdata_path': self.tessdata_path,
+            'preprocess_engine': self.preprocess_engine,
+            'ocr_strategy': self.ocr_strategy,
+            'use_layout_templates': self.use_layout_templates,
+            'pdf_dpi': self.pdf_dpi,
+            'pdf_max_pages': self.pdf_max_pages,
+            # Pages of one document are OCRed serially inside batch workers
+            'pdf_page_workers': 1,
+            'pdf_min_text_chars': self.pdf_min_text_chars,
+            'regex_timeout': self.regex_timeout,
+            'extraction_budget': self.extraction_budget,
+            'use_issuer_templates': self.use_issuer_templates,
+            'image_target_width': self.image_target_width,
+            'image_max_pixels': self.image_max_pixels,
+            'deadline': self.deadline,
+            'profiles_path': self.profiles_path,
+            'default_profile': self.default_profile,
+            'guided_min_similarity': self.guided_min_similarity
+        }
+        max_workers = min(max_workers or self.batch_workers, len(file_paths))
+
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 initializer=_init_batch_worker,
+                                 initargs=(worker_kwargs, tesseract_threads)) as executor:
+            futures = [executor.submit(_process_in_batch_worker, path) for path in file_paths]
+            try:
+                for future in (futures if ordered else as_completed(futures)):
+                    yield future.result()
+            finally:
+                # Consumer stopped early: drop documents that have not started
+                for future in futures:
+                    future.cancel()
+
+
+def seconds_left(deadline_at: Optional[float]) -> Optional[float]:
+    """Seconds until a time.monotonic() deadline (0 once it has passed), or None without one"""
+    if deadline_at is None:
+        return None
+    return max(0.0, deadline_at - time.monotonic())
+
+
+def read_source(source: DocumentSource) -> bytes:
+    """Whole content of a path, in-memory buffer or file-like object"""
+    if isinstance(source, str):
+        with open(source, 'rb') as file:
+            return file.read()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    return source.read()
+
+
+def as_stream(source: DocumentSource):
+    """Path or file-like object as given, in-memory bytes wrapped for PIL and PyPDF2"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
+
+
+# OCRProcessor owned by each process_documents worker process
+_batch_processor = None
+
+
+def _init_batch_worker(processor_kwargs: Dict[str, any], tesseract_threads: int):
+    global _batch_processor
+    # Read by Tesseract at startup, for both subprocesses and in-process engines
+    os.environ['OMP_THREAD_LIMIT'] = str(tesseract_threads)
+    _batch_processor = OCRProcessor(**processor_kwargs)
+
 
-        structured_data = self.extract_structured_data(raw_text)
-        return raw_text, structured_data
+def _process_in_batch_worker(file_path: str) -> Tuple[str, str, Optional[Dict[str, any]]]:
+    try:
+        raw_text, structured_data = _batch_processor.process_document(file_path)
+        return file_path, raw_text, structured_data
+    except Exception as e:
+        print(f"Error processing {file_path}: {str(e)}")
+        return file_path, "", None
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+OCR Preprocessing Profiles for PramanMitra
+Named sets of preprocessing parameters, page segmentation mode and
+traineddata that trade accuracy against latency. Built-in profiles are
+starting points; scripts/tune_ocr_profiles.py writes tuned ones to JSON.
+"""
+
+import hashlib
+import json
+from typing import Dict
+
+# 'balanced' is the preprocessing OCRProcessor always used. 'fast' skips
+# upscaling and the median filter, the slowest preprocessing steps. 'accurate'
+# upscales pages towards 300 DPI A4 width, denoises harder and reads them as
+# one column of variable-size text (PSM 4), so a re-read does not repeat the
+# first read's segmentation. Pages narrower than min_width are upscaled to
+# upscale_width (min_width 0 never upscales); median_size 1 skips denoising.
+# tessdata_path None uses the processor's; tuned profiles may select e.g.
+# tessdata_best.
+DEFAULT_PROFILES = {
+    'fast': {
+        'min_width': 0,
+        'upscale_width': 1500,
+        'contrast': 2.5,
+        'brightness': 1.2,
+        'sharpness': 2.0,
+        'median_size': 1,
+        'psm': 6,
+        'tessdata_path': None
+    },
+    'balanced': {
+        'min_width': 1000,
+        'upscale_width': 1500,
+        'contrast': 2.5,
+        'brightness': 1.2,
+        'sharpness': 2.0,
+        'median_size': 3,
+        'psm': 6,
+        'tessdata_path': None
+    },
+    'accurate': {
+        'min_width': 2000,
+        'upscale_width': 2480,
+        'contrast': 2.5,
+        'brightness': 1.2,
+        'sharpness': 2.0,
+        'median_size': 5,
+        'psm': 4,
+        'tessdata_path': None
+    }
+}
+
+PROFILE_KEYS = tuple(DEFAULT_PROFILES['balanced'])
+
+
+def validate_profile(name: str, profile: Dict[str, any]) -> Dict[str, any]:
+    """Profile with missing settings taken from 'balanced'; raises ValueError when invalid"""
+    unknown = set(profile) - set(PROFILE_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown settings in OCR profile {name}: {', '.join(sorted(unknown))}")
+    merged = dict(DEFAULT_PROFILES['balanced'], **profile)
+    if merged['median_size'] < 1 or merged['median_size'] % 2 == 0:
+        raise ValueError(f"OCR profile {name}: median_size must be a positive odd number")
+    if merged['min_width'] and merged['upscale_width'] < merged['min_width']:
+        raise ValueError(f"OCR profile {name}: upscale_width must be at least min_width")
+    return merged
+
+
+def load_profiles(path: str = None) -> Dict[str, Dict[str, any]]:
+    """Built-in profiles, overridden and extended by the 'profiles' of a tuner JSON file"""
+    profiles = {name: dict(profile) for name, profile in DEFAULT_PROFILES.items()}
+    if path:
+        with open(path, encoding='utf-8') as file:
+            tuned = json.load(file)
+        for name, profile in tuned.get('profiles', {}).items():
+            profiles[name] = validate_profile(name, profile)
+    return profiles
+
+
+def profile_fingerprint(profile: Dict[str, any]) -> str:
+    """Short hash of a profile's settings, part of the OCR cache key"""
+    encoded = json.dumps(profile, sort_keys=True).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()[:12]
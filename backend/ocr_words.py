@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+OCR Word Confidences for PramanMitra
+Keeps Tesseract's word-level confidences and bounding boxes and maps them
+onto extracted field values, so each field gets a real OCR confidence
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Words are {'text': str, 'conf': 0.0-1.0, 'box': [left, top, width, height]}
+Word = Dict[str, any]
+
+
+def _token(text: str) -> str:
+    return re.sub(r'[^0-9a-z]', '', text.lower())
+
+
+def words_from_tesseract_data(data: Dict[str, list]) -> Tuple[str, List[Word]]:
+    """Page text and words from pytesseract.image_to_data(output_type=DICT).
+
+    The text is laid out like image_to_string: words of a line separated by
+    spaces, lines by newlines and paragraphs by a blank line.
+    """
+    words = []
+    paragraphs = []
+    lines = {}
+    for i, text in enumerate(data['text']):
+        if data['level'][i] != 5 or not text.strip():
+            continue
+        paragraph = (data['block_num'][i], data['par_num'][i])
+        if paragraph not in lines:
+            lines[paragraph] = {}
+            paragraphs.append(paragraph)
+        lines[paragraph].setdefault(data['line_num'][i], []).append(text.strip())
+        words.append({
+            'text': text.strip(),
+            'conf': max(0.0, float(data['conf'][i])) / 100,
+            'box': [data['left'][i], data['top'][i], data['width'][i], data['height'][i]]
+        })
+
+    page_text = '\n\n'.join('\n'.join(' '.join(line) for line in lines[paragraph].values())
+                            for paragraph in paragraphs)
+    return page_text, words
+
+
+def locate_value(value: str, words: List[Word]) -> Optional[Tuple[int, int]]:
+    """Index range of the words a field value was read from, or None.
+
+    A run of words equal to the value's tokens wins; otherwise the first
+    run in which every word contains its token (e.g. 'NO:S1900508770').
+    """
+    tokens = [token for token in (_token(part) for part in str(value).split()) if token]
+    if not tokens or len(tokens) > len(words):
+        return None
+    normalized = [_token(word['text']) for word in words]
+    last_start = len(words) - len(tokens) + 1
+
+    for start in range(last_start):
+        if all(normalized[start + j] == token for j, token in enumerate(tokens)):
+            return start, start + len(tokens)
+    for start in range(last_start):
+        if all(token in normalized[start + j] for j, token in enumerate(tokens)):
+            return start, start + len(tokens)
+    return None
+
+
+def union_box(words: List[Word]) -> List[int]:
+    left = min(word['box'][0] for word in words)
+    top = min(word['box'][1] for word in words)
+    right = max(word['box'][0] + word['box'][2] for word in words)
+    bottom = max(word['box'][1] + word['box'][3] for word in words)
+    return [left, top, right - left, bottom - top]
+
+
+def mean_confidence(words: List[Word]) -> Optional[float]:
+    if not words:
+        return None
+    return sum(word['conf'] for word in words) / len(words)
+
+
+def field_confidences(raw_values: Dict[str, Optional[str]],
+                      words: List[Word]) -> Tuple[Dict[str, float], Dict[str, List[int]]]:
+    """OCR confidence and bounding box of every extracted field value.
+
+    A field's confidence is that of its weakest word. Values that cannot be
+    traced back to words (e.g. split across lines) get the page's mean word
+    confidence and no box.
+    """
+    confidences = {}
+    boxes = {}
+    page_confidence = mean_confidence(words)
+    for field, value in raw_values.items():
+        if not value:
+            continue
+        located = locate_value(value, words)
+        if located is None:
+            if page_confidence is not None:
+                confidences[field] = page_confidence
+            continue
+        matched = words[located[0]:located[1]]
+        confidences[field] = min(word['conf'] for word in matched)
+        boxes[field] = union_box(matched)
+    return confidences, boxes
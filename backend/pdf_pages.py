@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+PDF Page Rasterization for PramanMitra
+Turns pages of scanned PDFs (no usable text layer) into grayscale images
+that go through the regular image OCR pipeline
+"""
+
+import io
+import math
+from typing import Optional
+
+from PIL import Image
+
+from image_loading import load_grayscale
+
+try:
+    import pymupdf
+except ImportError:
+    try:
+        import fitz as pymupdf  # PyMuPDF < 1.24
+    except ImportError:  # Optional: embedded page images are used instead
+        pymupdf = None
+
+
+def renderer_available() -> bool:
+    """Check whether PyMuPDF is installed to render pages at a chosen DPI"""
+    return pymupdf is not None
+
+
+def render_page(data: bytes, page_index: int, dpi: int = 200,
+                max_pixels: Optional[int] = None) -> Optional[Image.Image]:
+    """Grayscale image of one PDF page, or None when it cannot be produced.
+
+    Pages are rendered with PyMuPDF when it is installed, at dpi or at the
+    lower resolution that keeps the page within max_pixels, so a huge page
+    box cannot allocate an unbounded pixmap. Otherwise the largest image
+    embedded in the page is used, which is the page itself in scanner
+    output but ignores dpi, and is refused like an uploaded image when over
+    max_pixels. Every call opens its own document so pages can be rendered
+    from several threads.
+    """
+    if pymupdf is not None:
+        with pymupdf.open(stream=data, filetype='pdf') as document:
+            page = document[page_index]
+            zoom = dpi / 72
+            area, perimeter = page.rect.width * page.rect.height, page.rect.width + page.rect.height
+            if max_pixels and area > 0:
+                # Largest zoom with (width * zoom + 1) * (height * zoom + 1) <= max_pixels, in points
+                # (1/72 inch), the + 1 for the pixel rounding may add to each side
+                zoom = min(zoom, (math.sqrt(perimeter ** 2 + 4 * area * (max_pixels - 1)) - perimeter) / (2 * area))
+            pixmap = page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom), colorspace=pymupdf.csGRAY, alpha=False)
+            return Image.frombytes('L', (pixmap.width, pixmap.height), pixmap.samples)
+
+    from PyPDF2 import PdfReader
+    page = PdfReader(io.BytesIO(data)).pages[page_index]
+    largest = None
+    for embedded in page.images:
+        if largest is None or len(embedded.data) > len(largest.data):
+            largest = embedded
+    if largest is None:
+        return None
+    # JPEG page scans are decoded straight into luminance
+    return load_grayscale(io.BytesIO(largest.data), max_pixels=max_pixels)
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Certificate Lookup Cache for PramanMitra
+Per-process LRU of active certificates by seat number, invalidated across
+workers through the registry generation counter (RegistryState)
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+# Cached result of a seat number with no active certificate
+_MISSING = object()
+
+
+class CertificateLookupCache:
+    """Read-through LRU of certificate rows (dicts) keyed by seat_no.
+
+    Unknown seat numbers are cached too, so repeated fake submissions do not
+    reach the database either. Every check_interval seconds the next lookup
+    reads the registry generation with generation_loader; when it differs
+    from the one the entries were loaded under, the cache is emptied. Writes
+    in other workers are therefore seen within check_interval seconds.
+    """
+
+    def __init__(self, generation_loader: Callable[[], int], max_items: int = 4096,
+                 check_interval: float = 5.0):
+        self.generation_loader = generation_loader
+        self.max_items = max_items
+        self.check_interval = check_interval
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = None
+        self._checked_at = None
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    def _check_generation(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.check_interval:
+                return
+            # Claimed before the query so concurrent lookups do not all check
+            self._checked_at = now
+        try:
+            generation = self.generation_loader()
+        except Exception as e:
+            print(f"Error reading registry generation, clearing certificate cache: {str(e)}")
+            generation = None
+        with self._lock:
+            if generation is None or generation != self._generation:
+                if self._entries:
+                    self.stats['invalidations'] += 1
+                self._entries.clear()
+                self._generation = generation
+
+    def get(self, seat_no: str, loader: Callable[[str], Optional[Dict[str, any]]]) -> Optional[Dict[str, any]]:
+        """Row of seat_no from the cache, or from loader (None when there is no active certificate)"""
+        self._check_generation()
+        with self._lock:
+            entry = self._entries.get(seat_no)
+            if entry is not None:
+                self._entries.move_to_end(seat_no)
+                self.stats['hits'] += 1
+                return None if entry is _MISSING else dict(entry)
+            self.stats['misses'] += 1
+            generation = self._generation
+
+        row = loader(seat_no)
+        with self._lock:
+            # Rows loaded while the cache was invalidated may already be stale
+            if generation == self._generation:
+                self._entries[seat_no] = _MISSING if row is None else dict(row)
+                self._entries.move_to_end(seat_no)
+                self._evict()
+        return row
+
+    def get_many(self, seat_nos: List[str],
+                 loader: Callable[[List[str]], Dict[str, Dict[str, any]]]) -> Dict[str, Dict[str, any]]:
+        """Rows of seat_nos from the cache, the ones it lacks from one loader call (which returns the found
+        rows by seat number); seat numbers with no active certificate are absent"""
+        self._check_generation()
+        rows, missing = {}, []
+        with self._lock:
+            for seat_no in seat_nos:
+                entry = self._entries.get(seat_no)
+                if entry is None:
+                    missing.append(seat_no)
+                    continue
+                self._entries.move_to_end(seat_no)
+                if entry is not _MISSING:
+                    rows[seat_no] = dict(entry)
+            self.stats['hits'] += len(seat_nos) - len(missing)
+            self.stats['misses'] += len(missing)
+            generation = self._generation
+        if not missing:
+            return rows
+
+        loaded = loader(missing)
+        with self._lock:
+            # Rows loaded while the cache was invalidated may already be stale
+            if generation == self._generation:
+                for seat_no in missing:
+                    row = loaded.get(seat_no)
+                    self._entries[seat_no] = _MISSING if row is None else dict(row)
+                    self._entries.move_to_end(seat_no)
+                self._evict()
+        rows.update(loaded)
+        return rows
+
+    def _evict(self):
+        while len(self._entries) > self.max_items:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def get_stats(self) -> Dict[str, any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['items'] = len(self._entries)
+            stats['generation'] = self._generation
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+        return stats
+
+    def clear(self):
+        """Forget every entry now, e.g. after this process wrote to the registry"""
+        with self._lock:
+            self._entries.clear()
+            self._checked_at = None
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Registry-Guided Extraction for PramanMitra
+Once the seat number resolves to a registry row, the row's expected values
+are looked for in the OCR text directly (fuzzy, word-window search) right
+after their field's label, instead of guessing every field with the full
+pattern bank
+"""
+
+import re
+from bisect import bisect_right
+from difflib import SequenceMatcher
+from typing import Callable, Dict, Optional, Tuple
+
+# Expected row (Certificate.to_dict() fields) of an active seat number, None
+# when it is unknown, or {} when it is unknown but may be a misread of one
+RegistryLookup = Callable[[str], Optional[Dict[str, any]]]
+
+# Registry fields confirmed by searching the text; anything else uses the patterns
+GUIDED_TEXT_FIELDS = ('student_name', 'mother_name', 'subject')
+
+# Lowest similarity (0-100) at which a window of the text counts as the expected value
+DEFAULT_MIN_SIMILARITY = 85
+
+_NUMBER = re.compile(r'(?<![0-9.])([0-9]{1,2})\s?[.,]\s?([0-9]{1,2})(?![0-9])')
+
+# Labels a field's value follows, best first, as the pattern bank orders them.
+# Only the value at the first occurrence of the best label present is
+# confirmed, so a registry value printed elsewhere (a subject mark equal to
+# the SGPA, the student's name in the mother name line) is never taken.
+FIELD_ANCHORS = {
+    'student_name': [re.compile(r'(?:Student|Candidate)\s*Name|Name\s*of\s*(?:the\s*)?(?:Student|Candidate)',
+                                re.IGNORECASE),
+                     re.compile(r'(?<![A-Za-z])Name(?![A-Za-z])', re.IGNORECASE)],
+    'mother_name': [re.compile(r"Mother(?:'?s)?\s*Name", re.IGNORECASE),
+                    re.compile(r'(?<![A-Za-z])Mother(?![A-Za-z])', re.IGNORECASE)],
+    'subject': [re.compile(r'(?<![A-Za-z])[S$]UB(?:JECT)?(?![A-Za-z])', re.IGNORECASE)],
+    'sgpa': [re.compile(r'(?<![A-Za-z])SGPA(?![A-Za-z])', re.IGNORECASE),
+             re.compile(r'(?<![A-Za-z])C?GPA(?![A-Za-z])', re.IGNORECASE)]
+}
+
+# A bare "Name" label preceded by one of these belongs to another field
+_OTHER_NAME_LABEL = re.compile(r"(?:mother|father|college|institute|university|school)(?:'?s)?\W*$",
+                               re.IGNORECASE)
+
+# Characters after a label that are searched for its value
+ANCHOR_WINDOW_CHARS = 120
+
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def _normalized(text: str) -> str:
+    return ' '.join(_NON_ALNUM.sub(' ', text.lower()).split())
+
+
+class TextWindows:
+    """Words of a text, normalized once, searched for expected values"""
+
+    def __init__(self, text: str):
+        self.text = text
+        # (start, end, normalized) of every word with letters or digits
+        self.tokens = []
+        for match in re.finditer(r'\S+', text):
+            normalized = _normalized(match.group(0))
+            if normalized:
+                self.tokens.append((match.start(), match.end(), normalized))
+        # ' '-joined normalized words, with the offset each word starts at
+        self.starts = []
+        parts = []
+        offset = 0
+        for token in self.tokens:
+            self.starts.append(offset + 1)
+            parts.append(token[2])
+            offset += len(token[2]) + 1
+        self.joined = ' ' + ' '.join(parts) + ' '
+
+    def _span(self, first: int, last: int) -> str:
+        return self.text[self.tokens[first][0]:self.tokens[last][1]]
+
+    def find(self, expected: str, min_similarity: int = DEFAULT_MIN_SIMILARITY,
+             at_start: bool = False) -> Optional[Tuple[str, int]]:
+        """Substring of the text that best matches expected, with its similarity, or None.
+
+        An exact (normalized) occurrence is one substring search. Otherwise
+        windows of one word fewer to one word more than the expected value
+        are compared, so OCR that splits or merges a word still matches.
+        Similarity is fuzz.ratio's (difflib); the cheap upper bounds are
+        checked first, as in difflib.get_close_matches. With at_start only
+        substrings starting at the first word count.
+        """
+        target = _normalized(expected or '')
+        if not target:
+            return None
+        position = self.joined.find(' ' + target + ' ')
+        if position != -1 and (position == 0 or not at_start):
+            # A word may normalize to several (e.g. 'A-B'), so map both ends
+            first = bisect_right(self.starts, position + 1) - 1
+            last = bisect_right(self.starts, position + len(target)) - 1
+            return self._span(first, last), 100
+
+        size = len(expected.split())
+        matcher = SequenceMatcher(autojunk=False)
+        matcher.set_seq2(target)
+        best, best_score = None, min_similarity - 1
+        for start in range(min(1, len(self.tokens)) if at_start else len(self.tokens)):
+            for width in range(max(1, size - 1), size + 2):
+                if start + width > len(self.tokens):
+                    break
+                matcher.set_seq1(' '.join(token[2] for token in self.tokens[start:start + width]))
+                # fuzz.ratio rounds, so a bound just below best_score + 1 can still win
+                bound = (best_score + 0.5) / 100
+                if matcher.real_quick_ratio() < bound or matcher.quick_ratio() < bound:
+                    continue
+                score = int(round(matcher.ratio() * 100))
+                if score > best_score:
+                    best, best_score = self._span(start, start + width - 1), score
+        return (best, best_score) if best is not None else None
+
+
+def field_window(text: str, field: str) -> Optional[str]:
+    """Text following the field's label (see FIELD_ANCHORS), or None when no label is found"""
+    for anchor in FIELD_ANCHORS[field]:
+        for match in anchor.finditer(text):
+            if field == 'student_name' and _OTHER_NAME_LABEL.search(text, max(0, match.start() - 16),
+                                                                      match.start()):
+                continue
+            return text[match.end():match.end() + ANCHOR_WINDOW_CHARS]
+    return None
+
+
+def find_expected_number(text: str, expected: float, tolerance: float = 0.005) -> Optional[str]:
+    """The decimal text starts with (after separators), as written, when it equals expected (e.g. an SGPA)"""
+    if expected is None:
+        return None
+    match = _NUMBER.match(text, len(text) - len(text.lstrip(' \t\r\n.:=-|')))
+    if match is not None and abs(float(f"{match.group(1)}.{match.group(2)}") - float(expected)) <= tolerance:
+        return match.group(0)
+    return None
+
+
+def confirm_expected_values(text: str, expected: Dict[str, any],
+                            min_similarity: int = DEFAULT_MIN_SIMILARITY) -> Dict[str, str]:
+    """Raw text of every registry value the document states right after its field's label, by field"""
+    found = {}
+    for field in GUIDED_TEXT_FIELDS:
+        window = field_window(text, field)
+        match = TextWindows(window).find(expected.get(field), min_similarity, at_start=True) if window else None
+        if match is not None:
+            found[field] = match[0]
+    window = field_window(text, 'sgpa')
+    sgpa = find_expected_number(window, expected.get('sgpa')) if window else None
+    if sgpa is not None:
+        found['sgpa'] = sgpa
+    return found
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Seat Number Index for PramanMitra
+In-memory index of active seat numbers that finds the registered seats an
+OCR-misread seat number may have been (S/5/$, 0/O, 1/I, 8/B ...), so a
+near miss is not reported as a fake certificate
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from rapidfuzz.distance import Levenshtein
+
+# Characters OCR confuses, mapped to one representative per class
+OCR_CONFUSIONS = {
+    'O': '0', 'Q': '0', 'D': '0',
+    'I': '1', 'L': '1', '|': '1',
+    'Z': '2',
+    'S': '5', '$': '5',
+    'G': '6',
+    'B': '8',
+}
+
+# Cost of reading a character as one OCR confuses it with; any other edit costs 1
+CONFUSION_COST = 0.25
+
+
+def canonical_seat(seat_no: str) -> str:
+    """seat_no with every confusable character replaced by its class representative"""
+    return ''.join(OCR_CONFUSIONS.get(char, char) for char in seat_no.upper())
+
+
+def deletion_variants(text: str, max_edits: int) -> set:
+    """text and every string made by deleting up to max_edits of its characters"""
+    variants = {text}
+    level = {text}
+    for _ in range(max_edits):
+        level = {variant[:index] + variant[index + 1:] for variant in level for index in range(len(variant))}
+        variants |= level
+    return variants
+
+
+def confusion_distance(first: str, second: str, max_edits: Optional[int] = None) -> Optional[float]:
+    """Edits between the canonical forms plus CONFUSION_COST per confused character.
+
+    Confusions are counted in the characters the canonical alignment keeps,
+    so S400050323 and 54OOO5O323 are 1.25 apart. None when the canonical
+    forms are more than max_edits apart.
+    """
+    first, second = first.upper(), second.upper()
+    first_canonical, second_canonical = canonical_seat(first), canonical_seat(second)
+    edits = Levenshtein.distance(first_canonical, second_canonical, score_cutoff=max_edits)
+    if max_edits is not None and edits > max_edits:
+        return None
+    confusions = 0
+    for tag, first_start, first_end, second_start, second_end in Levenshtein.opcodes(first_canonical,
+                                                                                     second_canonical):
+        if tag == 'equal':
+            confusions += sum(a != b for a, b in zip(first[first_start:first_end], second[second_start:second_end]))
+    return edits + CONFUSION_COST * confusions
+
+
+class SeatNumberIndex:
+    """Deletion-neighbourhood index over confusion-canonical seat numbers.
+
+    Confusable characters are folded to one representative before indexing,
+    so any number of confusions costs no extra lookups; every canonical seat
+    is stored under each string left after deleting up to max_edits of its
+    characters, so a query finds the seats within max_edits other edits by
+    looking up its own deletion variants. Candidates are then ranked by
+    confusion_distance and kept up to max_distance.
+
+    Seats come from seat_loader(after_id) as (certificate id, seat number)
+    in ascending id order. Like CertificateLookupCache, the registry
+    generation (generation_loader) is checked at most every check_interval
+    seconds, outside the lock. The first build runs in a background thread
+    when refresh() is called at startup; until it finishes, ready is False
+    and lookups find nothing rather than wait for it. Afterwards each
+    registry change only appends the seats after the highest indexed id,
+    under the lock. Rows committed out of id order and deactivated seats
+    are picked up by a full rebuild, run when the registry changed and
+    rebuild_interval seconds have passed since the last one, or on the
+    next change after rebuild() is called; it is built aside while the
+    current index keeps answering and swapped in whole (candidates are
+    confirmed against the registry anyway, so a stale index only misses
+    the seats it has not loaded yet).
+    """
+
+    def __init__(self, seat_loader: Callable[[int], Iterable[Tuple[int, str]]], generation_loader: Callable[[], int],
+                 max_edits: int = 1, max_distance: float = 2.0, check_interval: float = 5.0,
+                 rebuild_interval: float = 3600.0):
+        self.seat_loader = seat_loader
+        self.generation_loader = generation_loader
+        self.max_edits = max_edits
+        self.max_distance = max_distance
+        self.check_interval = check_interval
+        self.rebuild_interval = rebuild_interval
+        self.stats = {'builds': 0, 'build_seconds': 0.0, 'appends': 0, 'append_seconds': 0.0, 'lookups': 0}
+        self._reset()
+        # A forked worker (e.g. gunicorn --preload) does not inherit the build thread
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._variants = {}
+        self._seats = set()
+        self._last_id = 0
+        self._lock = threading.Lock()
+        self._generation = None
+        # Generation and time of the last full build, and whether the next change rebuilds anyway
+        self._built_generation = None
+        self._built_at = None
+        self._rebuild_requested = False
+        self._ready = threading.Event()
+        self._updating = False
+        self._checked_at = None
+
+    @property
+    def ready(self) -> bool:
+        """Whether the first build has finished"""
+        return self._ready.is_set()
+
+    def refresh(self):
+        """Update the index in a background thread when the registry generation changed.
+        Every lookup calls it; calling it at startup starts the first build."""
+        now = time.monotonic()
+        with self._lock:
+            if self._updating or (self._checked_at is not None and now - self._checked_at < self.check_interval):
+                return
+            self._checked_at = now
+            self._updating = True
+        try:
+            generation = self.generation_loader()
+        except Exception as e:
+            print(f"Error reading registry generation for the seat index: {str(e)}")
+            generation = None
+        with self._lock:
+            if self.ready and generation is not None and generation == self._generation:
+                self._updating = False
+                return
+            full = (not self.ready or generation is None or self._rebuild_requested
+                    or (generation != self._built_generation and now - self._built_at >= self.rebuild_interval))
+        target = self._rebuild if full else self._append
+        threading.Thread(target=target, args=(generation,), daemon=True).start()
+
+    def rebuild(self):
+        """Rebuild the index from scratch on the next registry change, e.g. after seats were deactivated"""
+        with self._lock:
+            self._rebuild_requested = True
+            self._checked_at = None
+
+    def _rebuild(self, generation: Optional[int]):
+        started = time.perf_counter()
+        try:
+            with self._lock:
+                self._rebuild_requested = False
+            # Built aside while the current index keeps answering
+            variants, seats, last_id = {}, set(), 0
+            for certificate_id, seat_no in self.seat_loader(0):
+                self._add(variants, seats, seat_no)
+                last_id = certificate_id
+            with self._lock:
+                self._variants, self._seats, self._last_id = variants, seats, last_id
+                self._generation = self._built_generation = generation
+                self._built_at = time.monotonic()
+                self.stats['builds'] += 1
+                self.stats['build_seconds'] = round(time.perf_counter() - started, 3)
+            self._ready.set()
+        except Exception as e:
+            print(f"Error building the seat index: {str(e)}")
+            with self._lock:
+                self._rebuild_requested = True
+        finally:
+            with self._lock:
+                self._updating = False
+
+    def _append(self, generation: Optional[int]):
+        started = time.perf_counter()
+        try:
+            # Variants outside the lock, which is held only to insert them
+            rows = [(certificate_id, seat_no, deletion_variants(canonical_seat(seat_no), self.max_edits))
+                    for certificate_id, seat_no in self.seat_loader(self._last_id) if seat_no]
+            with self._lock:
+                for certificate_id, seat_no, variants in rows:
+                    self._add(self._variants, self._seats, seat_no, variants)
+                    self._last_id = certificate_id
+                self._generation = generation
+                self.stats['appends'] += 1
+                self.stats['append_seconds'] = round(time.perf_counter() - started, 3)
+        except Exception as e:
+            print(f"Error updating the seat index: {str(e)}")
+        finally:
+            with self._lock:
+                self._updating = False
+
+    def _add(self, variants: Dict[str, List[str]], seats: set, seat_no: str, seat_variants: set = None):
+        if not seat_no or seat_no in seats:
+            return
+        seats.add(seat_no)
+        for variant in seat_variants or deletion_variants(canonical_seat(seat_no), self.max_edits):
+            variants.setdefault(variant, []).append(seat_no)
+
+    def invalidate(self):
+        """Check the registry generation on next use, e.g. after this process wrote to the registry"""
+        with self._lock:
+            self._checked_at = None
+
+    def candidates(self, seat_no: str, limit: int = 5) -> List[Tuple[str, float]]:
+        """Registered seat numbers seat_no may be a misread of, as (seat_no, distance), closest first.
+
+        Empty when seat_no itself is registered, and before the first build finishes (see ready).
+        """
+        if not seat_no:
+            return []
+        self.refresh()
+        query_variants = deletion_variants(canonical_seat(seat_no), self.max_edits)
+        found = set()
+        # Under the lock, as appends grow the live index
+        with self._lock:
+            self.stats['lookups'] += 1
+            if seat_no in self._seats:
+                return []
+            for variant in query_variants:
+                found.update(self._variants.get(variant, ()))
+        ranked = []
+        for candidate in found:
+            distance = confusion_distance(seat_no, candidate, self.max_edits)
+            if distance is not None and distance <= self.max_distance:
+                ranked.append((candidate, distance))
+        ranked.sort(key=lambda item: (item[1], item[0]))
+        return ranked[:limit]
+
+    def get_stats(self) -> Dict[str, any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['seats'] = len(self._seats)
+            stats['keys'] = len(self._variants)
+            stats['generation'] = self._generation
+            stats['ready'] = self.ready
+            stats['updating'] = self._updating
+        return stats
@@ -1,23 +1,79 @@
 #!/usr/bin/env python3
 """ Simplified Certificate Verifier for Minimal Field Validation """
 
-from typing import Dict
-from fuzzywuzzy import fuzz
+from typing import Dict, List, Optional, Tuple
+import re
+import numpy as np
+from name_similarity import (TOP_BAND, name_similarities, name_similarity, normalize_name,
+                             subject_similarities, subject_similarity)
 from models import db, Certificate, Institution, VerificationLog, FraudDetectionLog
+from registry_cache import CertificateLookupCache
+from seat_index import SeatNumberIndex
+from name_index import NameTrigramIndex
 from datetime import datetime, timedelta
 import json
-import re
+
+# (lowest similarity, score) bands, best first; anything lower gets the floor
+NAME_SCORE_BANDS = ((95, 1.0), (90, 0.95), (85, 0.9), (80, 0.85), (75, 0.8), (70, 0.75), (65, 0.7),
+                    (60, 0.65), (55, 0.6), (50, 0.55), (45, 0.5), (40, 0.45), (35, 0.4))
+NAME_SCORE_FLOOR = 0.3  # Only truly terrible matches get 30%
+SUBJECT_SCORE_BANDS = ((90, 0.95), (80, 0.9), (70, 0.8), (60, 0.7), (50, 0.6))
+SUBJECT_SCORE_FLOOR = 0.4
+# (largest SGPA difference, score) bands: perfect, very close, close, good,
+# acceptable, fair and poor but within reason
+SGPA_SCORE_BANDS = ((0.05, 1.0), (0.1, 0.95), (0.2, 0.9), (0.3, 0.85), (0.5, 0.75), (0.7, 0.6), (1.0, 0.4))
+SGPA_SCORE_FLOOR = 0.2
+
+DATE_FORMATS = ['%d %B %Y', '%d-%m-%Y', '%d/%m/%Y', '%B %d, %Y', '%Y-%m-%d', '%m/%d/%Y']
+
+# Field scores in the order verification results report them
+SCORE_FIELDS = ('student_name', 'mother_name', 'sgpa', 'date', 'subject')
+
+# Seat numbers (or ids) per query when loading many registry rows
+REGISTRY_QUERY_CHUNK = 500
+
+# Rows per round trip when streaming the whole registry
+REGISTRY_STREAM_CHUNK = 10000
+
+
+def band_score(value: float, bands: tuple, floor: float, at_most: bool = False) -> float:
+    """Score of the first band value reaches (or stays within, with at_most)"""
+    for limit, score in bands:
+        if (value <= limit) if at_most else (value >= limit):
+            return score
+    return floor
+
+
+def band_scores(values: np.ndarray, bands: tuple, floor: float, at_most: bool = False) -> np.ndarray:
+    """band_score of every value"""
+    conditions = [values <= limit if at_most else values >= limit for limit, _ in bands]
+    return np.select(conditions, [score for _, score in bands], floor)
+
 
 class CertificateVerifier:
-    def __init__(self):
+    def __init__(self, lookup_cache: CertificateLookupCache = None, seat_index: SeatNumberIndex = None,
+                 name_index: NameTrigramIndex = None):
+        # Optional read-through cache of active certificates by seat number
+        self.lookup_cache = lookup_cache
+        # Optional index of registered seats an unregistered (misread) seat number may be
+        self.seat_index = seat_index
+        # Optional index of registered names, for records without a seat number
+        self.name_index = name_index
         self.verification_thresholds = {
             'name_similarity': 80,  # Lowered from 85 to be more forgiving with OCR variations
             'authentic_threshold': 0.8,    # 80% - High confidence for authentic (VERIFIED)
-            'suspicious_threshold': 0.5    # 50% - Medium confidence for suspicious
+            'suspicious_threshold': 0.5,   # 50% - Medium confidence for suspicious
             # Below 50% = FRAUD/FAKE
+            'ocr_confidence': 0.6          # Field reads below this OCR confidence count as weak evidence
         }
 
-    def verify_certificate(self, extracted_data: Dict[str, any]) -> Dict[str, any]:
+    def verify_certificate(self, extracted_data: Dict[str, any],
+                           field_confidence: Dict[str, float] = None) -> Dict[str, any]:
+        """Verify extracted fields against the registry.
+
+        field_confidence holds optional per-field OCR confidences (0-1) from
+        OCRProcessor.validate_extraction_quality.
+        """
         result = {
             'status': 'UNKNOWN',
             'confidence': 0.0,
@@ -26,13 +82,17 @@ class CertificateVerifier:
             'institution_verified': False
         }
         try:
-            matched_cert = Certificate.query.filter_by(
-                seat_no=extracted_data.get('seat_no'),
-                is_active=True
-            ).first()
+            matched_cert = self.find_certificate(extracted_data.get('seat_no'))
 
             if matched_cert:
-                result.update(self.verify_direct_match(matched_cert, extracted_data))
+                result.update(self.verify_direct_match(matched_cert, extracted_data, field_confidence))
+                return result
+
+            recovered = (self._recovered_result(extracted_data, field_confidence)
+                         or self._identified_result(extracted_data, field_confidence)
+                         or self._warming_result(extracted_data))
+            if recovered:
+                result.update(recovered)
                 return result
 
             # No college verification - mark as FAKE if no direct match found
@@ -47,248 +107,408 @@ class CertificateVerifier:
             result['anomalies'].append(f'Verification error: {str(e)}')
             return result
 
+    def verify_certificates(self, extracted_records: List[Dict[str, any]],
+                            field_confidences: List[Dict[str, float]] = None) -> List[Dict[str, any]]:
+        """verify_certificate of many records, e.g. a placement drive's batch.
+
+        Registry rows are loaded a chunk of seat numbers per query and every
+        matched record is scored in one verify_direct_matches pass; seat
+        numbers that are not registered go through the seat index, and
+        records without one through the name index.
+        """
+        field_confidences = field_confidences or [None] * len(extracted_records)
+        try:
+            rows = self.registry_rows([extracted_data.get('seat_no') for extracted_data in extracted_records])
+        except Exception as e:
+            return [self._error_result(e) for _ in extracted_records]
+
+        # No college verification - mark as FAKE if no direct match found
+        results = [{'status': 'FAKE', 'confidence': 0.1, 'matched_certificate': None,
+                    'anomalies': ['No matching certificate found'], 'institution_verified': False}
+                   for _ in extracted_records]
+        matched = [index for index, extracted_data in enumerate(extracted_records)
+                   if extracted_data.get('seat_no') in rows]
+        scored = self.verify_direct_matches(
+            [self._certificate(rows[extracted_records[index]['seat_no']]) for index in matched],
+            [extracted_records[index] for index in matched],
+            [field_confidences[index] for index in matched])
+        for index, result in zip(matched, scored):
+            results[index] = result
+        for index, extracted_data in enumerate(extracted_records):
+            if extracted_data.get('seat_no') not in rows:
+                try:
+                    results[index] = (self._recovered_result(extracted_data, field_confidences[index])
+                                      or self._identified_result(extracted_data, field_confidences[index])
+                                      or self._warming_result(extracted_data)
+                                      or results[index])
+                except Exception as e:
+                    results[index] = self._error_result(e)
+        return results
+
+    @staticmethod
+    def _error_result(error: Exception) -> Dict[str, any]:
+        """What verify_certificate returns when verifying a record raised error"""
+        return {'status': 'ERROR', 'confidence': 0.0, 'matched_certificate': None,
+                'anomalies': [f'Verification error: {str(error)}'], 'institution_verified': False}
+
+    def recover_certificate(self, extracted_data: Dict[str, any]) -> Optional[Tuple[Certificate, float]]:
+        """Registered certificate an unregistered seat number was probably misread from, with its distance.
+
+        Seat index candidates are only accepted when the extracted student
+        name matches theirs; the closest seat wins, then the closest name,
+        and a tie between two candidates recovers nothing. Without a seat
+        index, a seat number or a student name, None.
+        """
+        seat_no, student_name = extracted_data.get('seat_no'), extracted_data.get('student_name')
+        if self.seat_index is None or not seat_no or not student_name:
+            return None
+        confirmed = []
+        for candidate, distance in self.seat_index.candidates(seat_no):
+            row = self.registry_row(candidate)
+            if row is None:
+                continue
+            similarity = self.enhanced_name_similarity(student_name, row['student_name'])
+            if similarity >= self.verification_thresholds['name_similarity']:
+                confirmed.append(((distance, -similarity), row))
+        confirmed.sort(key=lambda item: item[0])
+        if not confirmed or (len(confirmed) > 1 and confirmed[0][0] == confirmed[1][0]):
+            return None
+        (distance, _), row = confirmed[0]
+        return self._certificate(row), distance
+
+    def _recovered_result(self, extracted_data: Dict[str, any],
+                          field_confidence: Dict[str, float] = None) -> Optional[Dict[str, any]]:
+        """verify_direct_match against the recovered certificate, or None"""
+        recovered = self.recover_certificate(extracted_data)
+        if recovered is None:
+            return None
+        certificate, distance = recovered
+        result = self.verify_direct_match(certificate, extracted_data, field_confidence)
+        result['anomalies'].insert(0, f'Seat number {extracted_data["seat_no"]} is not registered; '
+                                      f'matched {certificate.seat_no} as an OCR misread')
+        result['recovered_seat_no'] = {'extracted': extracted_data['seat_no'], 'matched': certificate.seat_no,
+                                       'distance': distance}
+        return result
+
+    def _warming_result(self, extracted_data: Dict[str, any]) -> Optional[Dict[str, any]]:
+        """SUSPICIOUS result for an unmatched record the seat or name index might still match once it
+        has loaded, or None; it is not reported as FAKE while the index cannot rule a match out"""
+        seat_no = extracted_data.get('seat_no')
+        if not extracted_data.get('student_name'):
+            return None
+        if seat_no and self.seat_index is not None and not self.seat_index.ready:
+            anomaly = (f'Seat number {seat_no} is not registered; the seat index is still loading, '
+                       f'so an OCR misread could not be ruled out')
+        elif not seat_no and self.name_index is not None and not self.name_index.ready:
+            anomaly = 'No seat number was read and the name index is still loading; try again shortly'
+        else:
+            return None
+        return {'status': 'SUSPICIOUS', 'confidence': 0.1, 'matched_certificate': None,
+                'anomalies': [anomaly], 'institution_verified': False, 'index_warming': True}
+
+    def _identified_result(self, extracted_data: Dict[str, any],
+                           field_confidence: Dict[str, float] = None) -> Optional[Dict[str, any]]:
+        """verify_direct_match against the certificate a record without a seat number names, or None.
+
+        Name index candidates whose student name matches the extracted one
+        are all scored, so SGPA, subject and mother name decide between
+        namesakes; a tie for the best confidence identifies nothing. Without
+        a seat number a name is weak evidence, so the result is at most
+        SUSPICIOUS unless every other field matches exactly.
+        """
+        student_name = extracted_data.get('student_name')
+        if self.name_index is None or extracted_data.get('seat_no') or not student_name:
+            return None
+        candidates = self.name_index.candidates(student_name, extracted_data.get('mother_name'))
+        rows = self.registry_rows_by_id([certificate_id for certificate_id, _ in candidates])
+        confirmed = [row for row in rows.values()
+                     if self.enhanced_name_similarity(student_name, row['student_name'])
+                     >= self.verification_thresholds['name_similarity']]
+        if not confirmed:
+            return None
+        results = self.verify_direct_matches([self._certificate(row) for row in confirmed],
+                                             [extracted_data] * len(confirmed), [field_confidence] * len(confirmed))
+        ranked = sorted(zip(results, confirmed), key=lambda item: item[0]['confidence'], reverse=True)
+        if len(ranked) > 1 and ranked[0][0]['confidence'] == ranked[1][0]['confidence']:
+            return None
+        result, row = ranked[0]
+        result['anomalies'].insert(0, f'No seat number was read; identified as seat {row["seat_no"]} by name')
+        if result['status'] == 'AUTHENTIC' and not self.matches_exactly(row, extracted_data):
+            result['status'] = 'SUSPICIOUS'
+            result['anomalies'].append('Identified by name only and not every field matches exactly; '
+                                       'needs manual review')
+        result['identified_by_name'] = {'matched': row['seat_no'], 'candidates': len(confirmed)}
+        return result
+
+    @staticmethod
+    def matches_exactly(row: Dict[str, any], extracted_data: Dict[str, any]) -> bool:
+        """Whether the student name, mother name, SGPA and subject were all read and equal the registry's"""
+        def words(value):
+            # Extraction drops punctuation such as '&' in subject names
+            return re.findall(r'[0-9a-z]+', str(value or '').lower())
+
+        try:
+            sgpa_matches = abs(float(extracted_data['sgpa']) - float(row['sgpa'])) < 0.005
+        except (KeyError, TypeError, ValueError):
+            return False
+        mother_name, subject = extracted_data.get('mother_name'), extracted_data.get('subject')
+        return (sgpa_matches and bool(mother_name) and bool(subject)
+                and normalize_name(extracted_data.get('student_name') or '') == normalize_name(row['student_name'])
+                and normalize_name(mother_name) == normalize_name(row.get('mother_name') or '')
+                and words(subject) == words(row.get('subject')))
+
+    @staticmethod
+    def _load_registry_row(seat_no: str) -> Optional[Dict[str, any]]:
+        certificate = Certificate.query.filter_by(seat_no=seat_no, is_active=True).first()
+        return certificate.to_dict() if certificate else None
+
+    @staticmethod
+    def load_active_seat_numbers(after_id: int = 0) -> List[Tuple[int, str]]:
+        """(id, seat number) of the active certificates after after_id, in id order, for SeatNumberIndex"""
+        return [(certificate_id, seat_no) for certificate_id, seat_no
+                in db.session.query(Certificate.id, Certificate.seat_no).filter(Certificate.id > after_id)
+                .filter_by(is_active=True).order_by(Certificate.id)]
+
+    @staticmethod
+    def load_active_names(after_id: int = 0):
+        """(id, student name, mother name) of the active certificates after after_id, in id order,
+        for NameTrigramIndex"""
+        return (db.session.query(Certificate.id, Certificate.student_name, Certificate.mother_name)
+                .filter(Certificate.id > after_id).filter_by(is_active=True)
+                .order_by(Certificate.id).yield_per(REGISTRY_STREAM_CHUNK))
+
+    def registry_row(self, seat_no: str) -> Optional[Dict[str, any]]:
+        """Active certificate of a seat number as a dict (through the lookup cache), or None"""
+        if not seat_no:
+            return None
+        if self.lookup_cache is None:
+            return self._load_registry_row(seat_no)
+        return self.lookup_cache.get(seat_no, self._load_registry_row)
+
+    @staticmethod
+    def _load_registry_rows(seat_nos: List[str]) -> Dict[str, Dict[str, any]]:
+        loaded = {}
+        for start in range(0, len(seat_nos), REGISTRY_QUERY_CHUNK):
+            chunk = seat_nos[start:start + REGISTRY_QUERY_CHUNK]
+            for certificate in Certificate.query.filter(Certificate.seat_no.in_(chunk)).filter_by(is_active=True):
+                loaded[certificate.seat_no] = certificate.to_dict()
+        return loaded
+
+    def registry_rows(self, seat_nos: List[str]) -> Dict[str, Dict[str, any]]:
+        """Active certificates of many seat numbers as dicts (through the lookup cache, querying only
+        the seats it lacks), by seat number; unknown ones are absent"""
+        wanted = list(dict.fromkeys(seat_no for seat_no in seat_nos if seat_no))
+        if self.lookup_cache is None:
+            return self._load_registry_rows(wanted)
+        return self.lookup_cache.get_many(wanted, self._load_registry_rows)
+
+    def registry_rows_by_id(self, certificate_ids: List[int]) -> Dict[int, Dict[str, any]]:
+        """Active certificates of many ids as dicts, by id; unknown or inactive ones are absent"""
+        wanted = list(dict.fromkeys(certificate_ids))
+        loaded = {}
+        for start in range(0, len(wanted), REGISTRY_QUERY_CHUNK):
+            chunk = wanted[start:start + REGISTRY_QUERY_CHUNK]
+            for certificate in Certificate.query.filter(Certificate.id.in_(chunk)).filter_by(is_active=True):
+                loaded[certificate.id] = certificate.to_dict()
+        return loaded
+
+    @staticmethod
+    def _certificate(row: Dict[str, any]) -> Certificate:
+        row = dict(row)
+        created_at = row.pop('created_at', None)
+        return Certificate(**row, created_at=datetime.fromisoformat(created_at) if created_at else None)
+
+    def find_certificate(self, seat_no: str) -> Optional[Certificate]:
+        """Active certificate of a seat number, detached from the session, or None"""
+        row = self.registry_row(seat_no)
+        return self._certificate(row) if row is not None else None
+
     def normalize_name(self, name: str) -> str:
-        """Improved name normalization for better OCR handling"""
-        if not name:
-            return ""
-        
-        # Convert to lowercase and strip whitespace
-        name = name.strip().lower()
-        
-        # Remove common OCR artifacts and punctuation
-        name = re.sub(r'[^a-zA-Z0-9\s]', ' ', name)  # Replace punctuation with spaces
-        name = re.sub(r'\s+', ' ', name)  # Normalize multiple spaces
-        
-        # Handle common OCR character confusions
-        ocr_replacements = {
-            '0': 'o',   # Zero to O
-            '1': 'i',   # One to I  
-            '5': 's',   # Five to S (sometimes)
-            '8': 'b',   # Eight to B (sometimes)
-            'rn': 'm',  # rn often misread as m
-            'ii': 'u',  # ii sometimes misread as u
-            'cl': 'd',  # cl sometimes misread as d
-        }
-        
-        for old, new in ocr_replacements.items():
-            name = name.replace(old, new)
-        
-        return name.strip()
-    
+        """Improved name normalization for better OCR handling (memoized)"""
+        return normalize_name(name)
+
     def enhanced_name_similarity(self, extracted_name: str, db_name: str) -> int:
-        """Enhanced name matching with multiple strategies"""
-        if not extracted_name or not db_name:
-            return 0
-        
-        # Normalize both names
-        norm_extracted = self.normalize_name(extracted_name)
-        norm_db = self.normalize_name(db_name)
-        
-        # Strategy 1: Standard fuzzy matching
-        ratio_sim = fuzz.ratio(norm_extracted, norm_db)
-        partial_sim = fuzz.partial_ratio(norm_extracted, norm_db)
-        token_sim = fuzz.token_sort_ratio(norm_extracted, norm_db)
-        token_set_sim = fuzz.token_set_ratio(norm_extracted, norm_db)
-        
-        # Strategy 2: Try reversed order (first/last name swap)
-        extracted_parts = norm_extracted.split()
-        db_parts = norm_db.split()
-        
-        reversed_similarity = 0
-        if len(extracted_parts) >= 2 and len(db_parts) >= 2:
-            reversed_extracted = ' '.join(reversed(extracted_parts))
-            reversed_ratio = fuzz.ratio(reversed_extracted, norm_db)
-            reversed_token = fuzz.token_sort_ratio(reversed_extracted, norm_db)
-            reversed_similarity = max(reversed_ratio, reversed_token)
-        
-        # Strategy 3: Initials matching (for cases like "M. SMITH" vs "MARY SMITH")
-        initials_similarity = 0
-        if len(extracted_parts) >= 1 and len(db_parts) >= 1:
-            extracted_initials = ''.join([part[0] for part in extracted_parts if part])
-            db_initials = ''.join([part[0] for part in db_parts if part])
-            if len(extracted_initials) > 0 and len(db_initials) > 0:
-                initials_similarity = fuzz.ratio(extracted_initials, db_initials)
-        
-        # Strategy 4: Longest common subsequence for very damaged OCR
-        def lcs_similarity(s1, s2):
-            """Calculate similarity based on longest common subsequence"""
-            m, n = len(s1), len(s2)
-            if m == 0 or n == 0:
-                return 0
-            
-            # Simple LCS-based similarity
-            dp = [[0] * (n + 1) for _ in range(m + 1)]
-            for i in range(1, m + 1):
-                for j in range(1, n + 1):
-                    if s1[i-1] == s2[j-1]:
-                        dp[i][j] = dp[i-1][j-1] + 1
-                    else:
-                        dp[i][j] = max(dp[i-1][j], dp[i][j-1])
-            
-            lcs_length = dp[m][n]
-            return int((2.0 * lcs_length) / (m + n) * 100)
-        
-        lcs_sim = lcs_similarity(norm_extracted, norm_db)
-        
-        # Return the best similarity score from all strategies
-        best_similarity = max(
-            ratio_sim, partial_sim, token_sim, token_set_sim,
-            reversed_similarity, initials_similarity, lcs_sim
-        )
-        
-        return best_similarity
-    
+        """Enhanced name matching with multiple strategies.
+
+        Exact below the top confidence band; matching stops once a strategy
+        reaches it, since every similarity there scores the same.
+        """
+        return name_similarity(extracted_name, db_name, stop_at=TOP_BAND)
+
     def calculate_name_confidence_score(self, best_similarity: int) -> float:
-        """Improved scoring system with more gradual thresholds"""
-        if best_similarity >= 95:
-            return 1.0
-        elif best_similarity >= 90:
-            return 0.95
-        elif best_similarity >= 85:
-            return 0.9
-        elif best_similarity >= 80:
-            return 0.85
-        elif best_similarity >= 75:
-            return 0.8
-        elif best_similarity >= 70:
-            return 0.75
-        elif best_similarity >= 65:
-            return 0.7
-        elif best_similarity >= 60:
-            return 0.65
-        elif best_similarity >= 55:
-            return 0.6
-        elif best_similarity >= 50:
-            return 0.55
-        elif best_similarity >= 45:
-            return 0.5
-        elif best_similarity >= 40:
-            return 0.45
-        elif best_similarity >= 35:
-            return 0.4
-        else:
-            return 0.3  # Only truly terrible matches get 30%
-    
-    def verify_direct_match(self, certificate: Certificate, extracted_data: Dict[str, any]) -> Dict[str, any]:
-        anomalies = []
-        confidence_scores = {}  # Store individual field scores with names
+        """Improved scoring system with more gradual thresholds (NAME_SCORE_BANDS)"""
+        return band_score(best_similarity, NAME_SCORE_BANDS, NAME_SCORE_FLOOR)
 
-        # Student name verification with enhanced matching
-        if extracted_data.get('student_name'):
-            best_similarity = self.enhanced_name_similarity(
-                extracted_data['student_name'], 
-                certificate.student_name
-            )
-            
-            student_name_score = self.calculate_name_confidence_score(best_similarity)
-            confidence_scores['student_name'] = student_name_score
-            
-            if best_similarity < self.verification_thresholds['name_similarity']:
-                anomalies.append(f'Student name mismatch (similarity: {best_similarity}%)')
-        else:
-            confidence_scores['student_name'] = 0.0
-            anomalies.append('Student name not extracted')
+    @staticmethod
+    def _date_evidence(result_date: str):
+        """(score, anomaly or None) of an extracted result date"""
+        if not result_date:
+            return 0.4, 'Result date not extracted'
+        try:
+            # Try multiple date formats
+            for fmt in DATE_FORMATS:
+                try:
+                    datetime.strptime(result_date, fmt)
+                    return 0.9, None
+                except:
+                    continue
+            # Date exists but format unclear
+            return 0.6, f'Date format unclear: {result_date}'
+        except:
+            return 0.3, 'Invalid result date'
 
-        # Mother name verification with enhanced matching
+    def verify_direct_match(self, certificate: Certificate, extracted_data: Dict[str, any],
+                            field_confidence: Dict[str, float] = None) -> Dict[str, any]:
+        # Field similarities, None where either side is missing
+        similarities = {'student_name': None, 'mother_name': None, 'subject': None}
+        if extracted_data.get('student_name'):
+            similarities['student_name'] = self.enhanced_name_similarity(
+                extracted_data['student_name'], certificate.student_name)
         if extracted_data.get('mother_name') and certificate.mother_name:
-            best_similarity = self.enhanced_name_similarity(
-                extracted_data['mother_name'], 
-                certificate.mother_name
-            )
-            
-            mother_name_score = self.calculate_name_confidence_score(best_similarity)
-            confidence_scores['mother_name'] = mother_name_score
-            
-            if best_similarity < self.verification_thresholds['name_similarity']:
-                anomalies.append(f'Mother name mismatch (similarity: {best_similarity}%)')
-        else:
-            confidence_scores['mother_name'] = 0.5  # Neutral if not available
-            if not extracted_data.get('mother_name'):
-                anomalies.append('Mother name not extracted')
-
-        # SGPA verification with improved scoring
+            similarities['mother_name'] = self.enhanced_name_similarity(
+                extracted_data['mother_name'], certificate.mother_name)
+        if extracted_data.get('subject') and certificate.subject:
+            similarities['subject'] = subject_similarity(extracted_data['subject'], certificate.subject)
+        sgpa_diff = None
         if extracted_data.get('sgpa') and certificate.sgpa:
             sgpa_diff = abs(extracted_data['sgpa'] - certificate.sgpa)
-            if sgpa_diff <= 0.05:  # Perfect match
-                sgpa_score = 1.0
-            elif sgpa_diff <= 0.1:  # Very close match
-                sgpa_score = 0.95
-            elif sgpa_diff <= 0.2:  # Close match
-                sgpa_score = 0.9
-            elif sgpa_diff <= 0.3:  # Good match
-                sgpa_score = 0.85
-            elif sgpa_diff <= 0.5:  # Acceptable match
-                sgpa_score = 0.75
-            elif sgpa_diff <= 0.7:  # Fair match
-                sgpa_score = 0.6
-            elif sgpa_diff <= 1.0:  # Poor match but within reason
-                sgpa_score = 0.4
-            else:  # Very poor match
-                sgpa_score = 0.2
-                
-            confidence_scores['sgpa'] = sgpa_score
-            
+        date_score, date_anomaly = self._date_evidence(extracted_data.get('result_date'))
+
+        # Neutral scores where the registry or the extraction lacks a value;
+        # a student name that was not extracted scores nothing
+        confidence_scores = {
+            'student_name': 0.0 if similarities['student_name'] is None
+            else self.calculate_name_confidence_score(similarities['student_name']),
+            'mother_name': 0.5 if similarities['mother_name'] is None
+            else self.calculate_name_confidence_score(similarities['mother_name']),
+            'sgpa': 0.5 if sgpa_diff is None else band_score(sgpa_diff, SGPA_SCORE_BANDS, SGPA_SCORE_FLOOR, True),
+            'date': date_score,
+            'subject': 0.5 if similarities['subject'] is None
+            else band_score(similarities['subject'], SUBJECT_SCORE_BANDS, SUBJECT_SCORE_FLOOR)
+        }
+        return self._direct_match_result(certificate, extracted_data, field_confidence, confidence_scores,
+                                         similarities, sgpa_diff, date_anomaly)
+
+    def verify_direct_matches(self, certificates: List[Certificate], extracted_records: List[Dict[str, any]],
+                              field_confidences: List[Dict[str, float]] = None) -> List[Dict[str, any]]:
+        """verify_direct_match of every (certificates[i], extracted_records[i]) pair.
+
+        Field similarities of all pairs are scored together (name_similarities,
+        subject_similarities) and turned into field scores with NumPy band
+        tables; results are the dicts verify_direct_match returns. A record
+        that cannot be scored (e.g. a non-numeric SGPA) gets the ERROR result
+        verify_certificate would give it.
+        """
+        count = len(certificates)
+        field_confidences = field_confidences or [None] * count
+        errors = {}
+        sgpa_diffs = np.zeros(count)
+        has_sgpa = np.zeros(count, dtype=bool)
+        dates = {}
+        date_evidence = []
+        for index, (certificate, extracted_data) in enumerate(zip(certificates, extracted_records)):
+            try:
+                for field in ('student_name', 'mother_name'):
+                    if extracted_data.get(field):
+                        normalize_name(extracted_data[field])
+                if extracted_data.get('subject'):
+                    extracted_data['subject'].lower()
+                if extracted_data.get('sgpa') and certificate.sgpa:
+                    sgpa_diffs[index] = abs(extracted_data['sgpa'] - certificate.sgpa)
+                    has_sgpa[index] = True
+                result_date = extracted_data.get('result_date')
+                if result_date not in dates:
+                    dates[result_date] = self._date_evidence(result_date)
+                date_evidence.append(dates[result_date])
+            except Exception as e:
+                errors[index] = e
+                has_sgpa[index] = False
+                date_evidence.append((0.4, None))
+
+        def present(extracted_field, registry_field):
+            return np.array([index not in errors and bool(extracted_data.get(extracted_field))
+                             and bool(getattr(certificate, registry_field))
+                             for index, (certificate, extracted_data)
+                             in enumerate(zip(certificates, extracted_records))], dtype=bool)
+
+        def pair_values(mask, field):
+            return ([extracted_data[field] if ok else '' for ok, extracted_data in zip(mask, extracted_records)],
+                    [getattr(certificate, field) or '' if ok else '' for ok, certificate in zip(mask, certificates)])
+
+        # A student name is scored whenever it was extracted (0 without a registry name)
+        has_student = np.array([index not in errors and bool(extracted_data.get('student_name'))
+                                for index, extracted_data in enumerate(extracted_records)], dtype=bool)
+        has_mother = present('mother_name', 'mother_name')
+        has_subject = present('subject', 'subject')
+        student_sims = name_similarities(*pair_values(has_student, 'student_name'), stop_at=TOP_BAND)
+        mother_sims = name_similarities(*pair_values(has_mother, 'mother_name'), stop_at=TOP_BAND)
+        subject_sims = subject_similarities(*pair_values(has_subject, 'subject'))
+
+        # One column per field, in SCORE_FIELDS order, with the neutral
+        # scores of verify_direct_match where a value is missing
+        table = np.column_stack([
+            np.where(has_student, band_scores(student_sims, NAME_SCORE_BANDS, NAME_SCORE_FLOOR), 0.0),
+            np.where(has_mother, band_scores(mother_sims, NAME_SCORE_BANDS, NAME_SCORE_FLOOR), 0.5),
+            np.where(has_sgpa, band_scores(sgpa_diffs, SGPA_SCORE_BANDS, SGPA_SCORE_FLOOR, True), 0.5),
+            np.array([score for score, _ in date_evidence], dtype=float),
+            np.where(has_subject, band_scores(subject_sims, SUBJECT_SCORE_BANDS, SUBJECT_SCORE_FLOOR), 0.5)
+        ]) if count else np.zeros((0, len(SCORE_FIELDS)))
+
+        results = []
+        for index, (certificate, extracted_data) in enumerate(zip(certificates, extracted_records)):
+            if index in errors:
+                results.append(self._error_result(errors[index]))
+                continue
+            similarities = {
+                'student_name': int(student_sims[index]) if has_student[index] else None,
+                'mother_name': int(mother_sims[index]) if has_mother[index] else None,
+                'subject': int(subject_sims[index]) if has_subject[index] else None
+            }
+            results.append(self._direct_match_result(
+                certificate, extracted_data, field_confidences[index], dict(zip(SCORE_FIELDS, table[index].tolist())),
+                similarities, float(sgpa_diffs[index]) if has_sgpa[index] else None, date_evidence[index][1]))
+        return results
+
+    def _direct_match_result(self, certificate: Certificate, extracted_data: Dict[str, any],
+                             field_confidence: Optional[Dict[str, float]], confidence_scores: Dict[str, float],
+                             similarities: Dict[str, Optional[int]], sgpa_diff: Optional[float],
+                             date_anomaly: Optional[str]) -> Dict[str, any]:
+        """Anomalies, weighted confidence and status of one record's field scores"""
+        anomalies = []
+        if similarities['student_name'] is None:
+            anomalies.append('Student name not extracted')
+        elif similarities['student_name'] < self.verification_thresholds['name_similarity']:
+            anomalies.append(f'Student name mismatch (similarity: {similarities["student_name"]}%)')
+
+        if similarities['mother_name'] is not None:
+            if similarities['mother_name'] < self.verification_thresholds['name_similarity']:
+                anomalies.append(f'Mother name mismatch (similarity: {similarities["mother_name"]}%)')
+        elif not extracted_data.get('mother_name'):
+            anomalies.append('Mother name not extracted')
+
+        if sgpa_diff is not None:
             if sgpa_diff > 0.5:
                 anomalies.append(f'SGPA mismatch (extracted: {extracted_data["sgpa"]}, expected: {certificate.sgpa})')
-        else:
-            confidence_scores['sgpa'] = 0.5  # Neutral if not available
-            if not extracted_data.get('sgpa'):
-                anomalies.append('SGPA not extracted from certificate')
+        elif not extracted_data.get('sgpa'):
+            anomalies.append('SGPA not extracted from certificate')
 
-        # Date format verification with better scoring
-        if extracted_data.get('result_date'):
-            try:
-                # Try multiple date formats
-                date_formats = ['%d %B %Y', '%d-%m-%Y', '%d/%m/%Y', '%B %d, %Y', '%Y-%m-%d', '%m/%d/%Y']
-                date_parsed = False
-                for fmt in date_formats:
-                    try:
-                        datetime.strptime(extracted_data['result_date'], fmt)
-                        date_parsed = True
-                        break
-                    except:
-                        continue
-                
-                if date_parsed:
-                    confidence_scores['date'] = 0.9
-                else:
-                    confidence_scores['date'] = 0.6  # Date exists but format unclear
-                    anomalies.append(f'Date format unclear: {extracted_data["result_date"]}')
-            except:
-                confidence_scores['date'] = 0.3
-                anomalies.append('Invalid result date')
-        else:
-            confidence_scores['date'] = 0.4
-            anomalies.append('Result date not extracted')
+        if date_anomaly:
+            anomalies.append(date_anomaly)
 
-        # Subject verification with gradual scoring
-        if extracted_data.get('subject') and certificate.subject:
-            subject_similarity = max(
-                fuzz.ratio(extracted_data['subject'].lower(), certificate.subject.lower()),
-                fuzz.partial_ratio(extracted_data['subject'].lower(), certificate.subject.lower()),
-                fuzz.token_sort_ratio(extracted_data['subject'].lower(), certificate.subject.lower())
-            )
-            
-            # Gradual scoring for subject match
-            if subject_similarity >= 90:
-                subject_score = 0.95
-            elif subject_similarity >= 80:
-                subject_score = 0.9
-            elif subject_similarity >= 70:
-                subject_score = 0.8
-            elif subject_similarity >= 60:
-                subject_score = 0.7
-            elif subject_similarity >= 50:
-                subject_score = 0.6
-            else:
-                subject_score = 0.4
-                
-            confidence_scores['subject'] = subject_score
-            
-            if subject_similarity < 80:
-                anomalies.append(f'Subject mismatch (similarity: {subject_similarity}%)')
-        else:
-            confidence_scores['subject'] = 0.5  # Neutral if subject not available
+        if similarities['subject'] is not None and similarities['subject'] < 80:
+            anomalies.append(f'Subject mismatch (similarity: {similarities["subject"]}%)')
+
+        # A field OCR could barely read is weak evidence either way: pull its
+        # score towards neutral in proportion to the read's confidence
+        if field_confidence:
+            for score_field, data_field in (('student_name', 'student_name'), ('mother_name', 'mother_name'),
+                                            ('sgpa', 'sgpa'), ('subject', 'subject'), ('date', 'result_date')):
+                ocr_confidence = field_confidence.get(data_field)
+                if (not extracted_data.get(data_field) or ocr_confidence is None
+                        or ocr_confidence >= self.verification_thresholds['ocr_confidence']):
+                    continue
+                confidence_scores[score_field] = 0.5 + (confidence_scores[score_field] - 0.5) * ocr_confidence
+                anomalies.append(f'Low OCR confidence for {data_field} ({ocr_confidence:.0%})')
 
         # Calculate weighted confidence with improved system
         # Define fixed weights that sum to 1.0
@@ -333,6 +553,7 @@ class CertificateVerifier:
                 'field_weights': weights,
                 'weighted_average': avg_confidence,
                 'total_weight': total_weight,
+                'ocr_field_confidence': field_confidence or {},
                 'threshold_used': {
                     'authentic': self.verification_thresholds['authentic_threshold'],
                     'suspicious': self.verification_thresholds['suspicious_threshold']
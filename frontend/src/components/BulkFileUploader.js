@@ -151,13 +151,15 @@ const BulkFileUploader = ({ onFilesProcessed, isAdmin = false }) => {
         } else {
           // Handle images and PDFs - send to OCR endpoint
           try {
-            const result = await apiService.extractOCR(file);
+            const result = await apiService.extractOCR(file, { bulk: true });
             updatedFileItem.status = 'processed';
             updatedFileItem.data = {
               type: 'ocr',
               extracted_data: result.extracted_data,
               raw_text: result.raw_text,
-              confidence: result.extraction_confidence
+              confidence: result.extraction_confidence,
+              field_confidence: result.field_confidence,
+              auto_approvable: result.auto_approvable
             };
             processedResults.push(updatedFileItem);
           } catch (error) {
@@ -6,13 +6,16 @@ const BulkUploadReview = ({ processedFiles, onApprove, onReject, onEdit }) => {
   const [selectedItems, setSelectedItems] = useState(new Set());
   const [editingItem, setEditingItem] = useState(null);
   const [editData, setEditData] = useState({});
+  const [reviewedFields, setReviewedFields] = useState(new Set());
   const [isSubmitting, setIsSubmitting] = useState(false);
 
   // Auto-select successfully processed items when processedFiles changes
   useEffect(() => {
     if (processedFiles && processedFiles.length > 0) {
-      // Auto-select all successfully processed items
-      setSelectedItems(new Set(processedFiles.filter(f => f.status === 'processed').map(f => f.id)));
+      // Auto-select processed items, except OCR reads with low field confidence that need review
+      setSelectedItems(new Set(processedFiles
+        .filter(f => f.status === 'processed' && f.data.auto_approvable !== false)
+        .map(f => f.id)));
     }
   }, [processedFiles]);
 
@@ -42,20 +45,35 @@ const BulkUploadReview = ({ processedFiles, onApprove, onReject, onEdit }) => {
       setEditData(item.data.records[0] || {});
     } else if (item.data.type === 'ocr') {
       setEditData(item.data.extracted_data || {});
+      setReviewedFields(new Set(item.data.reviewed_fields || []));
     }
   };
 
+  const toggleReviewed = (field, reviewed) => {
+    setReviewedFields(prev => {
+      const newSet = new Set(prev);
+      if (reviewed) {
+        newSet.add(field);
+      } else {
+        newSet.delete(field);
+      }
+      return newSet;
+    });
+  };
+
   const saveEdit = () => {
     if (onEdit) {
-      onEdit(editingItem, editData);
+      onEdit(editingItem, editData, [...reviewedFields]);
     }
     setEditingItem(null);
     setEditData({});
+    setReviewedFields(new Set());
   };
 
   const cancelEdit = () => {
     setEditingItem(null);
     setEditData({});
+    setReviewedFields(new Set());
   };
 
   const handleSubmitSelected = async () => {
@@ -80,7 +98,9 @@ const BulkUploadReview = ({ processedFiles, onApprove, onReject, onEdit }) => {
             source: 'ocr',
             filename: item.file.name,
             data: item.data.extracted_data,
-            confidence: item.data.confidence
+            confidence: item.data.confidence,
+            field_confidence: item.data.field_confidence,
+            reviewed_fields: item.data.reviewed_fields || []
           });
         }
       }
@@ -169,6 +189,7 @@ const BulkUploadReview = ({ processedFiles, onApprove, onReject, onEdit }) => {
 
   const renderEditForm = (item) => {
     if (editingItem !== item.id) return null;
+    const isOcr = item.data.type === 'ocr';
     
     return (
       <div className="mt-3 p-4 bg-yellow-500/10 border border-yellow-500/30 rounded">
@@ -182,12 +203,27 @@ const BulkUploadReview = ({ processedFiles, onApprove, onReject, onEdit }) => {
               <input
                 type="text"
                 value={value || ''}
-                onChange={(e) => setEditData(prev => ({
-                  ...prev,
-                  [key]: e.target.value
-                }))}
+                onChange={(e) => {
+                  setEditData(prev => ({
+                    ...prev,
+                    [key]: e.target.value
+                  }));
+                  // A corrected value has been reviewed
+                  if (isOcr) toggleReviewed(key, true);
+                }}
                 className="w-full px-2 py-1 text-sm bg-slate-800 border border-slate-600 text-slate-100 rounded focus:outline-none focus:ring-1 focus:ring-blue-500"
               />
+              {isOcr && (
+                <label className="mt-1 flex items-center text-xs text-slate-400">
+                  <input
+                    type="checkbox"
+                    checked={reviewedFields.has(key)}
+                    onChange={(e) => toggleReviewed(key, e.target.checked)}
+                    className="mr-1"
+                  />
+                  Checked against the document
+                </label>
+              )}
             </div>
           ))}
         </div>
@@ -25,7 +25,7 @@ const BulkUploadPage = () => {
     setProcessedFiles(prev => prev.filter(f => f.id !== item.id));
   };
 
-  const handleEdit = (itemId, editedData) => {
+  const handleEdit = (itemId, editedData, reviewedFields) => {
     setProcessedFiles(prev => prev.map(f => {
       if (f.id === itemId) {
         // Update the processed data with edited values
@@ -33,6 +33,8 @@ const BulkUploadPage = () => {
           f.data.records[0] = { ...f.data.records[0], ...editedData };
         } else if (f.data.type === 'ocr') {
           f.data.extracted_data = { ...f.data.extracted_data, ...editedData };
+          // Fields the reviewer checked or corrected are trusted whatever OCR read
+          f.data.reviewed_fields = reviewedFields || [];
         }
       }
       return f;
@@ -139,9 +139,13 @@ export const apiService = {
   },
 
   // OCR extraction
-  extractOCR: async (file) => {
+  extractOCR: async (file, { bulk = false } = {}) => {
     const formData = new FormData();
     formData.append('file', file);
+    if (bulk) {
+      // Bulk uploads are read with the server's fast OCR profile
+      formData.append('bulk', 'true');
+    }
     
     const response = await apiClient.post('/api/ocr-extract', formData, {
       headers: {
@@ -5,7 +5,7 @@ Adds a specific certificate record to the database
 """
 
 from flask import Flask
-from models import db, Certificate
+from models import db, Certificate, RegistryState
 from datetime import datetime
 
 # Initialize Flask app
@@ -41,6 +41,8 @@ def add_certificate():
             
             # Add to database
             db.session.add(certificate)
+            # Running servers drop cached lookups and index the seat within a few seconds
+            RegistryState.bump()
             db.session.commit()
             
             print("✅ Certificate added successfully!")
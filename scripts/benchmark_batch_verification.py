@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Batch Verification Benchmark for PramanMitra
+Scores synthetic extracted records (OCR-noised copies of registry rows,
+with some forged fields) against their certificates one at a time with
+verify_direct_match and all at once with verify_direct_matches, checks
+that both return the same results and reports the timings. No database
+is needed.
+
+Example:
+  python benchmark_batch_verification.py --records 5000
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+import argparse
+import random
+import time
+
+from check_name_similarity import FIRST_NAMES, LAST_NAMES, ocr_noise
+from models import Certificate
+from name_similarity import normalize_name
+from verifier import CertificateVerifier
+
+SUBJECTS = ('Computer Engineering', 'Information Technology', 'Mechanical Engineering',
+            'Electronics and Telecommunication', 'Civil Engineering')
+DATES = ('31 January 2025', '15-02-2025', '2025-03-10', 'March 5, 2025', '5th March 2025', '')
+
+
+def random_name(rng):
+    return f"{rng.choice(LAST_NAMES)} {rng.choice(FIRST_NAMES)}"
+
+
+def synthetic_pairs(count, seed):
+    rng = random.Random(seed)
+    certificates, records, field_confidences = [], [], []
+    for index in range(count):
+        certificate = Certificate(
+            id=index + 1, seat_no=f"S{1900500000 + index}",
+            student_name=f"{rng.choice(LAST_NAMES)} {rng.choice(FIRST_NAMES)} {rng.choice(FIRST_NAMES)}",
+            mother_name=rng.choice(FIRST_NAMES), sgpa=round(rng.uniform(5, 10), 2),
+            result_date=DATES[0], subject=rng.choice(SUBJECTS), is_active=True)
+        forged = rng.random() < 0.2
+        record = {
+            'seat_no': certificate.seat_no,
+            'student_name': ocr_noise(random_name(rng) if forged else certificate.student_name, rng),
+            'mother_name': ocr_noise(certificate.mother_name, rng) if rng.random() < 0.9 else None,
+            'sgpa': round(certificate.sgpa + rng.choice((0, 0, 0, 0.04, 0.3, 1.5)), 2) if rng.random() < 0.95 else None,
+            'result_date': rng.choice(DATES),
+            'subject': ocr_noise(certificate.subject, rng) if rng.random() < 0.9 else None
+        }
+        certificates.append(certificate)
+        records.append(record)
+        field_confidences.append({'student_name': rng.choice((0.95, 0.4))} if rng.random() < 0.1 else None)
+    return certificates, records, field_confidences
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=23)
+    args = parser.parse_args()
+
+    certificates, records, field_confidences = synthetic_pairs(args.records, args.seed)
+
+    verifier = CertificateVerifier()
+    # Both runs start without memoized names
+    normalize_name.cache_clear()
+    start = time.perf_counter()
+    single = [verifier.verify_direct_match(certificate, record, confidence)
+              for certificate, record, confidence in zip(certificates, records, field_confidences)]
+    single_seconds = time.perf_counter() - start
+
+    normalize_name.cache_clear()
+    start = time.perf_counter()
+    batch = verifier.verify_direct_matches(certificates, records, field_confidences)
+    batch_seconds = time.perf_counter() - start
+
+    mismatches = [index for index, (expected, result) in enumerate(zip(single, batch)) if expected != result]
+    statuses = {}
+    for result in batch:
+        statuses[result['status']] = statuses.get(result['status'], 0) + 1
+    print(f"{args.records} records: {statuses}")
+    print(f"verify_direct_match    {single_seconds:7.2f} s")
+    print(f"verify_direct_matches  {batch_seconds:7.2f} s  ({single_seconds / batch_seconds:.1f}x)")
+    print(f"{len(mismatches)} results differ")
+    for index in mismatches[:5]:
+        print(f"  record {index}: {records[index]}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Name Index Benchmark for PramanMitra
+Builds a NameTrigramIndex over a synthetic registry (generated student and
+mother names), looks up OCR-noised copies of registered names and reports
+build time, lookup latency and how often the registered certificate is
+among the candidates, then registers more certificates and reports how
+long appending them to the live index takes. No database is needed.
+
+Example:
+  python benchmark_name_index.py --certificates 3000000
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+import argparse
+import random
+import statistics
+import time
+
+from check_name_similarity import ocr_noise
+from name_index import NameTrigramIndex
+
+CONSONANTS = ('k', 'kh', 'g', 'ch', 'j', 't', 'd', 'n', 'p', 'b', 'm', 'y', 'r', 'l', 'v', 'sh', 's', 'h', 'dh', 'bh')
+VOWELS = ('a', 'a', 'i', 'u', 'e', 'o', 'aa', 'ee')
+
+
+def vocabulary(rng, size):
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(CONSONANTS) + rng.choice(VOWELS) for _ in range(rng.randint(2, 4))).upper())
+    return sorted(words)
+
+
+def synthetic_registry(count, seed):
+    """(certificate id, student name, mother name) rows: surname, first name and father's name"""
+    rng = random.Random(seed)
+    surnames, first_names = vocabulary(rng, 20000), vocabulary(rng, 8000)
+    return [(index + 1, f"{rng.choice(surnames)} {rng.choice(first_names)} {rng.choice(first_names)}",
+             rng.choice(first_names)) for index in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--certificates', type=int, default=1000000)
+    parser.add_argument('--lookups', type=int, default=500)
+    parser.add_argument('--limit', type=int, default=10, help='Candidates per lookup')
+    parser.add_argument('--inserts', type=int, default=1000, help='Certificates registered after the build')
+    parser.add_argument('--seed', type=int, default=25)
+    args = parser.parse_args()
+
+    all_rows = synthetic_registry(args.certificates + args.inserts, args.seed)
+    registered = {'rows': all_rows[:args.certificates], 'generation': 1}
+    # Ids are 1, 2 ..., so the rows after an id start at that position
+    index = NameTrigramIndex(lambda after_id: registered['rows'][after_id:], lambda: registered['generation'],
+                             check_interval=0)
+    rows = registered['rows']
+    start = time.perf_counter()
+    index.refresh()
+    index.wait_ready()
+    build_seconds = time.perf_counter() - start
+
+    rng = random.Random(args.seed + 1)
+    timings, found = [], 0
+    for _ in range(args.lookups):
+        certificate_id, student_name, mother_name = rows[rng.randrange(len(rows))]
+        mother_name = ocr_noise(mother_name, rng) if rng.random() < 0.7 else None
+        start = time.perf_counter()
+        candidates = index.candidates(ocr_noise(student_name, rng), mother_name, limit=args.limit)
+        timings.append(time.perf_counter() - start)
+        found += any(candidate == certificate_id for candidate, _ in candidates)
+
+    timings.sort()
+    stats = index.get_stats()
+    print(f"{stats['certificates']} certificates, {stats['trigrams']} student name trigrams, "
+          f"built in {build_seconds:.1f} s")
+    print(f"lookup median {statistics.median(timings) * 1e3:6.1f} ms, "
+          f"p95 {timings[int(0.95 * (len(timings) - 1))] * 1e3:6.1f} ms")
+    print(f"registered certificate among top {args.limit}: {found / args.lookups:.1%}")
+
+    registered['rows'], registered['generation'] = all_rows, 2
+    index.refresh()
+    while index.get_stats()['generation'] != 2:
+        time.sleep(0.001)
+    stats = index.get_stats()
+    print(f"{args.inserts} certificates registered, appended in {stats['append_seconds'] * 1e3:.1f} ms "
+          f"({stats['certificates']} indexed, {stats['builds']} full build)")
+
+
+if __name__ == '__main__':
+    main()
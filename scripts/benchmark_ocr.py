@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+OCR Benchmark Harness for PramanMitra
+Runs OCRProcessor and CertificateVerifier over a corpus described by a
+manifest.json (see generate_ocr_corpus.py) and reports, per stage (decode,
+PDF text layer, preprocess, Tesseract, regex extraction, verification),
+p50/p95/p99 latency and peak memory, plus per-field extraction accuracy.
+Results are written as JSON; --compare prints the change against an
+earlier run.
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+import argparse
+import contextlib
+import io
+import json
+import platform
+import re
+import time
+from collections import defaultdict
+
+from flask import Flask
+import ocr_processor as ocr_processor_module
+from models import db, Certificate
+from ocr_processor import OCRProcessor
+from verifier import CertificateVerifier
+
+# Stages in report order; 'document' is the whole process_document_detailed call
+STAGES = ('decode', 'pdf_text_layer', 'preprocess', 'tesseract', 'extraction', 'verification', 'document')
+FIELDS = ('seat_no', 'student_name', 'mother_name', 'sgpa', 'result_date', 'subject')
+
+
+def _proc_status_kib(key):
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith(key + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss():
+    """Reset the process' peak RSS (Linux only); False when it cannot be measured per stage"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+        return True
+    except OSError:
+        return False
+
+
+class StageRecorder:
+    """Wraps functions so every call records its duration and extra peak RSS"""
+
+    def __init__(self, track_memory=True):
+        self.timings = defaultdict(list)
+        self.peaks = defaultdict(list)
+        self.track_memory = track_memory and reset_peak_rss()
+
+    def wrap(self, stage, function, memory=True):
+        def timed(*args, **kwargs):
+            measure = self.track_memory and memory
+            if measure:
+                baseline = _proc_status_kib('VmRSS')
+                reset_peak_rss()
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.timings[stage].append(time.perf_counter() - start)
+                if measure:
+                    peak = _proc_status_kib('VmHWM')
+                    if peak is not None and baseline is not None:
+                        self.peaks[stage].append(max(0, peak - baseline) * 1024)
+        return timed
+
+    def instrument(self, processor, verifier):
+        # Module-level helpers are looked up at call time, so patch the module
+        ocr_processor_module.load_grayscale = self.wrap('decode', ocr_processor_module.load_grayscale)
+        ocr_processor_module.render_page = self.wrap('decode', ocr_processor_module.render_page)
+        processor.read_pdf_pages = self.wrap('pdf_text_layer', processor.read_pdf_pages)
+        processor.preprocess_image = self.wrap('preprocess', processor.preprocess_image)
+        processor.ocr_image = self.wrap('tesseract', processor.ocr_image)
+        processor.ocr_image_words = self.wrap('tesseract', processor.ocr_image_words)
+        processor.extract_structured_data_detailed = self.wrap(
+            'extraction', processor.extract_structured_data_detailed)
+        processor.process_document_detailed = self.wrap(
+            'document', processor.process_document_detailed, memory=False)
+        verifier.verify_certificate = self.wrap('verification', verifier.verify_certificate)
+
+
+def percentile(values, q):
+    """Linearly interpolated percentile (q in 0-100) of a non-empty list"""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def stage_report(recorder):
+    report = {}
+    for stage in STAGES:
+        timings = recorder.timings.get(stage)
+        if not timings:
+            continue
+        peaks = recorder.peaks.get(stage)
+        report[stage] = {
+            'calls': len(timings),
+            'total_s': round(sum(timings), 4),
+            'mean_ms': round(sum(timings) / len(timings) * 1000, 3),
+            'p50_ms': round(percentile(timings, 50) * 1000, 3),
+            'p95_ms': round(percentile(timings, 95) * 1000, 3),
+            'p99_ms': round(percentile(timings, 99) * 1000, 3),
+            'peak_rss_mib': round(max(peaks) / 1024 / 1024, 2) if peaks else None,
+        }
+    return report
+
+
+def _text_key(value):
+    return re.sub(r'[^0-9a-z]', '', str(value).lower())
+
+
+def field_matches(field, expected, extracted):
+    if extracted in (None, ''):
+        return False
+    if field == 'sgpa':
+        try:
+            return abs(float(expected) - float(extracted)) < 0.005
+        except (TypeError, ValueError):
+            return False
+    return _text_key(expected) == _text_key(extracted)
+
+
+def seed_registry(documents):
+    """In-memory database holding the manifest's certificates, for verification"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        seen = set()
+        for document in documents:
+            row = document['expected']
+            if row['seat_no'] in seen:
+                continue
+            seen.add(row['seat_no'])
+            db.session.add(Certificate(seat_no=row['seat_no'], student_name=row['student_name'],
+                                       mother_name=row['mother_name'], sgpa=float(row['sgpa']),
+                                       result_date=row['result_date'], subject=row['subject']))
+        db.session.commit()
+    return app
+
+
+def tesseract_version():
+    try:
+        return str(ocr_processor_module.pytesseract.get_tesseract_version())
+    except Exception:
+        return None
+
+
+def run(args):
+    with open(args.manifest, encoding='utf-8') as file:
+        manifest = json.load(file)
+    corpus_dir = os.path.dirname(os.path.abspath(args.manifest))
+    documents = [document for document in manifest['documents']
+                 if not args.formats or document['format'] in args.formats]
+    if args.limit:
+        documents = documents[:args.limit]
+
+    processor = OCRProcessor(pool_size=args.pool_size, preprocess_engine=args.engine,
+                             ocr_strategy=args.strategy, use_layout_templates=args.layout_templates,
+                             pdf_page_workers=1, regex_timeout=args.regex_timeout or None,
+                             extraction_budget=args.extraction_budget or None,
+                             image_target_width=args.image_target_width or None,
+                             profiles_path=args.profiles, default_profile=args.profile)
+    if processor.get_engine_pool() is None and tesseract_version() is None:
+        print("Warning: Tesseract is not available, image and scanned PDF pages will not be read")
+    verifier = CertificateVerifier()
+    recorder = StageRecorder(track_memory=not args.no_memory)
+    recorder.instrument(processor, verifier)
+    app = seed_registry(documents)
+
+    correct = defaultdict(lambda: defaultdict(int))
+    totals = defaultdict(int)
+    statuses = defaultdict(int)
+    errors = []
+    for repeat in range(args.repeat):
+        for index, document in enumerate(documents, start=1):
+            path = os.path.join(corpus_dir, document['file'])
+            output = io.StringIO()
+            try:
+                # OCRProcessor prints every extraction; keep the report readable
+                with contextlib.redirect_stdout(output if not args.verbose else sys.stdout):
+                    result = processor.process_document_detailed(path)
+                    with app.app_context():
+                        verification = verifier.verify_certificate(
+                            result['structured_data'], field_confidence=result.get('field_confidence'))
+            except Exception as e:
+                errors.append({'file': document['file'], 'error': str(e)})
+                print(f"[{index}/{len(documents)}] {document['file']}: ERROR {e}")
+                continue
+            if repeat:
+                continue
+
+            # Accuracy is taken from the first pass only
+            statuses[verification['status']] += 1
+            for field in FIELDS:
+                matched = field_matches(field, document['expected'][field], result['structured_data'].get(field))
+                correct['all'][field] += matched
+                correct[document['format']][field] += matched
+            totals['all'] += 1
+            totals[document['format']] += 1
+            print(f"[{index}/{len(documents)}] {document['file']}: {verification['status']}"
+                  f" ({result['ocr_tier']})")
+
+    accuracy = {
+        group: {field: round(hits[field] / totals[group], 4) for field in FIELDS}
+        for group, hits in correct.items()
+    }
+    for group in accuracy:
+        accuracy[group]['documents'] = totals[group]
+
+    return {
+        'manifest': os.path.abspath(args.manifest),
+        'settings': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'tesseract': tesseract_version(),
+            'engine_pool': processor.get_engine_pool() is not None,
+            'peak_memory_per_stage': recorder.track_memory,
+        },
+        'documents': len(documents),
+        'stages': stage_report(recorder),
+        'accuracy': accuracy,
+        'verification_status': dict(statuses),
+        'errors': errors,
+    }
+
+
+def print_report(report, previous=None):
+    print(f"\n{'stage':15s} {'calls':>6s} {'p50 ms':>10s} {'p95 ms':>10s} {'p99 ms':>10s} {'peak MiB':>9s}")
+    for stage, numbers in report['stages'].items():
+        peak = f"{numbers['peak_rss_mib']:9.1f}" if numbers['peak_rss_mib'] is not None else f"{'n/a':>9s}"
+        line = (f"{stage:15s} {numbers['calls']:6d} {numbers['p50_ms']:10.2f} {numbers['p95_ms']:10.2f}"
+                f" {numbers['p99_ms']:10.2f} {peak}")
+        before = (previous or {}).get('stages', {}).get(stage)
+        if before and before['p50_ms']:
+            line += f"   p50 {(numbers['p50_ms'] / before['p50_ms'] - 1) * 100:+.1f}%"
+            if before['p95_ms']:
+                line += f"  p95 {(numbers['p95_ms'] / before['p95_ms'] - 1) * 100:+.1f}%"
+        print(line)
+
+    print(f"\n{'accuracy':15s} " + ' '.join(f"{field[:12]:>12s}" for field in FIELDS))
+    for group, numbers in report['accuracy'].items():
+        print(f"{group:15s} " + ' '.join(f"{numbers[field]:12.1%}" for field in FIELDS))
+        before = (previous or {}).get('accuracy', {}).get(group)
+        if before:
+            print(f"{'  change':15s} " + ' '.join(
+                f"{(numbers[field] - before.get(field, 0)) * 100:+11.1f}p" for field in FIELDS))
+    if report['errors']:
+        print(f"\n{len(report['errors'])} document(s) failed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('manifest', help='manifest.json of the corpus')
+    parser.add_argument('--output', default='ocr_benchmark.json', help='Where to write the JSON results')
+    parser.add_argument('--compare', help='Earlier results JSON to compare against')
+    parser.add_argument('--formats', type=lambda value: [f for f in value.split(',') if f],
+                        help='Only documents of these formats (e.g. png,pdf)')
+    parser.add_argument('--limit', type=int, default=0, help='Only the first N documents')
+    parser.add_argument('--repeat', type=int, default=1, help='Passes over the corpus (timings use all passes)')
+    parser.add_argument('--strategy', default='tiered', choices=('full', 'tiered'))
+    parser.add_argument('--engine', default='numpy', choices=('pil', 'numpy'), help='Preprocessing engine')
+    parser.add_argument('--pool-size', type=int, default=1, help='tesserocr engines (0 = pytesseract)')
+    parser.add_argument('--layout-templates', action='store_true')
+    parser.add_argument('--regex-timeout', type=float, default=0.05)
+    parser.add_argument('--extraction-budget', type=float, default=0.5)
+    parser.add_argument('--image-target-width', type=int, default=2480)
+    parser.add_argument('--profiles', help='Tuned profiles JSON (tune_ocr_profiles.py)')
+    parser.add_argument('--profile', default='balanced', help='OCR profile to benchmark')
+    parser.add_argument('--no-memory', action='store_true', help='Skip per-stage peak RSS (it adds overhead)')
+    parser.add_argument('--verbose', action='store_true', help='Keep OCRProcessor output')
+    args = parser.parse_args()
+
+    report = run(args)
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            previous = json.load(file)
+    print_report(report, previous)
+
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark and Parity Check for OCR Image Preprocessing
+Compares the PIL enhancer chain with the NumPy pipeline: output must be
+pixel-identical, and time and peak memory are reported per megapixel
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+import argparse
+import multiprocessing
+import statistics
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw
+from ocr_processor import OCRProcessor
+
+try:
+    import resource
+except ImportError:  # Windows: peak memory is not reported
+    resource = None
+
+ENGINES = ('pil', 'numpy')
+
+
+def make_document_image(megapixels, seed=0):
+    """Grey, noisy result-sheet-like page of roughly the requested size"""
+    width = int((megapixels * 1_000_000 * 4 / 3) ** 0.5)
+    height = int(width * 3 / 4)
+    rng = np.random.default_rng(seed)
+    page = rng.normal(225, 12, (height, width)).clip(0, 255).astype(np.uint8)
+    image = Image.fromarray(page, 'L')
+    draw = ImageDraw.Draw(image)
+    line_height = max(12, height // 60)
+    for y in range(line_height, height - line_height, line_height * 2):
+        draw.text((width // 20, y), "Seat No: S400050323  Name: KADU ANIKET RAJU  SGPA: 9.59", fill=30)
+    return image
+
+
+def load_image(path_or_megapixels):
+    if os.path.exists(path_or_megapixels):
+        with Image.open(path_or_megapixels) as image:
+            return os.path.basename(path_or_megapixels), image.convert('L')
+    megapixels = float(path_or_megapixels)
+    return f'synthetic {megapixels:g} MP', make_document_image(megapixels)
+
+
+def check_parity(image):
+    outputs = [np.asarray(OCRProcessor(preprocess_engine=engine).preprocess_image(image))
+               for engine in ENGINES]
+    mismatched = int(np.count_nonzero(outputs[0] != outputs[1]))
+    return mismatched, outputs[0].size
+
+
+def time_engine(image, engine, repeat):
+    processor = OCRProcessor(preprocess_engine=engine)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        processor.preprocess_image(image)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def _peak_memory_worker(image_bytes, size, engine, queue):
+    image = Image.frombytes('L', size, image_bytes)
+    processor = OCRProcessor(preprocess_engine=engine)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    processor.preprocess_image(image)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    queue.put((peak - baseline) * scale)
+
+
+def peak_memory(image, engine):
+    """Extra resident memory needed by one preprocess_image call, in a fresh process"""
+    if resource is None:
+        return None
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_peak_memory_worker,
+                                      args=(image.tobytes(), image.size, engine, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('inputs', nargs='*', default=['1', '4', '12'],
+                        help='Image paths, or sizes in megapixels for synthetic pages')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per engine')
+    args = parser.parse_args()
+
+    failures = 0
+    for item in args.inputs:
+        name, image = load_image(item)
+        megapixels = image.size[0] * image.size[1] / 1_000_000
+        mismatched, total = check_parity(image)
+        status = "identical" if mismatched == 0 else f"{mismatched}/{total} pixels differ"
+        failures += mismatched > 0
+
+        print(f"\n{name} ({image.size[0]}x{image.size[1]}, {megapixels:.1f} MP): {status}")
+        for engine in ENGINES:
+            elapsed = time_engine(image, engine, args.repeat)
+            peak = peak_memory(image, engine)
+            peak_text = f"{peak / megapixels / 1024 / 1024:7.1f} MiB/MP" if peak is not None else "n/a"
+            print(f"  {engine:6s} {elapsed * 1000 / megapixels:8.1f} ms/MP  peak {peak_text}")
+
+    if failures:
+        print(f"\nParity check FAILED for {failures} image(s)")
+        sys.exit(1)
+    print("\nParity check passed")
+
+
+if __name__ == '__main__':
+    main()
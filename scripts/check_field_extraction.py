@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Field Extraction Parity Check for PramanMitra
+Checks that the pattern bank gives the same results on the regex package
+(with timeouts) as on the re module. Every atom of every pattern is
+compared against each character that case-folds to ASCII or counts as
+whitespace, then randomized result-sheet texts (with OCR noise, dotted and
+dotless I, information separators and other Unicode look-alikes) are
+extracted with both engines. Fails on any difference.
+
+Example:
+  python check_field_extraction.py --texts 8000
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+import argparse
+import random
+import re
+
+import field_extractor
+from field_extractor import FieldExtractor, timeouts_available
+from generate_ocr_corpus import page_lines, random_rows
+from issuer_templates import ISSUER_TEMPLATES
+from ocr_processor import OCRProcessor
+
+# Inserted into the texts: characters re and regex could fold or classify differently
+UNICODE_NOISE = ('\u0130', '\u0131', '\u017f', '\u212a', '\x1c', '\x1d', '\x1e', '\x1f', '\x85', '\xa0',
+                 '\u2028', '\u3000', '\u00df', '\u1e9e', '\u0345', '\u03c2', '\ufb01')
+OCR_NOISE = ('0', '1', '5', '$', '|', '.', ':', ' ', '\n')
+
+
+def pattern_banks():
+    banks = [OCRProcessor().patterns]
+    banks += [template['patterns'] for template in ISSUER_TEMPLATES.values()]
+    return banks
+
+
+def atoms(pattern):
+    """Atoms _re_compatible rewrites, paired with their rewritten form"""
+    rewritten = {}
+    for atom in set(re.findall(r'\\.|\[(?:\\.|[^\]])*\]|[A-Za-z.]', pattern)):
+        rewritten[atom] = field_extractor._re_compatible_atom(atom)
+    return rewritten
+
+
+def sweep_characters():
+    """ASCII, plus every character that case-folds to ASCII or is whitespace"""
+    chars = []
+    for code in range(0x110000):
+        if 0xD800 <= code < 0xE000:
+            continue
+        char = chr(code)
+        if code < 128 or char.isspace() or any(ord(c) < 128 for c in char.lower() + char.upper() + char.casefold()):
+            chars.append(char)
+    return chars + list(UNICODE_NOISE)
+
+
+def check_atoms(banks):
+    failures = []
+    chars = sweep_characters()
+    seen = {}
+    for bank in banks:
+        for patterns in bank.values():
+            for pattern in patterns:
+                seen.update(atoms(pattern))
+    for atom, rewritten in sorted(seen.items()):
+        expected = re.compile(atom, re.IGNORECASE)
+        actual = field_extractor.regex_module.compile(
+            rewritten, field_extractor.regex_module.IGNORECASE | field_extractor.regex_module.VERSION0)
+        for char in chars:
+            if bool(expected.fullmatch(char)) != bool(actual.fullmatch(char)):
+                failures.append(f"atom {atom!r} ({rewritten!r}) on {char!r}")
+    return len(seen), failures
+
+
+def noisy_text(row, rng):
+    text = '\n'.join(line for _, _, line in page_lines(row, rng))
+    chars = list(text)
+    for _ in range(rng.randint(0, 6)):
+        position = rng.randrange(len(chars))
+        roll = rng.random()
+        if roll < 0.4:
+            chars[position] = rng.choice(UNICODE_NOISE)
+        elif roll < 0.6:
+            chars.insert(position, rng.choice(UNICODE_NOISE))
+        elif roll < 0.8:
+            chars[position] = rng.choice(OCR_NOISE)
+        elif chars[position] in 'iI' or rng.random() < 0.5:
+            # Turkish-style I, the reviewed case: "İKK" is [A-Z]+ for re
+            chars[position] = rng.choice(('\u0130', '\u0131'))
+    return ''.join(chars)
+
+
+def extract_all(banks, texts):
+    field_extractor._compiled_banks.clear()
+    extractors = [FieldExtractor(bank) for bank in banks]
+    return [[extractor.extract(text) for extractor in extractors] for text in texts]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--texts', type=int, default=8000)
+    parser.add_argument('--seed', type=int, default=12)
+    args = parser.parse_args()
+
+    if not timeouts_available():
+        print("The regex package is not installed; patterns only run on re")
+        return
+
+    banks = pattern_banks()
+    atom_count, failures = check_atoms(banks)
+    print(f"{atom_count} distinct atoms swept, {len(failures)} differ")
+
+    rng = random.Random(args.seed)
+    texts = [noisy_text(row, rng) for row in random_rows(args.texts, rng)]
+    with_regex = extract_all(banks, texts)
+    regex_module, field_extractor.regex_module = field_extractor.regex_module, None
+    try:
+        with_re = extract_all(banks, texts)
+    finally:
+        field_extractor.regex_module = regex_module
+        field_extractor._compiled_banks.clear()
+    mismatches = [index for index, (a, b) in enumerate(zip(with_regex, with_re)) if a != b]
+    print(f"{len(texts)} texts, {len(mismatches)} extract differently")
+
+    for failure in failures[:20]:
+        print(f"  {failure}")
+    for index in mismatches[:5]:
+        print(f"  text {index}: {texts[index]!r}")
+        print(f"    regex {with_regex[index]}")
+        print(f"    re    {with_re[index]}")
+    sys.exit(1 if failures or mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
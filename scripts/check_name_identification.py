@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Name Identification Check for PramanMitra
+Verifies records without a seat number against a synthetic registry through
+the name index and checks the cap on name-only identification: a record
+identified by name is AUTHENTIC only when its mother name, SGPA and subject
+were read and match the registry exactly, and SUSPICIOUS otherwise. Also
+checks that records are reported as SUSPICIOUS (index_warming) rather than
+FAKE before the index has loaded. No database is needed.
+
+Example:
+  python check_name_identification.py --records 2000
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+import argparse
+import contextlib
+import io
+import random
+import threading
+
+from benchmark_name_index import synthetic_registry
+from check_name_similarity import ocr_noise
+from name_index import NameTrigramIndex
+from verifier import CertificateVerifier
+
+SUBJECTS = ('Computer Engineering', 'Information Technology', 'Mechanical Engineering', 'Civil Engineering')
+
+
+class RegistryVerifier(CertificateVerifier):
+    """CertificateVerifier reading certificates from a list of rows instead of the database"""
+
+    def __init__(self, rows, name_index):
+        super().__init__(name_index=name_index)
+        self.rows = {row['id']: row for row in rows}
+        self.rows_by_seat = {row['seat_no']: row for row in rows}
+
+    def registry_rows_by_id(self, certificate_ids):
+        return {certificate_id: self.rows[certificate_id] for certificate_id in certificate_ids
+                if certificate_id in self.rows}
+
+
+def registry(count, seed):
+    rng = random.Random(seed)
+    return [{'id': certificate_id, 'seat_no': f"S{1900500000 + certificate_id}", 'student_name': student_name,
+             'mother_name': mother_name, 'sgpa': round(rng.uniform(5, 10), 2), 'result_date': '31 January 2025',
+             'subject': rng.choice(SUBJECTS), 'is_active': True, 'created_at': None}
+            for certificate_id, student_name, mother_name in synthetic_registry(count, seed)]
+
+
+def record(row, rng):
+    """Extracted fields of row's document without a seat number, each possibly misread or missing"""
+    return {
+        'seat_no': None,
+        'student_name': ocr_noise(row['student_name'], rng) if rng.random() < 0.5 else row['student_name'],
+        'mother_name': rng.choice((row['mother_name'], row['mother_name'], ocr_noise(row['mother_name'], rng), None)),
+        'sgpa': rng.choice((row['sgpa'], row['sgpa'], round(row['sgpa'] + 0.04, 2), None)),
+        'result_date': row['result_date'],
+        'subject': rng.choice((row['subject'], row['subject'], ocr_noise(row['subject'], rng), None))
+    }
+
+
+def check_cases(verifier, rows):
+    """Number of cases checked and their failures. Each capped case would be
+    AUTHENTIC if its seat number had been read, so the cap is what applies."""
+    row = rows[0]
+    exact = {field: row[field] for field in ('student_name', 'mother_name', 'sgpa', 'result_date', 'subject')}
+    exact['seat_no'] = None
+    cases = [
+        ('exact record', exact, 'AUTHENTIC'),
+        ('misread student name', dict(exact, student_name=row['student_name'][:-1]), 'SUSPICIOUS'),
+        ('mother name not read', dict(exact, mother_name=None), 'SUSPICIOUS'),
+        ('SGPA off by 0.04', dict(exact, sgpa=round(row['sgpa'] + 0.04, 2)), 'SUSPICIOUS'),
+        ('subject not read', dict(exact, subject=None), 'SUSPICIOUS'),
+    ]
+    failures = []
+    for name, extracted_data, expected in cases:
+        result = verifier.verify_certificate(dict(extracted_data))
+        if result['status'] != expected or not result.get('identified_by_name'):
+            failures.append(f"{name}: {result['status']} ({result['anomalies']}), expected {expected}")
+        by_seat = verifier.verify_direct_match(verifier._certificate(row), dict(extracted_data))
+        if by_seat['status'] != 'AUTHENTIC':
+            failures.append(f"{name}: {by_seat['status']} even with the seat number, the cap is not exercised")
+    result = verifier.verify_certificate(dict(exact, seat_no='S0000000000'))
+    if result.get('identified_by_name'):
+        failures.append('a record with a seat number was identified by name')
+    return len(cases) + 1, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=25)
+    args = parser.parse_args()
+
+    rows = registry(max(args.records, 50000), args.seed)
+    released = threading.Event()
+
+    def load_names(after_id):
+        released.wait()
+        return [(row['id'], row['student_name'], row['mother_name']) for row in rows if row['id'] > after_id]
+
+    name_index = NameTrigramIndex(load_names, lambda: 1)
+    verifier = RegistryVerifier(rows, name_index)
+    failures = []
+
+    # Before the index has loaded nothing can be identified, but nothing is FAKE either
+    warming = verifier.verify_certificate({'seat_no': None, 'student_name': rows[0]['student_name']})
+    if warming['status'] != 'SUSPICIOUS' or not warming.get('index_warming'):
+        failures.append(f"before the index loaded: {warming['status']} ({warming['anomalies']})")
+    released.set()
+    name_index.wait_ready()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        case_count, case_failures = check_cases(verifier, rows)
+    failures += case_failures
+    print(f"{case_count + 1} cases, {len(failures)} failed")
+
+    rng = random.Random(args.seed + 1)
+    statuses = {}
+    uncapped = 0
+    for _ in range(args.records):
+        row = rows[rng.randrange(len(rows))]
+        extracted_data = record(row, rng)
+        result = verifier.verify_certificate(dict(extracted_data))
+        statuses[result['status']] = statuses.get(result['status'], 0) + 1
+        identified = result.get('identified_by_name')
+        if (result['status'] == 'AUTHENTIC' and identified
+                and not verifier.matches_exactly(verifier.rows_by_seat[identified['matched']], extracted_data)):
+            uncapped += 1
+            failures.append(f"AUTHENTIC by name without an exact match: {extracted_data}")
+    print(f"{args.records} records without a seat number: {statuses}, {uncapped} AUTHENTIC without an exact match")
+
+    for failure in failures[:20]:
+        print(f"  {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
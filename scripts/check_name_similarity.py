@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Name Similarity Check for PramanMitra
+Compares name_similarity against a golden set of name pairs (extracted
+name, registry name, legacy similarity) and times it against the legacy
+matcher. Fails when any similarity below the top band, or any name
+confidence score, differs from the golden set.
+
+  python check_name_similarity.py                 check ../data/name_similarity_golden.csv
+  python check_name_similarity.py --generate 1500 write a new golden set with the legacy matcher
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+import argparse
+import csv
+import random
+import re
+import time
+
+from fuzzywuzzy import fuzz as legacy_fuzz
+from name_similarity import TOP_BAND, name_similarity
+from verifier import CertificateVerifier
+
+DEFAULT_GOLDEN = os.path.join(os.path.dirname(__file__), '..', 'data', 'name_similarity_golden.csv')
+
+FIRST_NAMES = ('ANIKET', 'SAHIL', 'KARTIK', 'SAMARTH', 'PRIYA', 'SNEHA', 'ROHAN', 'AISHWARYA',
+               'OMKAR', 'TANVI', 'VAISHNAVI', 'NIKHIL', 'JOHN', 'MARY', 'SUSAN', 'CLARA')
+LAST_NAMES = ('KADU', 'BURUD', 'RAUT', 'UMBARKAR', 'PATIL', 'JADHAV', 'DESHMUKH', 'KULKARNI',
+              'SMITH', 'DOE', 'CORNELIUS', 'MILLIGAN')
+OCR_SWAPS = (('O', '0'), ('I', '1'), ('S', '5'), ('B', '8'), ('M', 'RN'), ('U', 'II'), ('D', 'CL'),
+             ('E', 'F'), ('A', '4'), ('L', '|'), ('N', 'H'))
+
+
+def legacy_name_similarity(extracted_name, db_name):
+    """enhanced_name_similarity as it was before name_similarity, pure Python and fuzzywuzzy"""
+    def normalize(name):
+        if not name:
+            return ""
+        name = name.strip().lower()
+        name = re.sub(r'[^a-zA-Z0-9\s]', ' ', name)
+        name = re.sub(r'\s+', ' ', name)
+        for old, new in {'0': 'o', '1': 'i', '5': 's', '8': 'b', 'rn': 'm', 'ii': 'u', 'cl': 'd'}.items():
+            name = name.replace(old, new)
+        return name.strip()
+
+    if not extracted_name or not db_name:
+        return 0
+    norm_extracted = normalize(extracted_name)
+    norm_db = normalize(db_name)
+    scores = [legacy_fuzz.ratio(norm_extracted, norm_db), legacy_fuzz.partial_ratio(norm_extracted, norm_db),
+              legacy_fuzz.token_sort_ratio(norm_extracted, norm_db),
+              legacy_fuzz.token_set_ratio(norm_extracted, norm_db)]
+    extracted_parts = norm_extracted.split()
+    db_parts = norm_db.split()
+    if len(extracted_parts) >= 2 and len(db_parts) >= 2:
+        reversed_extracted = ' '.join(reversed(extracted_parts))
+        scores.append(legacy_fuzz.ratio(reversed_extracted, norm_db))
+        scores.append(legacy_fuzz.token_sort_ratio(reversed_extracted, norm_db))
+    if extracted_parts and db_parts:
+        scores.append(legacy_fuzz.ratio(''.join(p[0] for p in extracted_parts), ''.join(p[0] for p in db_parts)))
+
+    m, n = len(norm_extracted), len(norm_db)
+    if m and n:
+        dp = [[0] * (n + 1) for _ in range(m + 1)]
+        for i in range(1, m + 1):
+            for j in range(1, n + 1):
+                if norm_extracted[i - 1] == norm_db[j - 1]:
+                    dp[i][j] = dp[i - 1][j - 1] + 1
+                else:
+                    dp[i][j] = max(dp[i - 1][j], dp[i][j - 1])
+        scores.append(int((2.0 * dp[m][n]) / (m + n) * 100))
+    return max(scores)
+
+
+def random_name(rng):
+    return ' '.join(rng.choice(LAST_NAMES if i == 0 else FIRST_NAMES) for i in range(rng.randint(1, 3)))
+
+
+def ocr_noise(name, rng):
+    """name as OCR might read it: confusions, dropped or doubled letters, swapped or lost words"""
+    words = name.split()
+    roll = rng.random()
+    if roll < 0.1 and len(words) > 1:
+        words.reverse()
+    elif roll < 0.2 and len(words) > 1:
+        words.pop(rng.randrange(len(words)))
+    elif roll < 0.3:
+        words = [word[0] + '.' if rng.random() < 0.5 else word for word in words]
+    noisy = ' '.join(words)
+    for _ in range(rng.randint(0, 4)):
+        if not noisy:
+            break
+        action = rng.random()
+        position = rng.randrange(len(noisy))
+        if action < 0.4:
+            old, new = rng.choice(OCR_SWAPS)
+            noisy = noisy.replace(old, new, 1)
+        elif action < 0.6:
+            noisy = noisy[:position] + noisy[position + 1:]
+        elif action < 0.8:
+            noisy = noisy[:position] + noisy[position] + noisy[position:]
+        else:
+            noisy = noisy[:position] + rng.choice('.,-\' ') + noisy[position:]
+    if rng.random() < 0.3:
+        noisy = noisy.title()
+    return noisy
+
+
+def generate_pairs(count, seed):
+    rng = random.Random(seed)
+    pairs = []
+    while len(pairs) < count:
+        db_name = random_name(rng)
+        roll = rng.random()
+        if roll < 0.05:
+            extracted = db_name
+        elif roll < 0.2:
+            extracted = random_name(rng)
+        else:
+            extracted = ocr_noise(db_name, rng)
+        pairs.append((extracted, db_name))
+    return pairs
+
+
+def write_golden(path, count, seed):
+    pairs = generate_pairs(count, seed)
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file, lineterminator='\n')
+        writer.writerow(['extracted_name', 'db_name', 'similarity'])
+        for extracted, db_name in pairs:
+            writer.writerow([extracted, db_name, legacy_name_similarity(extracted, db_name)])
+    print(f"Wrote {len(pairs)} pairs scored by the legacy matcher to {path}")
+
+
+def read_golden(path):
+    with open(path, newline='', encoding='utf-8') as file:
+        return [(row['extracted_name'], row['db_name'], int(row['similarity'])) for row in csv.DictReader(file)]
+
+
+def timed(function, pairs, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for extracted, db_name in pairs:
+            function(extracted, db_name)
+    return (time.perf_counter() - start) / (repeat * len(pairs)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--golden', default=DEFAULT_GOLDEN, help='Golden set CSV')
+    parser.add_argument('--generate', type=int, metavar='N', help='Write a new golden set of N pairs and exit')
+    parser.add_argument('--seed', type=int, default=22)
+    parser.add_argument('--repeat', type=int, default=3, help='Timing passes over the golden set')
+    args = parser.parse_args()
+
+    if args.generate:
+        write_golden(args.golden, args.generate, args.seed)
+        return
+
+    golden = read_golden(args.golden)
+    verifier = CertificateVerifier()
+    failures = []
+    for extracted, db_name, expected in golden:
+        exact = name_similarity(extracted, db_name, stop_at=None)
+        banded = verifier.enhanced_name_similarity(extracted, db_name)
+        if exact != expected:
+            failures.append(f"exact {exact} != {expected}: {extracted!r} vs {db_name!r}")
+        if (banded != expected if expected < TOP_BAND else banded < TOP_BAND) or \
+                verifier.calculate_name_confidence_score(banded) != verifier.calculate_name_confidence_score(expected):
+            failures.append(f"early stop {banded} != {expected}: {extracted!r} vs {db_name!r}")
+
+    pairs = [(extracted, db_name) for extracted, db_name, _ in golden]
+    legacy_us = timed(legacy_name_similarity, pairs, args.repeat)
+    exact_us = timed(lambda a, b: name_similarity(a, b, stop_at=None), pairs, args.repeat)
+    current_us = timed(verifier.enhanced_name_similarity, pairs, args.repeat)
+    print(f"{len(golden)} golden pairs, {len(failures)} mismatches")
+    print(f"legacy matcher            {legacy_us:8.1f} us/pair")
+    print(f"name_similarity (exact)   {exact_us:8.1f} us/pair  ({legacy_us / exact_us:.1f}x)")
+    print(f"enhanced_name_similarity  {current_us:8.1f} us/pair  ({legacy_us / current_us:.1f}x)")
+    for failure in failures[:20]:
+        print(f"  {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -12,7 +12,7 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent / 'backend'))
 
 from flask import Flask
-from models import db, User, Certificate, Institution, VerificationLog, FraudDetectionLog, Blacklist
+from models import db, User, Certificate, Institution, VerificationLog, FraudDetectionLog, Blacklist, RegistryState
 from auth import JWTAuth
 
 # Initialize Flask app
@@ -56,6 +56,8 @@ def clear_database():
             
             # Clear certificates
             deleted_certs = Certificate.query.delete()
+            # Running servers drop cached lookups of the deleted certificates
+            RegistryState.bump()
             print(f"✓ Deleted {deleted_certs} certificate records")
             
             # Clear institutions (keep some for testing if needed)
@@ -123,6 +125,9 @@ def clear_database():
             print("- 1 admin user (username: admin, password: admin123)")
             print("- 3 sample institutions")
             print("")
+            print("Restart running servers to rebuild their seat and name indexes now")
+            print("(otherwise they do so within REGISTRY_INDEX_REBUILD_SECONDS)")
+            print("")
             print("You can now test the bulk upload functionality with fresh data.")
             print("Login at: http://localhost:3000/admin/login")
             
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Synthetic Certificate Corpus Generator for OCR Benchmarks
+Renders result-sheet PNG/JPEG images and text-layer or scanned PDFs from
+certificate rows (a CSV like data/test_bulk_upload_fixed.csv, or random
+ones), with controllable noise, rotation, blur and JPEG artifacts, and
+writes a ground-truth manifest.json next to the files. The same arguments
+and seed always produce the same corpus.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import random
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+FORMATS = ('png', 'jpg', 'pdf', 'scanned_pdf')
+EXTENSIONS = {'png': '.png', 'jpg': '.jpg', 'pdf': '.pdf', 'scanned_pdf': '.pdf'}
+FIELDS = ('seat_no', 'student_name', 'mother_name', 'sgpa', 'result_date', 'subject')
+
+# A4 portrait; field lines sit inside the regions of the 'sppu_result_sheet'
+# layout template (fractions of the page height)
+PAGE_INCHES = (8.27, 11.69)
+PDF_POINTS = (595, 842)
+HEADER = ('SAVITRIBAI PHULE PUNE UNIVERSITY', 'STATEMENT OF GRADES')
+LINES = (
+    (0.185, 0.06, 'SEAT NO: {seat_no}'),
+    (0.235, 0.06, 'STUDENT NAME: {student_name}'),
+    (0.285, 0.06, 'MOTHER NAME: {mother_name}'),
+    (0.335, 0.06, 'SUB: {subject}'),
+    (0.820, 0.06, '{semester} SEMESTER'),
+    (0.820, 0.56, 'SGPA : {sgpa}'),
+    (0.890, 0.06, 'RESULT DATE: {result_date}'),
+)
+TABLE_TOP = 0.40
+TABLE_ROW = 0.045
+
+FIRST_NAMES = ('ANIKET', 'SAHIL', 'KARTIK', 'SAMARTH', 'PRIYA', 'SNEHA', 'ROHAN', 'AISHWARYA',
+               'OMKAR', 'POOJA', 'TEJAS', 'SHRUTI', 'PRATHAMESH', 'VAISHNAVI', 'YASH', 'RUTUJA')
+LAST_NAMES = ('KADU', 'BURUD', 'RAUT', 'UMBARKAR', 'PATIL', 'JADHAV', 'DESHMUKH', 'KULKARNI',
+              'PAWAR', 'SHINDE', 'GAIKWAD', 'JOSHI', 'MORE', 'CHAVAN', 'BHOSALE', 'WAGH')
+MOTHER_NAMES = ('MEERA', 'SWAPNILA', 'SANGEETA', 'BHAKTI', 'SUNITA', 'ASHA', 'VANDANA', 'MANISHA',
+                'SHOBHA', 'ANITA', 'KAVITA', 'RUPALI')
+SUBJECTS = ('Computer Engineering', 'Information Technology', 'Electronics & Telecommunication',
+            'Mechanical Engineering', 'Civil Engineering', 'Artificial Intelligence & Data Science')
+RESULT_DATES = ('05 July 2025', '31 January 2025', '12 June 2024', '20 December 2024')
+SEMESTERS = ('FIRST', 'SECOND', 'THIRD', 'FOURTH', 'FIFTH', 'SIXTH', 'SEVENTH', 'EIGHTH')
+COURSES = ('DATA STRUCTURES', 'DISCRETE MATHEMATICS', 'COMPUTER NETWORKS', 'OPERATING SYSTEMS',
+           'DATABASE SYSTEMS', 'THEORY OF COMPUTATION', 'SOFTWARE ENGINEERING', 'MICROPROCESSORS')
+GRADES = (('O', 10), ('A+', 9), ('A', 8), ('B+', 7), ('B', 6), ('C', 5))
+
+
+def random_rows(count, rng):
+    rows = []
+    for _ in range(count):
+        rows.append({
+            'seat_no': 'S' + ''.join(rng.choice('0123456789') for _ in range(rng.choice((9, 10)))),
+            'student_name': f"{rng.choice(LAST_NAMES)} {rng.choice(FIRST_NAMES)} {rng.choice(FIRST_NAMES)}",
+            'mother_name': rng.choice(MOTHER_NAMES),
+            'sgpa': f"{rng.uniform(5.0, 10.0):.2f}",
+            'result_date': rng.choice(RESULT_DATES),
+            'subject': rng.choice(SUBJECTS),
+        })
+    return rows
+
+
+def read_rows(csv_path):
+    with open(csv_path, newline='', encoding='utf-8') as file:
+        return [{field: (row.get(field) or '').strip() for field in FIELDS}
+                for row in csv.DictReader(file) if row.get('seat_no')]
+
+
+def page_lines(row, rng):
+    """(y, x, text) of every line of a result sheet, as fractions of the page"""
+    values = dict(row, semester=rng.choice(SEMESTERS))
+    try:
+        # Printed sheets always show two decimals (10 -> 10.00)
+        values['sgpa'] = f"{float(row['sgpa']):.2f}"
+    except ValueError:
+        pass
+    lines = [(0.035, None, HEADER[0]), (0.085, None, HEADER[1])]
+    lines += [(y, x, template.format(**values)) for y, x, template in LINES]
+    lines.append((TABLE_TOP - 0.035, 0.06, 'GRADES OBTAINED'))
+    lines.append((TABLE_TOP, 0.06, 'COURSE NAME'))
+    lines.append((TABLE_TOP, 0.62, 'CREDITS  GRADE  GP'))
+    for i, course in enumerate(rng.sample(COURSES, 6)):
+        grade, points = rng.choice(GRADES)
+        y = TABLE_TOP + TABLE_ROW * (i + 1)
+        lines.append((y, 0.06, course))
+        lines.append((y, 0.62, f"{rng.choice((3, 4))}.00   {grade}   {points}.00"))
+    # Reading order, which is also the order of the text layer of PDFs
+    return sorted(lines, key=lambda line: (line[0], line[1] or 0))
+
+
+def load_font(size):
+    for name in ('DejaVuSans.ttf', 'Arial.ttf', 'LiberationSans-Regular.ttf'):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size=size)
+
+
+def render_image(lines, dpi):
+    width, height = int(PAGE_INCHES[0] * dpi), int(PAGE_INCHES[1] * dpi)
+    image = Image.new('L', (width, height), 255)
+    draw = ImageDraw.Draw(image)
+    font = load_font(int(height * 0.017))
+    header_font = load_font(int(height * 0.024))
+    for y, x, text in lines:
+        line_font = header_font if x is None else font
+        if x is None:
+            x_px = (width - draw.textlength(text, font=line_font)) / 2
+        else:
+            x_px = x * width
+        draw.text((x_px, y * height), text, fill=20, font=line_font)
+    return image
+
+
+def distort(image, rng, np_rng, rotation, noise, blur, jpeg_quality):
+    """Scan artifacts; returns the image and the values actually applied"""
+    applied = {'rotation': 0.0, 'noise': noise, 'blur': blur, 'jpeg_quality': jpeg_quality}
+    if rotation:
+        applied['rotation'] = round(rng.uniform(-rotation, rotation), 2)
+        image = image.rotate(applied['rotation'], resample=Image.Resampling.BICUBIC, fillcolor=255)
+    if blur:
+        image = image.filter(ImageFilter.GaussianBlur(blur))
+    if noise:
+        pixels = np.asarray(image, dtype=np.float32) + np_rng.normal(0, noise, (image.height, image.width))
+        image = Image.fromarray(pixels.clip(0, 255).astype(np.uint8), 'L')
+    if jpeg_quality:
+        buffer = io.BytesIO()
+        image.save(buffer, 'JPEG', quality=jpeg_quality)
+        buffer.seek(0)
+        image = Image.open(buffer).convert('L')
+    return image, applied
+
+
+def _pdf_string(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def write_text_pdf(path, lines):
+    """Single-page PDF with a real text layer (Helvetica), like a digitally issued result"""
+    width, height = PDF_POINTS
+    commands = []
+    for y, x, text in lines:
+        size = 14 if x is None else 10
+        x_pt = width * 0.25 if x is None else x * width
+        commands.append(f"BT /F1 {size} Tf {x_pt:.1f} {height * (1 - y) - size:.1f} Td ({_pdf_string(text)}) Tj ET")
+    content = '\n'.join(commands).encode('latin-1', errors='replace')
+
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}] '
+        f'/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>'.encode('ascii'),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+        b'<< /Length ' + str(len(content)).encode('ascii') + b' >>\nstream\n' + content + b'\nendstream',
+    ]
+    output = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f'{number} 0 obj\n'.encode('ascii') + body + b'\nendobj\n'
+    xref = len(output)
+    output += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode('ascii')
+    for offset in offsets:
+        output += f'{offset:010d} 00000 n \n'.encode('ascii')
+    output += (f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n'
+               f'startxref\n{xref}\n%%EOF\n').encode('ascii')
+    with open(path, 'wb') as file:
+        file.write(output)
+
+
+def file_name(index, fmt, legacy_names):
+    if legacy_names:
+        # Names scripts/measure_ocr_batch.py and measure_ocr_images.py look for
+        if fmt == 'png':
+            return f"Sahil{index}.png"
+        if fmt in ('pdf', 'scanned_pdf'):
+            return f"ANiket{index}.pdf"
+    return f"cert_{index:04d}_{fmt}{EXTENSIONS[fmt]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--csv', help='Certificate rows to render (seat_no, student_name, mother_name, sgpa, result_date, subject)')
+    parser.add_argument('--count', type=int, default=20, help='Random rows to generate when --csv is not given')
+    parser.add_argument('--out', default='ocr_corpus', help='Output directory')
+    parser.add_argument('--formats', default='png,pdf', help=f"Comma separated, any of {', '.join(FORMATS)}")
+    parser.add_argument('--dpi', type=int, default=200, help='Resolution of rendered pages')
+    parser.add_argument('--noise', type=float, default=0.0, help='Gaussian noise standard deviation (grey levels)')
+    parser.add_argument('--rotation', type=float, default=0.0, help='Maximum skew in degrees, drawn per document')
+    parser.add_argument('--blur', type=float, default=0.0, help='Gaussian blur radius in pixels')
+    parser.add_argument('--jpeg-quality', type=int, default=0, help='Round-trip images through JPEG at this quality (0 = off)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for rows, layout and distortions')
+    parser.add_argument('--legacy-names', action='store_true', help='Name files Sahil{i}.png / ANiket{i}.pdf')
+    args = parser.parse_args()
+
+    formats = [fmt.strip() for fmt in args.formats.split(',') if fmt.strip()]
+    unknown = [fmt for fmt in formats if fmt not in FORMATS]
+    if unknown:
+        parser.error(f"Unknown format(s): {', '.join(unknown)}")
+    if args.legacy_names and 'pdf' in formats and 'scanned_pdf' in formats:
+        parser.error('--legacy-names cannot write both pdf and scanned_pdf')
+
+    rng = random.Random(args.seed)
+    np_rng = np.random.default_rng(args.seed)
+    rows = read_rows(args.csv) if args.csv else random_rows(args.count, rng)
+    os.makedirs(args.out, exist_ok=True)
+
+    documents = []
+    for index, row in enumerate(rows, start=1):
+        lines = page_lines(row, rng)
+        page = None
+        for fmt in formats:
+            name = file_name(index, fmt, args.legacy_names)
+            path = os.path.join(args.out, name)
+            applied = None
+            if fmt == 'pdf':
+                write_text_pdf(path, lines)
+            else:
+                if page is None:
+                    page = render_image(lines, args.dpi)
+                image, applied = distort(page, rng, np_rng, args.rotation, args.noise,
+                                         args.blur, args.jpeg_quality)
+                if fmt == 'png':
+                    image.save(path, 'PNG')
+                elif fmt == 'jpg':
+                    image.save(path, 'JPEG', quality=args.jpeg_quality or 90)
+                else:
+                    image.save(path, 'PDF', resolution=args.dpi)
+            documents.append({'file': name, 'format': fmt, 'expected': row, 'distortion': applied})
+        print(f"[{index}/{len(rows)}] {row['seat_no']}")
+
+    manifest = {
+        'settings': {key: value for key, value in vars(args).items()},
+        'fields': list(FIELDS),
+        'documents': documents,
+    }
+    with open(os.path.join(args.out, 'manifest.json'), 'w', encoding='utf-8') as file:
+        json.dump(manifest, file, indent=2)
+    print(f"\nWrote {len(documents)} files and manifest.json to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,12 +4,14 @@ Measure OCR Verification Time for Batch Image Documents (PNG)
 """
 import sys
 import os
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
 import time
-from backend.ocr_processor import OCRProcessor
+from ocr_processor import OCRProcessor
 
 # Path to folder containing certificate images (update as needed)
 DOCS_FOLDER = '../uploads/'
+# Number of OCR worker processes (None = one per CPU)
+WORKERS = None
 
 ocr = OCRProcessor()
 
@@ -26,13 +28,10 @@ def main():
     doc_paths = get_image_paths_sequential(DOCS_FOLDER, limit=100)
     print(f"Found {len(doc_paths)} image files for OCR batch.")
     start_time = time.time()
-    for i, doc_path in enumerate(doc_paths):
-        print(f"[{i+1}/{len(doc_paths)}] Verifying: {os.path.basename(doc_path)} ...", end=' ')
-        try:
-            raw_text, structured = ocr.process_document(doc_path)
-            print("OK")
-        except Exception as e:
-            print(f"ERROR: {e}")
+    results = ocr.process_documents(doc_paths, ordered=False, max_workers=WORKERS)
+    for i, (doc_path, raw_text, structured) in enumerate(results):
+        status = "OK" if structured is not None else "ERROR"
+        print(f"[{i+1}/{len(doc_paths)}] Verifying: {os.path.basename(doc_path)} ... {status}")
     end_time = time.time()
     elapsed = end_time - start_time
     print(f"\nTime taken to verify {len(doc_paths)} images: {elapsed:.2f} seconds")
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+OCR Profile Tuner for PramanMitra
+Grid-searches preprocessing parameters, page segmentation modes and
+traineddata variants over a labeled corpus (manifest.json written by
+generate_ocr_corpus.py) and writes named profiles trading accuracy against
+latency, for OCR_PROFILES_PATH:
+
+  accurate  highest mean field accuracy
+  balanced  fastest within --balanced-tolerance of that accuracy
+  fast      fastest within --fast-tolerance of that accuracy
+
+Example:
+  python tune_ocr_profiles.py corpus/manifest.json --psm 6,4 \\
+      --tessdata fast=/usr/share/tessdata_fast,best=/usr/share/tessdata_best
+"""
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import time
+from datetime import datetime, timezone
+
+import ocr_processor as ocr_processor_module
+from benchmark_ocr import FIELDS, field_matches, percentile, tesseract_version
+from ocr_processor import OCRProcessor
+from ocr_profiles import DEFAULT_PROFILES, validate_profile
+
+# Formats whose text comes from OCR; text layer PDFs do not depend on the profile
+OCR_FORMATS = ('png', 'jpg', 'scanned_pdf')
+
+
+def number_list(cast):
+    return lambda value: [cast(item) for item in value.split(',') if item]
+
+
+def tessdata_variants(value):
+    """'fast=/path,best=/path' as {'fast': '/path', 'best': '/path'}"""
+    variants = {}
+    for item in value.split(','):
+        name, _, path = item.partition('=')
+        if not name or not path:
+            raise argparse.ArgumentTypeError(f"Expected name=path, got {item!r}")
+        variants[name] = path
+    return variants
+
+
+def load_pages(processor, documents, corpus_dir):
+    """Decode every document once, the way OCRProcessor would before preprocessing"""
+    pages = []
+    for document in documents:
+        path = os.path.join(corpus_dir, document['file'])
+        with open(path, 'rb') as file:
+            data = file.read()
+        if document['format'] == 'scanned_pdf':
+            page = ocr_processor_module.render_page(data, 0, processor.pdf_dpi)
+        else:
+            page = ocr_processor_module.load_grayscale(io.BytesIO(data), processor.image_target_width,
+                                                       processor.image_max_pixels)
+        if page is None:
+            print(f"Skipping {document['file']}: cannot be rendered")
+            continue
+        pages.append((document, page))
+    return pages
+
+
+def candidate_grid(args):
+    """Every combination of the searched settings, with its traineddata variant name"""
+    variants = args.tessdata or {'default': None}
+    for (min_width, upscale_width, contrast, brightness, sharpness, median_size,
+         psm, variant) in itertools.product(args.min_width, args.upscale_width, args.contrast,
+                                            args.brightness, args.sharpness, args.median,
+                                            args.psm, sorted(variants)):
+        if min_width and upscale_width < min_width:
+            continue
+        if not min_width and upscale_width != args.upscale_width[0]:
+            # upscale_width is unused without upscaling, try it once
+            continue
+        yield variant, {
+            'min_width': min_width,
+            'upscale_width': upscale_width,
+            'contrast': contrast,
+            'brightness': brightness,
+            'sharpness': sharpness,
+            'median_size': median_size,
+            'psm': psm,
+            'tessdata_path': variants[variant]
+        }
+
+
+def evaluate(processor, pages, profile, strategy, verbose=False):
+    """Mean field accuracy, per-field accuracy and per-page latencies of one profile"""
+    processor.profiles['_candidate'] = profile
+    hits = dict.fromkeys(FIELDS, 0)
+    timings = []
+    for document, page in pages:
+        with contextlib.redirect_stdout(sys.stdout if verbose else io.StringIO()):
+            start = time.perf_counter()
+            result = processor.extract_page_image(page, strategy, profile='_candidate')
+            timings.append(time.perf_counter() - start)
+        for field in FIELDS:
+            hits[field] += field_matches(field, document['expected'][field], result['structured_data'].get(field))
+    field_accuracy = {field: round(hits[field] / len(pages), 4) for field in FIELDS}
+    return {
+        'accuracy': round(sum(field_accuracy.values()) / len(FIELDS), 4),
+        'field_accuracy': field_accuracy,
+        'mean_ms': round(sum(timings) / len(timings) * 1000, 2),
+        'p95_ms': round(percentile(timings, 95) * 1000, 2)
+    }
+
+
+def pareto_front(results):
+    """Results no other result beats on both accuracy and mean latency, fastest first"""
+    front = []
+    for result in sorted(results, key=lambda r: (r['mean_ms'], -r['accuracy'])):
+        if not front or result['accuracy'] > front[-1]['accuracy']:
+            front.append(result)
+    return front
+
+
+def choose_profiles(results, balanced_tolerance, fast_tolerance):
+    best = max(result['accuracy'] for result in results)
+
+    def fastest_within(tolerance):
+        eligible = [result for result in results if result['accuracy'] >= best - tolerance]
+        return min(eligible, key=lambda r: (r['mean_ms'], -r['accuracy']))
+
+    accurate = min((result for result in results if result['accuracy'] == best), key=lambda r: r['mean_ms'])
+    return {
+        'fast': fastest_within(fast_tolerance),
+        'balanced': fastest_within(balanced_tolerance),
+        'accurate': accurate
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('manifest', help='manifest.json of the labeled corpus')
+    parser.add_argument('--output', default='ocr_profiles.json', help='Where to write the profiles')
+    parser.add_argument('--formats', type=lambda value: [f for f in value.split(',') if f],
+                        default=list(OCR_FORMATS), help='Document formats to tune on')
+    parser.add_argument('--limit', type=int, default=0, help='Only the first N documents')
+    parser.add_argument('--strategy', default='full', choices=('full', 'tiered'))
+    parser.add_argument('--engine', default='numpy', choices=('pil', 'numpy'), help='Preprocessing engine')
+    parser.add_argument('--pool-size', type=int, default=1, help='tesserocr engines (0 = pytesseract)')
+    parser.add_argument('--min-width', type=number_list(int), default=[0, 1000],
+                        help='Upscale pages narrower than this (0 = never)')
+    parser.add_argument('--upscale-width', type=number_list(int), default=[1500, 2000])
+    parser.add_argument('--contrast', type=number_list(float), default=[2.0, 2.5])
+    parser.add_argument('--brightness', type=number_list(float), default=[1.2])
+    parser.add_argument('--sharpness', type=number_list(float), default=[1.0, 2.0])
+    parser.add_argument('--median', type=number_list(int), default=[1, 3], help='Median filter sizes (1 = off)')
+    parser.add_argument('--psm', type=number_list(int), default=[6])
+    parser.add_argument('--tessdata', type=tessdata_variants,
+                        help="Traineddata variants as name=directory pairs, e.g. fast=...,best=...")
+    parser.add_argument('--balanced-tolerance', type=float, default=0.01,
+                        help='Accuracy the balanced profile may give up for speed')
+    parser.add_argument('--fast-tolerance', type=float, default=0.05,
+                        help='Accuracy the fast profile may give up for speed')
+    parser.add_argument('--verbose', action='store_true', help='Keep OCRProcessor output')
+    args = parser.parse_args()
+
+    with open(args.manifest, encoding='utf-8') as file:
+        manifest = json.load(file)
+    documents = [document for document in manifest['documents'] if document['format'] in args.formats]
+    if args.limit:
+        documents = documents[:args.limit]
+
+    processor = OCRProcessor(pool_size=args.pool_size, preprocess_engine=args.engine,
+                             ocr_strategy=args.strategy, pdf_page_workers=1)
+    if processor.get_engine_pool() is None and tesseract_version() is None:
+        print("Error: Tesseract is not available, nothing can be tuned")
+        sys.exit(1)
+    pages = load_pages(processor, documents, os.path.dirname(os.path.abspath(args.manifest)))
+    if not pages:
+        print("Error: no OCR documents in the corpus for the selected formats")
+        sys.exit(1)
+
+    candidates = list(candidate_grid(args))
+    for profile in ({**DEFAULT_PROFILES[name], 'tessdata_path': None} for name in DEFAULT_PROFILES):
+        # Built-in profiles are always measured, as the baseline
+        if ('default', profile) not in candidates:
+            candidates.append(('default', profile))
+    print(f"Evaluating {len(candidates)} candidate profiles on {len(pages)} documents")
+
+    results = []
+    for index, (variant, profile) in enumerate(candidates, start=1):
+        profile = validate_profile(f'candidate {index}', profile)
+        result = evaluate(processor, pages, profile, args.strategy, args.verbose)
+        result.update({'tessdata': variant, 'settings': profile})
+        results.append(result)
+        print(f"[{index}/{len(candidates)}] accuracy {result['accuracy']:.1%}  mean {result['mean_ms']:.0f} ms"
+              f"  ({json.dumps({k: v for k, v in profile.items() if k != 'tessdata_path'})}, tessdata {variant})")
+
+    chosen = choose_profiles(results, args.balanced_tolerance, args.fast_tolerance)
+    print(f"\n{'profile':10s} {'accuracy':>9s} {'mean ms':>9s} {'p95 ms':>9s}")
+    for name, result in chosen.items():
+        print(f"{name:10s} {result['accuracy']:9.1%} {result['mean_ms']:9.0f} {result['p95_ms']:9.0f}")
+
+    output = {
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'manifest': os.path.abspath(args.manifest),
+        'documents': len(pages),
+        'strategy': args.strategy,
+        'tesseract': tesseract_version(),
+        'profiles': {name: result['settings'] for name, result in chosen.items()},
+        'measurements': {name: {key: result[key] for key in ('accuracy', 'field_accuracy', 'mean_ms', 'p95_ms')}
+                         for name, result in chosen.items()},
+        'pareto_front': pareto_front(results)
+    }
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(output, file, indent=2)
+    print(f"\nProfiles written to {args.output}; set OCR_PROFILES_PATH to use them")
+
+
+if __name__ == '__main__':
+    main()